@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify, abort, session
 from db_utils import get_db
+from change_feed import journal_etag
+from sections import section_response
 import os
 from datetime import datetime
 # 导入Socket.IO通知工具
 from socket_utils import notify_team_update
+from .reorder import apply_order
 
 advisor_bp = Blueprint('advisor', __name__)
 
@@ -12,6 +15,7 @@ UPLOAD_FOLDER = 'static/uploads/advisors'
 from .utils import allowed_file
 
 @advisor_bp.route('/advisors', methods=['GET'])
+@journal_etag('advisors')
 def get_advisors():
     """获取所有指导老师"""
     try:
@@ -34,68 +38,11 @@ def get_advisors():
         return jsonify({'error': str(e)}), 500
 
 @advisor_bp.route('/frontend/advisors', methods=['GET'])
+@journal_etag('advisors')
 def get_frontend_advisors():
     """前端获取指导老师数据"""
     try:
-        # 检查是否在 Vercel 环境中
-        if os.environ.get('VERCEL'):
-            # Vercel 环境：返回Mock数据
-            mock_advisors = [
-                {
-                    'id': 1,
-                    'name': '张教授',
-                    'position': '计算机科学系主任、博士生导师',
-                    'description': '主要研究方向：机器学习、人工智能、计算机视觉。发表SCI论文60余篇，主持国家自然科学基金项目5项。',
-                    'image_url': 'https://picsum.photos/300/300?random=101',
-                    'email': 'zhang.prof@university.edu.cn',
-                    'google_scholar': 'https://scholar.google.com/citations?user=example1',
-                    'github': 'https://github.com/zhangprof',
-                    'border_color': 'primary',
-                    'status': 'active',
-                    'sort_order': 1
-                },
-                {
-                    'id': 2,
-                    'name': '李教授',
-                    'position': '算法实验室主任、教授',
-                    'description': '主要研究方向：算法优化、分布式计算、大数据处理。IEEE高级会员，获得国家科技进步二等奖。',
-                    'image_url': 'https://picsum.photos/300/300?random=102',
-                    'email': 'li.prof@university.edu.cn',
-                    'google_scholar': 'https://scholar.google.com/citations?user=example2',
-                    'github': 'https://github.com/liprof',
-                    'border_color': 'secondary',
-                    'status': 'active',
-                    'sort_order': 2
-                },
-                {
-                    'id': 3,
-                    'name': '王副教授',
-                    'position': '数据科学中心副主任',
-                    'description': '主要研究方向：深度学习、自然语言处理、推荐系统。发表顶级会议论文30余篇，获得多项发明专利。',
-                    'image_url': 'https://picsum.photos/300/300?random=103',
-                    'email': 'wang.prof@university.edu.cn',
-                    'google_scholar': 'https://scholar.google.com/citations?user=example3',
-                    'github': 'https://github.com/wangprof',
-                    'border_color': 'accent',
-                    'status': 'active',
-                    'sort_order': 3
-                }
-            ]
-            print(f"🔧 Vercel环境：返回指导老师Mock数据 {len(mock_advisors)} 位")
-            return jsonify(mock_advisors)
-        
-        # 本地环境：正常数据库查询
-        with get_db() as conn:
-            cursor = conn.execute("SELECT * FROM advisors WHERE status = 'active' ORDER BY sort_order")
-            advisors = cursor.fetchall()
-            
-            # 将数据库行转换为字典列表
-            advisors_data = []
-            for advisor in advisors:
-                advisor_dict = dict(advisor)
-                advisors_data.append(advisor_dict)
-            
-        return jsonify(advisors_data)
+        return section_response('advisors')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -316,11 +263,8 @@ def reorder_advisors():
             return jsonify({"error": "排序数据格式错误"}), 400
         
         with get_db() as conn:
-            # 批量更新排序
-            for index, advisor_id in enumerate(advisor_ids):
-                conn.execute('UPDATE advisors SET sort_order = ? WHERE id = ?', (index + 1, advisor_id))
-            
-            conn.commit()
+            # 在单个事务中批量更新排序
+            apply_order(conn, 'advisors', advisor_ids, column='sort_order')
             
             print(f"✅ 指导老师排序更新成功，共{len(advisor_ids)}个指导老师")
             
@@ -1,92 +1,19 @@
 from flask import Blueprint, request, jsonify, abort, session
 from db_utils import get_db
+from sections import section_response
+from .reorder import apply_positions
 from datetime import datetime
 import traceback
-import os
 
 # 创建算法蓝图
 algorithm_bp = Blueprint('algorithm', __name__, url_prefix='/api')
 
-# 前端API端点
+# 前端API端点（与算法页面嵌入的首屏数据共用分区快照）
 @algorithm_bp.route('/frontend/algorithms', methods=['GET'])
 def get_frontend_algorithms():
-    """获取算法数据（前端展示）"""
+    """获取算法数据（前端展示），按分类补充 frontend_category"""
     try:
-        # 检查是否在 Vercel 环境中
-        if os.environ.get('VERCEL'):
-            # Vercel 环境：返回Mock数据
-            mock_algorithms = [
-                {
-                    'id': 1,
-                    'title': '快速排序算法',
-                    'category': '基础算法',
-                    'frontend_category': 'competition',
-                    'description': '一种高效的排序算法，使用分治策略。平均时间复杂度为O(n log n)，是最常用的排序算法之一。',
-                    'time_complexity': 'O(n log n)',
-                    'space_complexity': 'O(log n)',
-                    'code_preview': 'def quicksort(arr):\n    if len(arr) <= 1:\n        return arr\n    pivot = arr[len(arr) // 2]\n    left = [x for x in arr if x < pivot]\n    middle = [x for x in arr if x == pivot]\n    right = [x for x in arr if x > pivot]\n    return quicksort(left) + middle + quicksort(right)',
-                    'pdf_url': '',
-                    'status': 'active',
-                    'order_index': 1
-                },
-                {
-                    'id': 2,
-                    'title': '动态规划-背包问题',
-                    'category': '动态规划',
-                    'frontend_category': 'competition',
-                    'description': '解决0-1背包问题的经典动态规划方法，通过状态转移方程来求解最优解。',
-                    'time_complexity': 'O(nW)',
-                    'space_complexity': 'O(nW)',
-                    'code_preview': 'def knapsack(values, weights, W):\n    n = len(values)\n    dp = [[0] * (W + 1) for _ in range(n + 1)]\n    for i in range(1, n + 1):\n        for w in range(W + 1):\n            if weights[i-1] <= w:\n                dp[i][w] = max(dp[i-1][w], dp[i-1][w-weights[i-1]] + values[i-1])\n            else:\n                dp[i][w] = dp[i-1][w]\n    return dp[n][W]',
-                    'pdf_url': '',
-                    'status': 'active',
-                    'order_index': 2
-                },
-                {
-                    'id': 3,
-                    'title': '深度优先搜索(DFS)',
-                    'category': '图论',
-                    'frontend_category': 'competition',
-                    'description': '图遍历的基本算法之一，使用栈结构实现，可以用于路径查找、连通性判断等问题。',
-                    'time_complexity': 'O(V+E)',
-                    'space_complexity': 'O(V)',
-                    'code_preview': 'def dfs(graph, start, visited=None):\n    if visited is None:\n        visited = set()\n    visited.add(start)\n    print(start)\n    for neighbor in graph[start]:\n        if neighbor not in visited:\n            dfs(graph, neighbor, visited)\n    return visited',
-                    'pdf_url': '',
-                    'status': 'active',
-                    'order_index': 3
-                }
-            ]
-            print(f"🔧 Vercel环境：返回算法Mock数据 {len(mock_algorithms)} 个")
-            return jsonify(mock_algorithms)
-        
-        # 本地环境：正常数据库查询
-        with get_db() as conn:
-            # 获取启用的算法，按排序索引和创建时间排序
-            cursor = conn.execute('''
-                SELECT * FROM algorithms 
-                WHERE status = 'active'
-                ORDER BY COALESCE(order_index, 0) ASC, created_at DESC
-            ''')
-            algorithms = cursor.fetchall()
-            
-            # 转换为字典格式
-            algorithms_data = []
-            for algorithm in algorithms:
-                algorithm_dict = dict(algorithm)
-                # 根据分类映射到前端分类
-                category = algorithm_dict.get('category', '')
-                if category in ['基础算法', '图论', '数学', '字符串', '动态规划']:
-                    algorithm_dict['frontend_category'] = 'competition'
-                elif category in ['深度学习', '机器学习']:
-                    algorithm_dict['frontend_category'] = 'deep-learning'
-                elif category == '数据结构':
-                    algorithm_dict['frontend_category'] = 'data-structures'
-                else:
-                    algorithm_dict['frontend_category'] = 'competition'
-                
-                algorithms_data.append(algorithm_dict)
-            
-            return jsonify(algorithms_data)
+        return section_response('algorithms')
     except Exception as e:
         print(f"Error fetching frontend algorithms: {e}")
         traceback.print_exc()
@@ -96,19 +23,7 @@ def get_frontend_algorithms():
 def get_frontend_algorithm_awards():
     """获取竞赛获奖记录（前端展示）"""
     try:
-        with get_db() as conn:
-            # 获取启用的获奖记录，按排序索引和创建时间排序
-            cursor = conn.execute('''
-                SELECT * FROM algorithm_awards 
-                WHERE status = 'active'
-                ORDER BY COALESCE(order_index, 0) ASC, created_at DESC
-            ''')
-            awards = cursor.fetchall()
-            
-            # 转换为字典格式
-            awards_data = [dict(award) for award in awards]
-            
-            return jsonify(awards_data)
+        return section_response('algorithm_awards')
     except Exception as e:
         print(f"Error fetching frontend algorithm awards: {e}")
         traceback.print_exc()
@@ -118,19 +33,7 @@ def get_frontend_algorithm_awards():
 def get_frontend_project_overview():
     """获取项目概览统计（前端展示）"""
     try:
-        with get_db() as conn:
-            # 获取启用的统计项，按排序索引和创建时间排序
-            cursor = conn.execute('''
-                SELECT * FROM project_overview 
-                WHERE status = 'active'
-                ORDER BY COALESCE(order_index, 0) ASC, created_at DESC
-            ''')
-            overviews = cursor.fetchall()
-            
-            # 转换为字典格式
-            overviews_data = [dict(overview) for overview in overviews]
-            
-            return jsonify(overviews_data)
+        return section_response('project_overview')
     except Exception as e:
         print(f"Error fetching frontend project overview: {e}")
         traceback.print_exc()
@@ -345,14 +248,8 @@ def reorder_admin_algorithms():
             return jsonify({'error': '缺少排序数据'}), 400
         
         with get_db() as conn:
-            for item in order_data:
-                algorithm_id = item.get('id')
-                order_index = item.get('order_index', 0)
-                
-                if algorithm_id:
-                    conn.execute('UPDATE algorithms SET order_index = ? WHERE id = ?', (order_index, algorithm_id))
-            
-            conn.commit()
+            positions = [(item.get('id'), item.get('order_index', 0)) for item in order_data if item.get('id')]
+            apply_positions(conn, 'algorithms', positions)
             
             print(f"✅ 算法排序更新成功")
             
@@ -584,14 +481,8 @@ def reorder_admin_algorithm_awards():
             return jsonify({'error': '缺少排序数据'}), 400
         
         with get_db() as conn:
-            for item in order_data:
-                award_id = item.get('id')
-                order_index = item.get('order_index', 0)
-                
-                if award_id:
-                    conn.execute('UPDATE algorithm_awards SET order_index = ? WHERE id = ?', (order_index, award_id))
-            
-            conn.commit()
+            positions = [(item.get('id'), item.get('order_index', 0)) for item in order_data if item.get('id')]
+            apply_positions(conn, 'algorithm_awards', positions)
             
             print(f"✅ 竞赛获奖记录排序更新成功")
             
@@ -800,14 +691,8 @@ def reorder_admin_project_overview():
             return jsonify({'error': '缺少排序数据'}), 400
         
         with get_db() as conn:
-            for item in order_data:
-                overview_id = item.get('id')
-                order_index = item.get('order_index', 0)
-                
-                if overview_id:
-                    conn.execute('UPDATE project_overview SET order_index = ? WHERE id = ?', (order_index, overview_id))
-            
-            conn.commit()
+            positions = [(item.get('id'), item.get('order_index', 0)) for item in order_data if item.get('id')]
+            apply_positions(conn, 'project_overview', positions)
             
             print(f"✅ 项目概览统计排序更新成功")
             
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+前端聚合数据API
+GET /api/frontend/bundle?sections=team,papers 一次返回多个数据分区，首屏只需要一次API往返
+sections 也可以使用页面名（home、innovation）表示该页面首屏需要的全部分区
+"""
+
+import hashlib
+import logging
+
+from flask import Blueprint, Response, jsonify, request
+
+from sections import encode_json, get_snapshots, resolve_sections
+
+logger = logging.getLogger(__name__)
+
+bundle_bp = Blueprint('bundle', __name__, url_prefix='/api/frontend')
+
+
+@bundle_bp.route('/bundle', methods=['GET'])
+def get_bundle():
+    """
+    聚合多个分区
+
+    返回 {"sections": {分区名: 数据}, "errors": {分区名: 错误信息}}；
+    构建失败的分区只出现在 errors 中，客户端可以改为请求该分区的独立接口。
+    ETag 由各分区快照计算，全部分区未变化时返回304
+    """
+    names = [name.strip() for name in request.args.get('sections', 'home').split(',') if name.strip()]
+    try:
+        names = resolve_sections(names)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    snapshots, errors = get_snapshots(names)
+
+    etag = None
+    if not errors:
+        digest = hashlib.sha1('|'.join(f'{name}:{s.etag}' for name, s in snapshots.items()).encode('utf-8'))
+        etag = f'b-{digest.hexdigest()[:20]}'
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            response.cache_control.no_cache = True
+            return response
+
+    # 快照已经是编码好的JSON，直接拼接，不再重新序列化
+    body = '{"sections":{%s},"errors":%s}' % (
+        ','.join(f'{encode_json(name)}:{s.json}' for name, s in snapshots.items()),
+        encode_json(errors),
+    )
+    response = Response(body, mimetype='application/json')
+    if etag:
+        response.set_etag(etag, weak=True)
+        # 每次使用前向服务端验证，数据变化后立即可见
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.no_store = True
+    return response
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+变更通知API
+不依赖 WebSocket 的页面刷新通道，基于 change_versions 的资源版本号：
+- /api/events：Server-Sent Events 流，资源变化时推送 change 事件
+- /api/changes/wait：长轮询，阻塞到关注的资源发生变化或超时
+两者都支持 resources=team,papers 只关注部分资源（通知所有页面的 all 始终包含在内）
+收到通知后客户端通过 /api/changes?since=游标 拉取变更日志（change_journal）中被修改或删除的记录
+"""
+
+import json
+import logging
+import os
+import time
+
+from flask import Blueprint, Response, jsonify, request, session
+
+from change_feed import DEFAULT_LIMIT, MAX_LIMIT, changes_since, resolve_tables
+from change_versions import versions
+from db_utils import get_db
+
+logger = logging.getLogger(__name__)
+
+changes_bp = Blueprint('changes', __name__, url_prefix='/api')
+
+_is_vercel = bool(os.environ.get('VERCEL') or os.environ.get('VERCEL_ENV'))
+
+# 长轮询最长等待时间与SSE单次连接最长持续时间（秒）；无服务器函数有执行时长限制，默认更短
+LONG_POLL_TIMEOUT = float(os.environ.get('LONG_POLL_TIMEOUT', 8 if _is_vercel else 25))
+SSE_MAX_SECONDS = float(os.environ.get('SSE_MAX_SECONDS', 8 if _is_vercel else 300))
+
+# SSE心跳间隔（秒）与客户端断开后的重连间隔（毫秒）
+SSE_HEARTBEAT = 15.0
+SSE_RETRY_MS = 3000
+
+# 每个等待中的连接占用一个工作线程，超过上限时让客户端稍后重试
+MAX_WAITERS = int(os.environ.get('CHANGES_MAX_WAITERS', 200))
+
+
+def _parse_since(value):
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError('since 必须是整数版本号')
+
+
+def _parse_resources():
+    value = request.args.get('resources', '')
+    return frozenset(name.strip() for name in value.split(',') if name.strip()) or None
+
+
+def _is_admin():
+    return 'username' in session and session.get('role') == 'admin'
+
+
+def _too_busy():
+    response = jsonify({"error": "等待中的连接过多，请稍后重试"})
+    response.status_code = 429
+    response.headers['Retry-After'] = '5'
+    return response
+
+
+@changes_bp.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    增量变更：返回游标 since 之后被修改或删除的记录
+
+    参数 resources=team,papers 限定资源（也可使用表名），limit 限定本次读取的日志条数；
+    不带 since 时只返回当前游标。has_more 为真时用返回的 cursor 继续拉取，reset 为真时需要整体刷新。
+    未登录时只返回公开接口可见的行和列，管理员可以看到草稿等全部行
+    """
+    try:
+        since = _parse_since(request.args.get('since'))
+        tables = resolve_tables(_parse_resources())
+        limit = min(max(int(request.args.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        with get_db() as conn:
+            result = changes_since(conn, since, tables, limit, public=not _is_admin())
+    except Exception as e:
+        logger.warning(f"读取变更日志失败: {e}")
+        # 变更日志不可用（如Vercel内存数据库）时让客户端整体刷新
+        result = {'cursor': None, 'changes': {}, 'has_more': False, 'reset': since is not None}
+
+    response = jsonify(result)
+    # 响应取决于客户端的游标，不能被浏览器或共享缓存保存
+    response.cache_control.no_store = True
+    return response
+
+
+@changes_bp.route('/changes/wait', methods=['GET'])
+def wait_for_changes():
+    """
+    长轮询：since 之后关注的资源发生变化时立即返回，否则等待至多 timeout 秒
+
+    返回 {'version': 当前版本, 'changed': {资源: 版本}, 'reset': 是否需要整体刷新}；
+    不带 since 时立即返回当前版本，客户端以此开始轮询
+    """
+    try:
+        since = _parse_since(request.args.get('since'))
+        timeout = min(float(request.args.get('timeout', LONG_POLL_TIMEOUT)), LONG_POLL_TIMEOUT)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if since is not None and versions.waiters >= MAX_WAITERS:
+        return _too_busy()
+
+    result = versions.wait(since, _parse_resources(), max(timeout, 0))
+    response = jsonify(result)
+    # 响应取决于客户端的游标，不能被浏览器或共享缓存保存
+    response.cache_control.no_store = True
+    return response
+
+
+def _sse(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _event_stream(since, resources, max_seconds):
+    yield f'retry: {SSE_RETRY_MS}\n\n'
+    if since is None:
+        since = versions.version
+        yield _sse('hello', {'version': since}, since)
+
+    deadline = time.monotonic() + max_seconds
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        result = versions.wait(since, resources, min(SSE_HEARTBEAT, remaining))
+        if result['changed'] or result['reset']:
+            since = result['version']
+            yield _sse('change', result, since)
+        else:
+            yield ': ping\n\n'
+
+
+@changes_bp.route('/events', methods=['GET'])
+def event_stream():
+    """
+    Server-Sent Events 流
+
+    首次连接推送 hello 事件（当前版本），之后每次关注的资源变化推送 change 事件，
+    事件ID为版本号；连接持续 SSE_MAX_SECONDS 后结束，浏览器带 Last-Event-ID 自动重连
+    """
+    try:
+        since = _parse_since(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if versions.waiters >= MAX_WAITERS:
+        return _too_busy()
+
+    response = Response(_event_stream(since, _parse_resources(), SSE_MAX_SECONDS), mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    response.cache_control.no_store = True
+    response.headers['X-Accel-Buffering'] = 'no'  # 关闭 nginx 的响应缓冲
+    return response
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+数据批量导入导出API
+以JSON Lines或CSV格式流式导出内容表，并在单个事务中分批导入同样格式的数据
+"""
+
+from flask import Blueprint, request, jsonify, session, Response
+from db_utils import get_db, transaction
+from socket_utils import notify_page_refresh
+from datetime import datetime
+import csv
+import io
+import json
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+data_transfer_bp = Blueprint('data_transfer', __name__, url_prefix='/api/admin')
+
+# 可导入导出的内容表及其对应的前端刷新页面（用户表不参与导入导出）
+CONTENT_TABLES = {
+    'team_members': 'team',
+    'grades': 'team',
+    'advisors': 'team',
+    'research_areas': 'research',
+    'research_projects': 'research',
+    'papers': 'papers',
+    'paper_categories': 'papers',
+    'paper_category_relations': 'papers',
+    'algorithms': 'algorithms',
+    'algorithm_awards': 'algorithms',
+    'project_overview': 'algorithms',
+    'notifications': 'dynamic',
+    'uploaded_files': 'dynamic',
+    'innovation_projects': 'innovation',
+    'innovation_stats': 'innovation',
+    'innovation_carousel': 'innovation',
+    'achievements': 'innovation',
+    'innovation_training_projects': 'innovation',
+    'intellectual_properties': 'innovation',
+    'enterprise_cooperations': 'innovation',
+}
+
+EXPORT_FETCH_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+
+# 导入模式：replace 按主键覆盖已有行，insert 只追加新行
+IMPORT_MODES = ('replace', 'insert')
+
+
+def _is_admin():
+    return 'username' in session and session.get('role') == 'admin'
+
+
+def _parse_tables(value):
+    """解析tables参数，未指定时返回全部内容表"""
+    if not value:
+        return list(CONTENT_TABLES)
+    tables = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in tables if name not in CONTENT_TABLES]
+    if unknown:
+        raise ValueError(f"不支持的数据表: {', '.join(unknown)}")
+    return tables
+
+
+def _table_columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()]
+
+
+def _iter_rows(conn, table):
+    """按批次游标读取，避免一次性加载整张表"""
+    cursor = conn.execute(f'SELECT * FROM {table} ORDER BY rowid')
+    while True:
+        rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+        if not rows:
+            break
+        yield from rows
+
+
+def generate_jsonl(tables):
+    """逐行生成JSON Lines，每行格式为 {"table": 表名, "data": 行数据}"""
+    with get_db() as conn:
+        for table in tables:
+            for row in _iter_rows(conn, table):
+                yield json.dumps({'table': table, 'data': dict(row)}, ensure_ascii=False, default=str) + '\n'
+
+
+def generate_csv(table):
+    """逐批生成CSV，首行为列名"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    with get_db() as conn:
+        writer.writerow(_table_columns(conn, table))
+        for index, row in enumerate(_iter_rows(conn, table), 1):
+            writer.writerow(list(row))
+            if index % EXPORT_FETCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+@data_transfer_bp.route('/export', methods=['GET'])
+def export_data():
+    """流式导出内容表（format=jsonl|csv，CSV每次只导出一张表）"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    export_format = request.args.get('format', 'jsonl').lower()
+    try:
+        tables = _parse_tables(request.args.get('tables') or request.args.get('table'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if export_format == 'jsonl':
+        body = generate_jsonl(tables)
+        mimetype = 'application/x-ndjson'
+        filename = f'acm_lab_export_{timestamp}.jsonl'
+    elif export_format == 'csv':
+        if len(tables) != 1:
+            return jsonify({"error": "CSV格式每次只能导出一张表"}), 400
+        body = generate_csv(tables[0])
+        mimetype = 'text/csv'
+        filename = f'{tables[0]}_{timestamp}.csv'
+    else:
+        return jsonify({"error": "不支持的导出格式"}), 400
+
+    logger.info(f"开始导出数据: {', '.join(tables)} ({export_format})")
+    response = Response(body, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+def _iter_import_records(stream, import_format, table):
+    """
+    从请求流中逐条解析 (表名, 行数据)
+
+    Raises:
+        ValueError: JSON Lines 中某一行不是 {"table": ..., "data": {...}} 形式的对象
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if import_format == 'csv':
+        for row in csv.DictReader(text):
+            yield table, {key: (value if value != '' else None) for key, value in row.items()}
+    else:
+        for line_number, line in enumerate(text, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"第 {line_number} 行不是JSON对象")
+            data = record.get('data')
+            if not isinstance(data, dict):
+                raise ValueError(f"第 {line_number} 行的 data 必须是对象")
+            yield record.get('table') or table, data
+
+
+class _BatchWriter:
+    """
+    按 (表, 列) 分组缓冲行数据，攒满一批后用executemany写入
+
+    在导入的外层事务中使用：每批写入是一个保存点，导入中途出错时所有批次一起回滚
+    """
+
+    def __init__(self, conn, mode):
+        self.conn = conn
+        self.verb = 'INSERT OR REPLACE' if mode == 'replace' else 'INSERT'
+        self.columns_cache = {}
+        self.pending = {}
+        self.counts = {}
+
+    def add(self, table, data):
+        if table not in CONTENT_TABLES:
+            raise ValueError(f"不支持的数据表: {table}")
+        if table not in self.columns_cache:
+            self.columns_cache[table] = set(_table_columns(self.conn, table))
+        columns = tuple(sorted(key for key in data if key in self.columns_cache[table]))
+        if not columns:
+            raise ValueError(f"{table} 的记录中没有可导入的列")
+        batch = self.pending.setdefault((table, columns), [])
+        batch.append(tuple(data[column] for column in columns))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            self.flush(table, columns)
+
+    def flush(self, table, columns):
+        rows = self.pending.pop((table, columns), None)
+        if not rows:
+            return
+        placeholders = ', '.join('?' for _ in columns)
+        sql = f'{self.verb} INTO {table} ({", ".join(columns)}) VALUES ({placeholders})'
+        with transaction(self.conn) as tx:
+            tx.executemany(sql, rows)
+        self.counts[table] = self.counts.get(table, 0) + len(rows)
+
+    def flush_all(self):
+        for table, columns in list(self.pending):
+            self.flush(table, columns)
+
+
+@data_transfer_bp.route('/import', methods=['POST'])
+def import_data():
+    """
+    批量导入数据
+
+    请求体为导出接口生成的JSON Lines或CSV（CSV需通过table参数指定目标表）
+    mode=replace（默认）按主键覆盖已有行，mode=insert 只追加新行。
+    整个导入在一个事务中完成，任何一行出错（格式或约束错误）都会回滚全部数据，不会留下导入了一半的表
+    """
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    import_format = request.args.get('format') or ('csv' if 'csv' in (request.mimetype or '') else 'jsonl')
+    table = request.args.get('table')
+    mode = request.args.get('mode', 'replace')
+
+    if import_format not in ('jsonl', 'csv'):
+        return jsonify({"error": "不支持的导入格式"}), 400
+    if mode not in IMPORT_MODES:
+        return jsonify({"error": f"不支持的导入模式: {mode}（可用: {', '.join(IMPORT_MODES)}）"}), 400
+    if import_format == 'csv' and table not in CONTENT_TABLES:
+        return jsonify({"error": "CSV导入必须通过table参数指定有效的数据表"}), 400
+
+    started = time.perf_counter()
+    try:
+        with get_db() as conn:
+            with transaction(conn):
+                writer = _BatchWriter(conn, mode)
+                for record_table, data in _iter_import_records(request.stream, import_format, table):
+                    writer.add(record_table, data)
+                writer.flush_all()
+    except (ValueError, json.JSONDecodeError) as e:
+        return jsonify({"error": f"导入数据格式错误，已回滚全部数据: {e}", "imported": {}}), 400
+    except sqlite3.IntegrityError as e:
+        return jsonify({"error": f"导入数据违反约束，已回滚全部数据: {e}", "imported": {}}), 400
+    except Exception as e:
+        logger.error(f"批量导入失败: {e}")
+        return jsonify({"error": f"导入失败，已回滚全部数据: {str(e)}", "imported": {}}), 500
+
+    elapsed = time.perf_counter() - started
+    total = sum(writer.counts.values())
+
+    # 每张表只发送一次刷新通知
+    for imported_table, count in writer.counts.items():
+        if imported_table == 'notifications':
+            from notification_cache import notification_sequence
+            notification_sequence.mark_stale()
+        notify_page_refresh(CONTENT_TABLES[imported_table], {
+            'action': 'imported',
+            'table': imported_table,
+            'rows': count
+        })
+
+    logger.info(f"批量导入完成: {total} 行, 耗时 {elapsed:.2f}s")
+    return jsonify({
+        "success": True,
+        "message": "导入成功",
+        "tables": writer.counts,
+        "rows": total,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "rows_per_second": round(total / elapsed, 1) if elapsed > 0 else total
+    })
@@ -6,47 +6,23 @@
 
 from flask import Blueprint, request, jsonify, session
 from db_utils import get_db
+from change_feed import journal_etag
+from sections import section_response
 from socket_utils import notify_page_refresh
+from .reorder import apply_order, CURRENT_TIMESTAMP
 import logging
 import json
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 grades_bp = Blueprint('grades', __name__)
 
 @grades_bp.route('/api/grades', methods=['GET'])
+@journal_etag('grades', 'team_members')
 def get_grades():
-    """获取所有年级"""
+    """获取所有年级（按order_index排序，含各年级成员数量；与团队页面嵌入的首屏数据共用分区快照）"""
     try:
-        with get_db() as conn:
-            # 获取所有年级，按order_index排序
-            rows = conn.execute('''
-                SELECT id, name, description, order_index, created_at, updated_at
-                FROM grades 
-                ORDER BY order_index ASC, created_at DESC
-            ''').fetchall()
-            
-            grades = []
-            for row in rows:
-                # 获取该年级的成员数量
-                member_count = conn.execute('''
-                    SELECT COUNT(*) as count FROM team_members WHERE grade = ?
-                ''', (row['name'],)).fetchone()['count']
-                
-                grades.append({
-                    'id': row['id'],
-                    'name': row['name'],
-                    'description': row['description'],
-                    'member_count': member_count,
-                    'order_index': row['order_index'],
-                    'created_at': row['created_at'],
-                    'updated_at': row['updated_at']
-                })
-            
-            logger.info(f"获取年级成功，共{len(grades)}个年级")
-            return jsonify(grades), 200
+        return section_response('grades'), 200
     except Exception as e:
         logger.error(f"获取年级失败: {e}")
         return jsonify({'error': '获取年级失败'}), 500
@@ -291,15 +267,8 @@ def reorder_grades():
             return jsonify({"error": "年级ID列表不能为空"}), 400
         
         with get_db() as conn:
-            # 更新年级排序
-            for index, grade_id in enumerate(grade_ids):
-                conn.execute('''
-                    UPDATE grades 
-                    SET order_index = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (index + 1, grade_id))
-            
-            conn.commit()
+            # 在单个事务中更新年级排序
+            apply_order(conn, 'grades', grade_ids, updated_at=CURRENT_TIMESTAMP)
             
             # 发送实时通知到前端页面
             notify_page_refresh('team', {
@@ -24,12 +24,15 @@ try:
     if not app.config.get('SECRET_KEY'):
         app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'vercel-production-key-2024')
 
-    # 数据库初始化（简化版）
+    # 数据库初始化：存在构建阶段生成的快照时直接使用快照，跳过建表和示例数据
     try:
-        from db_utils import init_db
-        with app.app_context():
-            init_db()
-            print("✅ 数据库初始化完成")
+        from db_utils import init_db, snapshot_available
+        if snapshot_available():
+            print("⚡ 使用预构建数据库快照，跳过数据库初始化")
+        else:
+            with app.app_context():
+                init_db()
+                print("✅ 数据库初始化完成")
     except Exception as db_error:
         print(f"⚠️ 数据库初始化警告: {db_error}")
         # 在生产环境中，数据库问题不应中断应用
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify, abort, session
-from db_utils import get_db
+from db_utils import get_db, transaction
+from sections import section_response
+from .reorder import apply_order
 import os
-# from socket_utils import notify_page_refresh
+from socket_utils import notify_page_refresh
 from datetime import datetime
 try:
     from .utils import allowed_file
@@ -23,62 +25,7 @@ def get_innovation_projects():
 def get_frontend_innovation_projects():
     """获取所有科创成果"""
     try:
-        # 检查是否在 Vercel 环境中
-        if os.environ.get('VERCEL'):
-            # Vercel 环境：返回Mock数据
-            mock_projects = [
-                {
-                    'id': 1,
-                    'title': '智能图像识别系统',
-                    'description': '基于深度学习的智能图像识别系统，可应用于安防监控、工业检测等多个领域，识别准确率达到95%以上。',
-                    'image_url': '/static/images/innovation/project1.jpg',
-                    'category': '国家级创新创业项目',
-                    'tags': '人工智能,图像识别,深度学习',
-                    'detail_url': '/innovation/project/1',
-                    'status': 'active',
-                    'sort_order': 1
-                },
-                {
-                    'id': 2,
-                    'title': '自然语言处理平台',
-                    'description': '大规模预训练语言模型平台，支持多语言理解和生成任务，可用于智能客服、文本分析等应用。',
-                    'image_url': '/static/images/innovation/project2.jpg',
-                    'category': '省级创新创业项目',
-                    'tags': 'NLP,语言模型,AI',
-                    'detail_url': '/innovation/project/2',
-                    'status': 'active',
-                    'sort_order': 2
-                },
-                {
-                    'id': 3,
-                    'title': '大数据分析平台',
-                    'description': '企业级大数据分析平台，提供数据清洗、分析、可视化等功能，帮助企业进行数据驱动决策。',
-                    'image_url': '/static/images/innovation/project3.jpg',
-                    'category': '校级创新创业项目',
-                    'tags': '大数据,数据分析,可视化',
-                    'detail_url': '/innovation/project/3',
-                    'status': 'active',
-                    'sort_order': 3
-                }
-            ]
-            print(f"🔧 Vercel环境：返回科创项目Mock数据 {len(mock_projects)} 个")
-            return jsonify(mock_projects)
-        
-        # 本地环境：正常数据库查询
-        with get_db() as conn:
-            cursor = conn.execute('''
-                SELECT * FROM innovation_projects 
-                WHERE status = 'active'
-                ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC
-            ''')
-            projects = cursor.fetchall()
-            
-            result = []
-            for project in projects:
-                project_dict = dict(project)
-                result.append(project_dict)
-            
-            return jsonify(result)
+        return section_response('innovation_projects')
     except Exception as e:
         print(f"Error fetching innovation projects: {e}")
         return jsonify({'error': str(e)}), 500
@@ -259,15 +206,13 @@ def delete_innovation_project(project_id):
             if not project:
                 return jsonify({"error": "科创成果不存在"}), 404
             
-            # 删除项目
-            conn.execute('DELETE FROM innovation_projects WHERE id = ?', (project_id,))
-            conn.commit()
+            # 删除项目；刷新通知随事务提交后发出
+            with transaction(conn) as tx:
+                tx.execute('DELETE FROM innovation_projects WHERE id = ?', (project_id,))
+                notify_page_refresh('innovation', {'action': 'deleted', 'project_id': project_id})
             
             print(f"✅ 科创成果删除成功: {project['title']}")
             
-            # 通知前端刷新
-            notify_page_refresh('innovation', {'action': 'deleted', 'project_id': project_id})
-            
             return jsonify({"success": True, "message": "删除成功"})
             
     except Exception as e:
@@ -290,11 +235,8 @@ def reorder_innovation_projects():
             return jsonify({"error": "排序数据格式错误"}), 400
         
         with get_db() as conn:
-            # 批量更新排序
-            for index, project_id in enumerate(project_ids):
-                conn.execute('UPDATE innovation_projects SET sort_order = ? WHERE id = ?', (index + 1, project_id))
-            
-            conn.commit()
+            # 在单个事务中批量更新排序
+            apply_order(conn, 'innovation_projects', project_ids, column='sort_order')
             
             print(f"✅ 科创成果排序更新成功，共{len(project_ids)}个项目")
             
@@ -1,15 +1,19 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, session
 from werkzeug.utils import secure_filename
 import os
 import uuid
 import sqlite3
 import json
-import markdown
 from datetime import datetime
-from werkzeug.security import check_password_hash
 import tempfile
 import re
 from socket_utils import notify_page_refresh
+from db_utils import transaction, InstrumentedConnection
+from projection import select_list
+from data_source import data_source
+from notification_cache import notification_sequence
+from change_feed import journal_etag
+from .reorder import apply_order
 
 notifications_bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
 
@@ -33,7 +37,8 @@ def ensure_upload_dir():
 
 def get_db():
     """获取数据库连接"""
-    conn = sqlite3.connect(current_app.config.get('DATABASE', 'acm_lab.db'))
+    conn = sqlite3.connect(current_app.config.get('DATABASE', os.environ.get('DATABASE_PATH', 'acm_lab.db')),
+                           factory=InstrumentedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -46,6 +51,7 @@ def markdown_to_html(content):
     """将Markdown内容转换为HTML"""
     try:
         import re
+        import markdown
         
         # 预处理：处理图片链接，确保相对路径正确
         content = preprocess_markdown_images(content)
@@ -191,100 +197,49 @@ def optimize_html_content(html_content):
     return html_content
 
 @notifications_bp.route('/frontend/activities', methods=['GET'])
+@journal_etag('notifications')
 def get_frontend_activities():
     """获取前端显示的实验室动态活动"""
     try:
-        # 检查是否在 Vercel 环境中
-        if os.environ.get('VERCEL'):
-            # Vercel 环境：返回Mock数据
-            mock_activities = [
-                {
-                    'id': 1,
-                    'title': '实验室团队在ICML 2024会议发表重要论文',
-                    'excerpt': '我们的研究团队在机器学习顶级会议ICML 2024上发表了关于"深度强化学习在多智能体系统中的应用"的重要论文，该成果在智能体协作领域取得了突破性进展。',
-                    'formatted_date': '2024年8月15日',
-                    'date': '2024-08-15',
-                    'type': 'research',
-                    'status': 'published'
-                },
-                {
-                    'id': 2,
-                    'title': '第十届ACM程序设计竞赛校内选拔赛成功举办',
-                    'excerpt': '实验室成功举办了第十届ACM程序设计竞赛校内选拔赛，共有来自全校的200余名学生参加。经过激烈角逐，最终选出15名优秀选手组成校队参加区域赛。',
-                    'formatted_date': '2024年7月20日',
-                    'date': '2024-07-20',
-                    'type': 'competition',
-                    'status': 'published'
-                },
-                {
-                    'id': 3,
-                    'title': '实验室与华为技术有限公司签署产学研合作协议',
-                    'excerpt': '为推进产学研深度融合，实验室与华为技术有限公司正式签署合作协议，将在人工智能算法优化、5G通信技术等领域开展深度合作，共同培养高端技术人才。',
-                    'formatted_date': '2024年6月30日',
-                    'date': '2024-06-30',
-                    'type': 'cooperation',
-                    'status': 'published'
-                },
-                {
-                    'id': 4,
-                    'title': '暑期算法训练营圆满结束',
-                    'excerpt': '为期四周的暑期算法训练营圆满结束，来自全国各地的60名学生参加了此次训练营。训练营邀请了多位知名教授和工程师授课，内容涵盖基础算法、高级数据结构、图论等多个方面。',
-                    'formatted_date': '2024年8月5日',
-                    'date': '2024-08-05',
-                    'type': 'training',
-                    'status': 'published'
-                },
-                {
-                    'id': 5,
-                    'title': '实验室学生在全国大学生数学建模竞赛中获得一等奖',
-                    'excerpt': '在刚刚结束的全国大学生数学建模竞赛中，实验室学生团队凭借优秀的建模能力和算法实现，获得全国一等奖的优异成绩，这是学校连续第三年在该赛事中获得全国一等奖。',
-                    'formatted_date': '2024年9月10日',
-                    'date': '2024-09-10',
-                    'type': 'award',
-                    'status': 'published'
-                }
-            ]
-            print(f"🔧 Vercel环境：返回实验室动态Mock数据 {len(mock_activities)} 条")
-            return jsonify(mock_activities)
-        
-        # 本地环境：正常数据库查询
-        with get_db() as conn:
-            cursor = conn.execute('''
-                SELECT id, title, excerpt, created_at, type, status 
-                FROM notifications 
-                WHERE status = 'published' 
-                ORDER BY created_at DESC 
-                LIMIT 10
-            ''')
-            activities = cursor.fetchall()
-            
-            # 转换数据格式
-            activities_data = []
-            for activity in activities:
-                activity_dict = dict(activity)
-                # 格式化日期
-                try:
-                    date_obj = datetime.fromisoformat(activity_dict['created_at'])
-                    activity_dict['formatted_date'] = date_obj.strftime('%Y年%m月%d日')
-                    activity_dict['date'] = date_obj.strftime('%Y-%m-%d')
-                except:
-                    activity_dict['formatted_date'] = '未知日期'
-                    activity_dict['date'] = '2024-01-01'
-                
-                activities_data.append(activity_dict)
-            
-            return jsonify(activities_data)
+        # 通知表没有type列，前端使用的活动类型取自category
+        activities_data = data_source.query(
+            'notifications',
+            where={'status': 'published'},
+            order_by=[('created_at', 'DESC')],
+            limit=10,
+            columns=['id', 'title', 'excerpt', 'created_at', 'category', 'status'],
+        )
+        
+        # 转换数据格式
+        for activity_dict in activities_data:
+            activity_dict['type'] = activity_dict['category']
+            # 格式化日期
+            try:
+                date_obj = datetime.fromisoformat(activity_dict['created_at'])
+                activity_dict['formatted_date'] = date_obj.strftime('%Y年%m月%d日')
+                activity_dict['date'] = date_obj.strftime('%Y-%m-%d')
+            except:
+                activity_dict['formatted_date'] = '未知日期'
+                activity_dict['date'] = '2024-01-01'
+        
+        return jsonify(activities_data)
     except Exception as e:
         print(f"Error fetching frontend activities: {e}")
         return jsonify({'error': str(e)}), 500
 
 @notifications_bp.route('', methods=['GET'])
+@journal_etag('notifications')
 def get_notifications():
-    """获取通知列表"""
+    """获取通知列表（默认卡片投影，不含正文；支持 ?fields= 指定字段）"""
+    try:
+        columns = select_list('notifications')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     try:
         conn = get_db()
-        cursor = conn.execute('''
-            SELECT * FROM notifications 
+        cursor = conn.execute(f'''
+            SELECT {columns} FROM notifications 
             ORDER BY order_index ASC, publish_date DESC
         ''')
         notifications = [dict(row) for row in cursor.fetchall()]
@@ -312,9 +267,10 @@ def get_notification(notification_id):
         # 转换为字典
         notification_dict = dict(notification)
         
-        # 增加浏览量
-        conn.execute('UPDATE notifications SET view_count = view_count + 1 WHERE id = ?', (notification_id,))
-        conn.commit()
+        # 增加浏览量（管理后台读取详情用于编辑，不计入浏览量）
+        if 'username' not in session:
+            conn.execute('UPDATE notifications SET view_count = view_count + 1 WHERE id = ?', (notification_id,))
+            conn.commit()
         
         return jsonify(notification_dict), 200
         
@@ -381,6 +337,7 @@ def create_notification():
         
         notification_id = cursor.lastrowid
         conn.commit()
+        notification_sequence.mark_stale()
         
         # 通知前端刷新动态页面
         notify_page_refresh('dynamic', {'created': True, 'notification_id': notification_id})
@@ -459,33 +416,32 @@ def update_notification(notification_id):
         if not existing:
             return jsonify({"error": "通知不存在"}), 404
         
-        # 更新通知
-        conn.execute('''
-            UPDATE notifications 
-            SET title = ?, content = ?, raw_content = ?, excerpt = ?, 
-                author = ?, category = ?, reading_time = ?, tags = ?, 
-                status = ?, word_count = ?, card_style = ?, updated_at = ?
-            WHERE id = ?
-        ''', (
-            data['title'],
-            html_content,
-            raw_content,
-            excerpt,
-            data.get('author', 'ACM算法研究实验室'),
-            data.get('category', '实验室制度'),
-            reading_time,
-            data.get('tags', ''),
-            data.get('status', 'published'),
-            word_count,
-            card_style,
-            datetime.now(),
-            notification_id
-        ))
-        
-        conn.commit()
-        
-        # 通知前端刷新动态页面
-        notify_page_refresh('dynamic', {'updated': True, 'notification_id': notification_id})
+        # 更新通知；详情页缓存失效和前端刷新通知在事务提交后执行
+        with transaction(conn) as tx:
+            tx.execute('''
+                UPDATE notifications 
+                SET title = ?, content = ?, raw_content = ?, excerpt = ?, 
+                    author = ?, category = ?, reading_time = ?, tags = ?, 
+                    status = ?, word_count = ?, card_style = ?, updated_at = ?
+                WHERE id = ?
+            ''', (
+                data['title'],
+                html_content,
+                raw_content,
+                excerpt,
+                data.get('author', 'ACM算法研究实验室'),
+                data.get('category', '实验室制度'),
+                reading_time,
+                data.get('tags', ''),
+                data.get('status', 'published'),
+                word_count,
+                card_style,
+                datetime.now(),
+                notification_id
+            ))
+            
+            tx.on_commit(notification_sequence.mark_stale, notification_id)
+            notify_page_refresh('dynamic', {'updated': True, 'notification_id': notification_id})
         
         return jsonify({"message": "通知更新成功"}), 200
         
@@ -493,6 +449,14 @@ def update_notification(notification_id):
         print(f"Error updating notification: {e}")
         return jsonify({"error": "更新通知失败"}), 500
 
+def remove_source_file(file_path):
+    """删除通知的源文件"""
+    try:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    except Exception as e:
+        print(f"删除源文件失败: {e}")
+
 @notifications_bp.route('/<int:notification_id>', methods=['DELETE'])
 def delete_notification(notification_id):
     """删除通知"""
@@ -509,24 +473,16 @@ def delete_notification(notification_id):
         if not notification:
             return jsonify({"error": "通知不存在"}), 404
         
-        # 删除关联的上传文件记录
-        conn.execute('DELETE FROM uploaded_files WHERE notification_id = ?', (notification_id,))
-        
-        # 删除通知
-        conn.execute('DELETE FROM notifications WHERE id = ?', (notification_id,))
-        conn.commit()
-        
-        # 如果有源文件，尝试删除
-        if notification['source_file']:
-            try:
+        # 上传文件记录和通知在同一事务中删除，提交成功后再清理缓存、源文件并通知前端
+        with transaction(conn) as tx:
+            tx.execute('DELETE FROM uploaded_files WHERE notification_id = ?', (notification_id,))
+            tx.execute('DELETE FROM notifications WHERE id = ?', (notification_id,))
+            
+            tx.on_commit(notification_sequence.mark_stale, notification_id)
+            if notification['source_file']:
                 file_path = os.path.join(current_app.root_path, 'static', notification['source_file'])
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                print(f"删除源文件失败: {e}")
-        
-        # 通知前端刷新动态页面
-        notify_page_refresh('dynamic', {'deleted': True, 'notification_id': notification_id})
+                tx.on_commit(remove_source_file, file_path)
+            tx.on_commit(notify_page_refresh, 'dynamic', {'deleted': True, 'notification_id': notification_id})
         
         return jsonify({"message": "通知删除成功"})
         
@@ -549,14 +505,9 @@ def reorder_notifications():
         
         conn = get_db()
         
-        # 更新排序
-        for index, notification_id in enumerate(notification_ids):
-            conn.execute(
-                'UPDATE notifications SET order_index = ?, updated_at = ? WHERE id = ?',
-                (index, datetime.now(), notification_id)
-            )
-        
-        conn.commit()
+        # 在单个事务中更新排序
+        apply_order(conn, 'notifications', notification_ids, start=0, updated_at=datetime.now())
+        notification_sequence.mark_stale()
         
         # 通知前端刷新动态页面
         notify_page_refresh('dynamic', {'reordered': True})
@@ -630,45 +581,46 @@ def upload_document():
         # 处理卡片样式配置（从表单数据获取，如果有的话）
         card_style = request.form.get('card_style', '')
         
-        # 保存到数据库
+        # 通知和上传文件记录在同一事务中写入
         conn = get_db()
-        cursor = conn.execute('''
-            INSERT INTO notifications (
-                title, content, raw_content, excerpt, author, category, reading_time,
-                status, source_type, source_file, word_count, card_style, publish_date
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            title,
-            html_content,
-            raw_content,
-            excerpt,
-            'ACM算法研究实验室',
-            category,
-            reading_time,
-            'published',
-            'upload',
-            f'uploads/notifications/{unique_filename}',
-            word_count,
-            card_style,
-            datetime.now()
-        ))
-        
-        notification_id = cursor.lastrowid
-        
-        # 记录上传文件信息
-        conn.execute('''
-            INSERT INTO uploaded_files (
-                stored_filename, original_filename, file_size, notification_id, upload_status
-            ) VALUES (?, ?, ?, ?, ?)
-        ''', (
-            unique_filename,
-            filename,
-            os.path.getsize(file_path),
-            notification_id,
-            'success'
-        ))
-        
-        conn.commit()
+        with transaction(conn) as tx:
+            cursor = tx.execute('''
+                INSERT INTO notifications (
+                    title, content, raw_content, excerpt, author, category, reading_time,
+                    status, source_type, source_file, word_count, card_style, publish_date
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                title,
+                html_content,
+                raw_content,
+                excerpt,
+                'ACM算法研究实验室',
+                category,
+                reading_time,
+                'published',
+                'upload',
+                f'uploads/notifications/{unique_filename}',
+                word_count,
+                card_style,
+                datetime.now()
+            ))
+            
+            notification_id = cursor.lastrowid
+            
+            # 记录上传文件信息
+            tx.execute('''
+                INSERT INTO uploaded_files (
+                    stored_filename, original_filename, file_size, notification_id, upload_status
+                ) VALUES (?, ?, ?, ?, ?)
+            ''', (
+                unique_filename,
+                filename,
+                os.path.getsize(file_path),
+                notification_id,
+                'success'
+            ))
+            
+            tx.on_commit(notification_sequence.mark_stale)
         
         return jsonify({
             "id": notification_id,
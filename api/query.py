@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+嵌套资源查询API
+GET /api/query?resource=papers&include=paper_categories,author_members&fields[papers]=id,title
+一次返回根资源及其嵌套关系，每层关系批量查询（见 nested_query）
+"""
+
+import logging
+
+from flask import Blueprint, jsonify, request
+
+from change_feed import journal_etag
+from nested_query import DEFAULT_LIMIT, QUERY_TABLES, NestedQuery, QueryError
+
+logger = logging.getLogger(__name__)
+
+query_bp = Blueprint('query', __name__, url_prefix='/api')
+
+
+@query_bp.route('/query', methods=['GET'])
+@journal_etag(*QUERY_TABLES)
+def nested_query():
+    """
+    嵌套资源查询（只读）
+
+    参数：
+    - resource: 根资源（papers、team_members、research_areas、paper_categories）
+    - include: 逗号分隔的关系路径，如 author_members.research_areas
+    - fields[资源名]: 该资源返回的字段
+    - ids: 逗号分隔的根记录ID；limit/offset: 根记录分页
+    """
+    try:
+        resource = request.args.get('resource', '').strip()
+        fields = {
+            key[len('fields['):-1]: value
+            for key, value in request.args.items()
+            if key.startswith('fields[') and key.endswith(']')
+        }
+        ids = request.args.get('ids')
+        ids = [item for item in ids.split(',') if item.strip()] if ids else None
+        try:
+            limit = int(request.args.get('limit', DEFAULT_LIMIT))
+            offset = int(request.args.get('offset', 0))
+        except ValueError:
+            raise QueryError('limit 和 offset 必须是整数')
+
+        query = NestedQuery(resource, include=request.args.get('include', ''), fields=fields)
+        data = query.run(ids=ids, limit=limit, offset=offset)
+    except QueryError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"嵌套查询失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    return jsonify({
+        'success': True,
+        'data': data,
+        'meta': {
+            'resource': resource,
+            'count': len(data),
+            'queries': query.loader.queries,
+            'rows': query.loader.rows,
+        },
+    })
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+通用排序引擎
+- apply_order / apply_positions: 在单个事务中用executemany一次性写入整个排列
+- move_item: 基于分数排序键把单个条目移动到两个条目之间，只更新一行
+- rebalance: 排序键间隙过小时把整张表重新编号为连续整数
+"""
+
+from flask import Blueprint, request, jsonify, session
+from db_utils import get_db, transaction
+from socket_utils import notify_page_refresh
+import logging
+
+logger = logging.getLogger(__name__)
+
+reorder_bp = Blueprint('reorder', __name__, url_prefix='/api/reorder')
+
+# 在SQL中直接使用数据库时间，与原有的 updated_at = CURRENT_TIMESTAMP 写法保持一致
+CURRENT_TIMESTAMP = object()
+
+# 相邻排序键的最小间隙，低于该值时触发重新编号
+MIN_RANK_GAP = 1e-6
+
+# 每张表分数移动的次数达到该值后自动重新编号，避免排序键精度持续下降
+REBALANCE_EVERY = 200
+
+# 可排序资源：资源名 -> (表名, 排序字段, 列表展示的次级排序, 刷新页面)
+REORDER_RESOURCES = {
+    'team': ('team_members', 'order_index', 'grade DESC, created_at DESC', 'team'),
+    'grades': ('grades', 'order_index', 'created_at DESC', 'team'),
+    'advisors': ('advisors', 'sort_order', 'created_at DESC', 'team'),
+    'research-areas': ('research_areas', 'order_index', 'created_at DESC', 'research'),
+    'papers': ('papers', 'order_index', 'updated_at DESC', 'papers'),
+    'notifications': ('notifications', 'order_index', 'publish_date DESC', 'dynamic'),
+    'algorithms': ('algorithms', 'order_index', 'created_at DESC', 'algorithms'),
+    'algorithm-awards': ('algorithm_awards', 'order_index', 'created_at DESC', 'algorithms'),
+    'project-overview': ('project_overview', 'order_index', 'created_at DESC', 'algorithms'),
+    'innovation-projects': ('innovation_projects', 'sort_order', 'created_at DESC', 'innovation'),
+    'innovation-stats': ('innovation_stats', 'sort_order', 'id ASC', 'innovation'),
+    'carousel': ('innovation_carousel', 'sort_order', 'id ASC', 'innovation'),
+    'achievements': ('achievements', 'sort_order', 'id ASC', 'innovation'),
+    'training-projects': ('innovation_training_projects', 'sort_order', 'id ASC', 'innovation'),
+    'intellectual-properties': ('intellectual_properties', 'sort_order', 'id ASC', 'innovation'),
+    'enterprise-cooperations': ('enterprise_cooperations', 'sort_order', 'id ASC', 'innovation'),
+}
+
+_moves_since_rebalance = {}
+
+
+def _set_clause(column, updated_at):
+    if updated_at is CURRENT_TIMESTAMP:
+        return f'{column} = ?, updated_at = CURRENT_TIMESTAMP', False
+    if updated_at is not None:
+        return f'{column} = ?, updated_at = ?', True
+    return f'{column} = ?', False
+
+
+def apply_positions(conn, table, positions, column='order_index', updated_at=None):
+    """
+    在单个事务中批量写入排序值
+
+    Args:
+        conn: 数据库连接
+        table (str): 表名
+        positions (list): [(id, 排序值), ...]
+        column (str): 排序字段名
+        updated_at: 同时写入的更新时间；CURRENT_TIMESTAMP 表示使用数据库时间，None 表示不更新
+
+    Returns:
+        int: 更新的行数
+    """
+    set_clause, bind_time = _set_clause(column, updated_at)
+    if bind_time:
+        params = [(rank, updated_at, item_id) for item_id, rank in positions]
+    else:
+        params = [(rank, item_id) for item_id, rank in positions]
+
+    with transaction(conn):
+        conn.executemany(f'UPDATE {table} SET {set_clause} WHERE id = ?', params)
+    _moves_since_rebalance[table] = 0
+    return len(params)
+
+
+def apply_order(conn, table, ids, column='order_index', start=1, updated_at=None):
+    """按ID列表的顺序从start开始连续编号，整个排列在一个事务中写入"""
+    return apply_positions(conn, table, [(item_id, start + index) for index, item_id in enumerate(ids)],
+                           column=column, updated_at=updated_at)
+
+
+def rebalance(conn, table, column='order_index', secondary_order='id ASC'):
+    """按当前展示顺序把排序键重新编号为 1..n"""
+    with transaction(conn):
+        rows = conn.execute(f'''
+            SELECT id FROM {table}
+            ORDER BY COALESCE({column}, 0) ASC, {secondary_order}
+        ''').fetchall()
+        ids = [row[0] for row in rows]
+        apply_order(conn, table, ids, column=column)
+    logger.info(f"{table} 排序键已重新编号，共{len(ids)}条")
+    return len(ids)
+
+
+def _rank_of(conn, table, column, item_id):
+    row = conn.execute(f'SELECT {column} FROM {table} WHERE id = ?', (item_id,)).fetchone()
+    if row is None:
+        raise ValueError(f"条目不存在: {item_id}")
+    return row[0]
+
+
+def _compute_rank(conn, table, column, prev_id, next_id):
+    """计算位于 prev_id 之后、next_id 之前的排序键，间隙不足时返回None"""
+    prev_rank = _rank_of(conn, table, column, prev_id) if prev_id is not None else None
+    next_rank = _rank_of(conn, table, column, next_id) if next_id is not None else None
+
+    if prev_rank is None and next_rank is None:
+        if prev_id is not None or next_id is not None:
+            return None  # 相邻条目排序键为空，需要先重新编号
+        row = conn.execute(f'SELECT COALESCE(MAX({column}), 0) FROM {table}').fetchone()
+        return row[0] + 1
+    if prev_rank is None:
+        return None if prev_id is not None else next_rank - 1
+    if next_rank is None:
+        return None if next_id is not None else prev_rank + 1
+    if next_rank - prev_rank < MIN_RANK_GAP * 2:
+        return None
+    return (prev_rank + next_rank) / 2
+
+
+def move_item(conn, table, item_id, prev_id=None, next_id=None, column='order_index',
+              secondary_order='id ASC'):
+    """
+    把条目移动到 prev_id 和 next_id 之间
+
+    正常情况下只更新被移动的一行；相邻排序键相同、为空或间隙过小时，
+    先在同一事务中重新编号整张表再计算新位置
+
+    Returns:
+        float|int: 条目新的排序键
+    """
+    if item_id in (prev_id, next_id):
+        raise ValueError("不能相对自身移动")
+
+    with transaction(conn):
+        _rank_of(conn, table, column, item_id)
+        rank = _compute_rank(conn, table, column, prev_id, next_id)
+        if rank is None:
+            rebalance(conn, table, column, secondary_order)
+            rank = _compute_rank(conn, table, column, prev_id, next_id)
+            if rank is None:
+                raise ValueError("相邻条目顺序无效")
+        if isinstance(rank, float) and rank.is_integer():
+            rank = int(rank)
+        conn.execute(f'UPDATE {table} SET {column} = ? WHERE id = ?', (rank, item_id))
+
+    # 定期重新编号，保持排序键为整数
+    moves = _moves_since_rebalance.get(table, 0) + 1
+    _moves_since_rebalance[table] = moves
+    if moves >= REBALANCE_EVERY:
+        rebalance(conn, table, column, secondary_order)
+    return rank
+
+
+def _resolve(resource):
+    spec = REORDER_RESOURCES.get(resource)
+    if spec is None:
+        return None, (jsonify({"error": f"不支持排序的资源: {resource}"}), 404)
+    return spec, None
+
+
+@reorder_bp.route('/<resource>/move', methods=['POST'])
+def move_resource_item(resource):
+    """
+    把单个条目移动到两个条目之间
+
+    请求体: {"id": 要移动的ID, "prev_id": 新位置前一条的ID, "next_id": 新位置后一条的ID}
+    移动到开头时省略prev_id，移动到末尾时省略next_id
+    """
+    if 'username' not in session or session.get('role') != 'admin':
+        return jsonify({"error": "未授权"}), 401
+
+    spec, error = _resolve(resource)
+    if error:
+        return error
+    table, column, secondary_order, page = spec
+
+    data = request.get_json() or {}
+    item_id = data.get('id')
+    if item_id is None:
+        return jsonify({"error": "缺少要移动的条目ID"}), 400
+
+    try:
+        with transaction() as tx:
+            rank = move_item(tx.conn, table, item_id, data.get('prev_id'), data.get('next_id'),
+                             column=column, secondary_order=secondary_order)
+            if table == 'notifications':
+                from notification_cache import notification_sequence
+                tx.on_commit(notification_sequence.mark_stale)
+            tx.on_commit(notify_page_refresh, page, {'action': 'moved', 'resource': resource, 'id': item_id})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"移动排序失败: {e}")
+        return jsonify({"error": f"排序更新失败: {str(e)}"}), 500
+
+    return jsonify({"success": True, "id": item_id, column: rank})
+
+
+@reorder_bp.route('/<resource>/rebalance', methods=['POST'])
+def rebalance_resource(resource):
+    """手动把资源的排序键重新编号为连续整数"""
+    if 'username' not in session or session.get('role') != 'admin':
+        return jsonify({"error": "未授权"}), 401
+
+    spec, error = _resolve(resource)
+    if error:
+        return error
+    table, column, secondary_order, _ = spec
+
+    try:
+        with get_db() as conn:
+            count = rebalance(conn, table, column, secondary_order)
+    except Exception as e:
+        logger.error(f"重新编号失败: {e}")
+        return jsonify({"error": f"重新编号失败: {str(e)}"}), 500
+    return jsonify({"success": True, "count": count})
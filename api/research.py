@@ -2,14 +2,17 @@
 
 from flask import Blueprint, request, jsonify
 from db_utils import get_db
+from data_source import data_source
+from change_feed import journal_etag
 import json
-import os
 from datetime import datetime
 from socket_utils import notify_page_refresh
+from .reorder import apply_order
 
 research_bp = Blueprint('research', __name__)
 
 @research_bp.route('/api/research', methods=['GET'])
+@journal_etag('research_areas')
 def get_research_areas():
     """获取研究领域列表，支持分页和分类筛选"""
     try:
@@ -17,161 +20,46 @@ def get_research_areas():
         per_page = int(request.args.get('per_page', 6))
         category = request.args.get('category', '')
         
-        # 检查是否在 Vercel 环境中
-        if os.environ.get('VERCEL'):
-            # Vercel 环境：返回Mock数据
-            mock_research_data = [
-                {
-                    'id': 1,
-                    'title': '机器学习与深度学习',
-                    'category': '人工智能',
-                    'description': '研究深度神经网络、强化学习、计算机视觉等前沿技术，致力于将AI技术应用于实际问题解决。',
-                    'members': ['张教授', '李博士', '王同学'],
-                    'order_index': 1,
-                    'created_at': '2024-01-01T00:00:00Z',
-                    'updated_at': '2024-01-01T00:00:00Z'
-                },
-                {
-                    'id': 2,
-                    'title': '算法设计与优化',
-                    'category': '理论计算机科学',
-                    'description': '专注于算法复杂度分析、数据结构优化、并行计算等理论与实践相结合的研究。',
-                    'members': ['陈教授', '刘同学'],
-                    'order_index': 2,
-                    'created_at': '2024-01-02T00:00:00Z',
-                    'updated_at': '2024-01-02T00:00:00Z'
-                },
-                {
-                    'id': 3,
-                    'title': '自然语言处理',
-                    'category': '人工智能',
-                    'description': '研究文本理解、语言生成、对话系统等NLP技术，推动人机交互的自然化发展。',
-                    'members': ['赵教授', '钱同学', '孙同学'],
-                    'order_index': 3,
-                    'created_at': '2024-01-03T00:00:00Z',
-                    'updated_at': '2024-01-03T00:00:00Z'
-                },
-                {
-                    'id': 4,
-                    'title': '大数据分析',
-                    'category': '数据科学',
-                    'description': '利用统计学习、数据挖掘等技术处理海量数据，发现数据中的规律和价值。',
-                    'members': ['周教授', '吴同学'],
-                    'order_index': 4,
-                    'created_at': '2024-01-04T00:00:00Z',
-                    'updated_at': '2024-01-04T00:00:00Z'
-                },
-                {
-                    'id': 5,
-                    'title': '计算机视觉',
-                    'category': '人工智能',
-                    'description': '研究图像识别、目标检测、图像生成等计算机视觉技术及其在各领域的应用。',
-                    'members': ['郑教授', '冯同学', '陈同学'],
-                    'order_index': 5,
-                    'created_at': '2024-01-05T00:00:00Z',
-                    'updated_at': '2024-01-05T00:00:00Z'
-                },
-                {
-                    'id': 6,
-                    'title': '软件工程与系统设计',
-                    'category': '软件工程',
-                    'description': '专注于大型软件系统架构设计、开发流程优化、软件质量保证等工程实践。',
-                    'members': ['何教授', '许同学'],
-                    'order_index': 6,
-                    'created_at': '2024-01-06T00:00:00Z',
-                    'updated_at': '2024-01-06T00:00:00Z'
-                }
-            ]
-            
-            # 分类筛选
-            if category and category != '全部':
-                mock_research_data = [item for item in mock_research_data if item['category'] == category]
-            
-            # 计算分页
-            total = len(mock_research_data)
-            total_pages = (total + per_page - 1) // per_page
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            paginated_data = mock_research_data[start_idx:end_idx]
-            
-            print(f"🔧 Vercel环境：返回研究领域Mock数据 {len(paginated_data)} 个")
-            return jsonify({
-                'success': True,
-                'data': paginated_data,
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': total,
-                    'total_pages': total_pages
-                }
-            })
+        # 构建查询条件（分页数据与总数使用同一条件）
+        where = {'category': category} if category and category != '全部' else None
+        
+        total = data_source.count('research_areas', where)
+        
+        # 计算分页
+        offset = (page - 1) * per_page
+        total_pages = (total + per_page - 1) // per_page
+        
+        areas = data_source.query(
+            'research_areas',
+            where=where,
+            order_by=[('order_index', 'ASC'), ('created_at', 'DESC')],
+            limit=per_page,
+            offset=offset,
+            columns=['id', 'title', 'category', 'description', 'members', 'order_index',
+                     'created_at', 'updated_at'],
+        )
+        
+        # 解析成员信息
+        for area in areas:
+            members = []
+            if area['members']:
+                try:
+                    members = json.loads(area['members'])
+                except (json.JSONDecodeError, TypeError):
+                    members = []
+            area['members'] = members
+        
+        return jsonify({
+            'success': True,
+            'data': areas,
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'total_pages': total_pages
+            }
+        })
         
-        # 本地环境：正常数据库查询
-        with get_db() as conn:
-            # 构建查询条件
-            where_clause = ""
-            params = []
-            
-            if category and category != '全部':
-                where_clause = "WHERE category = ?"
-                params.append(category)
-            
-            # 获取总数
-            count_sql = f"SELECT COUNT(*) FROM research_areas {where_clause}"
-            cursor = conn.execute(count_sql, params)
-            total = cursor.fetchone()[0]
-            
-            # 计算分页
-            offset = (page - 1) * per_page
-            total_pages = (total + per_page - 1) // per_page
-            
-            # 获取分页数据
-            sql = f"""
-                SELECT id, title, category, description, members, order_index, 
-                       created_at, updated_at
-                FROM research_areas 
-                {where_clause}
-                ORDER BY order_index ASC, created_at DESC
-                LIMIT ? OFFSET ?
-            """
-            params.extend([per_page, offset])
-            
-            cursor = conn.execute(sql, params)
-            areas = cursor.fetchall()
-            
-            # 格式化数据
-            research_data = []
-            for area in areas:
-                # 解析成员信息
-                members = []
-                if area[4]:  # members字段
-                    try:
-                        members = json.loads(area[4]) if area[4] else []
-                    except (json.JSONDecodeError, TypeError):
-                        members = []
-                
-                research_data.append({
-                    'id': area[0],
-                    'title': area[1],
-                    'category': area[2],
-                    'description': area[3],
-                    'members': members,
-                    'order_index': area[5],
-                    'created_at': area[6],
-                    'updated_at': area[7]
-                })
-            
-            return jsonify({
-                'success': True,
-                'data': research_data,
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': total,
-                    'total_pages': total_pages
-                }
-            })
-            
     except Exception as e:
         print(f"获取研究领域失败: {e}")
         return jsonify({
@@ -388,11 +276,8 @@ def reorder_research_areas():
             }), 400
         
         with get_db() as conn:
-            # 批量更新排序索引
-            for index, area_id in enumerate(area_ids):
-                conn.execute('UPDATE research_areas SET order_index = ? WHERE id = ?', (index + 1, area_id))
-            
-            conn.commit()
+            # 在单个事务中批量更新排序索引
+            apply_order(conn, 'research_areas', area_ids)
             
             # 通知前端更新
             notify_page_refresh('research', {
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+真实用户性能监控API
+- POST /api/rum：接收 performance-monitor.js 用 sendBeacon 批量上报的页面性能数据
+- GET /api/admin/rum：管理后台查看各页面的 p75 LCP、TTFB 和最慢的静态资源
+"""
+
+import json
+import logging
+
+from flask import Blueprint, jsonify, request, session
+
+from rum import MAX_BODY_BYTES, rum
+
+logger = logging.getLogger(__name__)
+
+rum_bp = Blueprint('rum', __name__, url_prefix='/api')
+
+
+def _is_admin():
+    return 'username' in session and session.get('role') == 'admin'
+
+
+@rum_bp.route('/rum', methods=['POST'])
+def ingest_rum():
+    """
+    接收性能上报
+
+    请求体为JSON（sendBeacon 以 text/plain 发送，不按Content-Type判断）：
+    {"beacons": [{"page": "/team", "nav": {"ttfb": 120, "lcp": 900}, "resources": [{"name": "...", "duration": 35}]}]}
+    单条上报也可以直接作为请求体
+    """
+    if (request.content_length or 0) > MAX_BODY_BYTES:
+        return jsonify({"error": "上报数据过大"}), 413
+
+    try:
+        payload = json.loads(request.get_data(cache=False, as_text=True) or 'null')
+    except ValueError:
+        return jsonify({"error": "上报数据不是有效的JSON"}), 400
+
+    if isinstance(payload, dict) and 'beacons' in payload:
+        beacons = payload['beacons']
+    else:
+        beacons = [payload]
+    if not isinstance(beacons, list):
+        return jsonify({"error": "beacons 必须是数组"}), 400
+
+    result = rum.ingest(beacons, origin_host=request.host)
+    logger.debug(f"RUM上报: {result}")
+    # sendBeacon 不读取响应体
+    return '', 204
+
+
+@rum_bp.route('/admin/rum', methods=['GET'])
+def get_rum_summary():
+    """各页面导航指标的分位数（默认p75）与最慢的静态资源"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    try:
+        pct = min(max(float(request.args.get('pct', 75)), 1), 99)
+        top = min(max(int(request.args.get('top', 10)), 1), 50)
+    except ValueError:
+        return jsonify({"error": "参数格式不正确"}), 400
+    return jsonify(rum.summary(pct, top))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+系统状态API
+为管理后台提供数据库统计、性能指标等运行状态信息
+"""
+
+from flask import Blueprint, Response, request, jsonify, session
+from db_utils import get_db, get_db_path
+import db_stats
+import hmac
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+system_bp = Blueprint('system', __name__, url_prefix='/api/admin')
+
+# Prometheus抓取地址不在 /api 下，单独使用一个蓝图
+metrics_bp = Blueprint('metrics', __name__)
+
+# Prometheus等抓取程序无法登录后台，可通过 Authorization: Bearer <METRICS_TOKEN> 访问指标
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+
+def _is_admin():
+    return 'username' in session and session.get('role') == 'admin'
+
+
+@system_bp.route('/db-stats', methods=['GET'])
+def get_db_stats():
+    """
+    数据库统计信息：各表行数（触发器维护的计数）、页数和字节占用
+
+    refresh=1 时先用COUNT(*)重新校准计数
+    """
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    try:
+        with get_db() as conn:
+            if request.args.get('refresh') == '1':
+                db_stats.refresh_counters(conn)
+            db_path = get_db_path()
+            stats = db_stats.database_stats(conn, None if db_path == ':memory:' else db_path)
+        return jsonify(stats)
+    except Exception as e:
+        logger.error(f"获取数据库统计失败: {e}")
+        return jsonify({"error": f"获取数据库统计失败: {str(e)}"}), 500
+
+
+@system_bp.route('/sql-trace', methods=['GET'])
+def get_sql_trace():
+    """最近的慢查询和可能的N+1查询"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    from sql_trace import tracer, SLOW_QUERY_MS, N_PLUS_ONE_THRESHOLD
+    return jsonify({
+        'slow_query_ms': SLOW_QUERY_MS,
+        'n_plus_one_threshold': N_PLUS_ONE_THRESHOLD,
+        'slow_queries': list(tracer.recent_slow),
+        'n_plus_one': list(tracer.recent_n_plus_one),
+    })
+
+
+def _metrics_authorized():
+    if _is_admin():
+        return True
+    auth = request.headers.get('Authorization', '')
+    if METRICS_TOKEN and auth.startswith('Bearer '):
+        return hmac.compare_digest(auth[len('Bearer '):].strip(), METRICS_TOKEN)
+    return False
+
+
+@metrics_bp.route('/admin/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus文本格式的性能指标（请求耗时、SQL次数与耗时、响应大小、缓存命中率）"""
+    if not _metrics_authorized():
+        return jsonify({"error": "未授权"}), 401
+
+    from metrics import registry
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -5,143 +5,39 @@
 """
 
 from flask import Blueprint, request, jsonify, abort, session
-from db_utils import get_db
+from db_utils import get_db, transaction
+from .reorder import apply_order
+from projection import parse_fields
+from sections import group_team_members, query_team_members, section_response
+from change_feed import journal_etag
 # from socket_utils import notify_page_refresh
 import logging
 import json
-import os
 from datetime import datetime
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 team_bp = Blueprint('team', __name__)
 
 @team_bp.route('/api/team', methods=['GET'])
+@journal_etag('team_members')
 def get_team_members():
     """获取所有团队成员，按年级分组"""
     try:
-        # 检查是否在 Vercel 环境中
-        if os.environ.get('VERCEL'):
-            # Vercel 环境：返回Mock数据
-            mock_data = [
-                {
-                    'grade': '2024级',
-                    'members': [
-                        {
-                            'id': 1,
-                            'name': '张教授',
-                            'position': '实验室主任',
-                            'role': '实验室主任',
-                            'desc': '专注于机器学习和人工智能研究，在计算机视觉领域有深入研究',
-                            'description': '专注于机器学习和人工智能研究，在计算机视觉领域有深入研究',
-                            'img': '/static/images/team/professor_zhang.jpg',
-                            'image_url': '/static/images/team/professor_zhang.jpg',
-                            'qq': '',
-                            'wechat': '',
-                            'email': 'zhang@example.com',
-                            'group_name': '算法组',
-                            'status': '在职',
-                            'grade': '2024级',
-                            'order_index': 1
-                        },
-                        {
-                            'id': 2,
-                            'name': '李博士',
-                            'position': '副教授',
-                            'role': '副教授',
-                            'desc': '专注于深度学习算法优化和自然语言处理技术研究',
-                            'description': '专注于深度学习算法优化和自然语言处理技术研究',
-                            'img': '/static/images/team/dr_li.jpg',
-                            'image_url': '/static/images/team/dr_li.jpg',
-                            'qq': '',
-                            'wechat': '',
-                            'email': 'li@example.com',
-                            'group_name': '算法组',
-                            'status': '在职',
-                            'grade': '2024级',
-                            'order_index': 2
-                        }
-                    ]
-                },
-                {
-                    'grade': '2023级',
-                    'members': [
-                        {
-                            'id': 3,
-                            'name': '王同学',
-                            'position': '博士生',
-                            'role': '博士生',
-                            'desc': '研究方向为计算机视觉和图像处理',
-                            'description': '研究方向为计算机视觉和图像处理',
-                            'img': '/static/images/team/wang_student.jpg',
-                            'image_url': '/static/images/team/wang_student.jpg',
-                            'qq': '',
-                            'wechat': '',
-                            'email': 'wang@example.com',
-                            'group_name': '算法组',
-                            'status': '在职',
-                            'grade': '2023级',
-                            'order_index': 3
-                        }
-                    ]
-                }
-            ]
-            print("🔧 Vercel环境：返回团队成员Mock数据")
-            return jsonify(mock_data)
+        # 默认卡片投影直接使用首页共用的分区快照，?fields= 指定字段时单独查询
+        if not request.args.get('fields', '').strip():
+            return section_response('team'), 200
+        try:
+            columns = parse_fields('team_members')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # 本地环境：正常数据库查询
-        with get_db() as conn:
-            # 修改排序逻辑：优先按order_index排序，然后按年级和创建时间
-            cursor = conn.execute('''
-                SELECT * FROM team_members 
-                ORDER BY COALESCE(order_index, 999999) ASC, grade DESC, created_at DESC
-            ''')
-            all_members = cursor.fetchall()
-            
-            # 按年级分组
-            grade_groups = {}
-            for member in all_members:
-                member_dict = dict(member)
-                grade = member_dict.get('grade') or '2024级'
-                
-                if grade not in grade_groups:
-                    grade_groups[grade] = []
-                
-                grade_groups[grade].append({
-                    'id': member_dict['id'],
-                    'name': member_dict['name'] or '',
-                    'position': member_dict['position'] or '',
-                    'role': member_dict['position'] or '',
-                    'desc': member_dict['description'] or '',
-                    'description': member_dict['description'] or '',
-                    'img': member_dict['image_url'] or '',
-                    'image_url': member_dict['image_url'] or '',
-                    'qq': member_dict['qq'] or '',
-                    'wechat': member_dict['wechat'] or '',
-                    'email': member_dict['email'] or '',
-                    'grade': grade,
-                    'order_index': member_dict['order_index'] if member_dict['order_index'] is not None else 0,
-                    'created_at': member_dict['created_at'],
-                    'updated_at': member_dict['updated_at']
-                })
-            
-            # 转换为前端期望的格式
-            grade_data = []
-            for grade, members in grade_groups.items():
-                # 确保每个年级内的成员也按order_index排序
-                members.sort(key=lambda x: x.get('order_index', 0))
-                grade_data.append({
-                    'grade': grade,
-                    'members': members
-                })
-            
-            # 按年级名称降序排序
-            grade_data.sort(key=lambda x: x['grade'], reverse=True)
-            
-            logger.info(f"获取团队成员成功，共{len(grade_data)}个年级，{len(all_members)}个成员")
-            return jsonify(grade_data), 200
+        # 优先按order_index排序，然后按年级和创建时间；按年级分组为前端期望的格式
+        all_members = query_team_members(columns)
+        grade_data = group_team_members(all_members)
+        
+        logger.info(f"获取团队成员成功，共{len(grade_data)}个年级，{len(all_members)}个成员")
+        return jsonify(grade_data), 200
     except Exception as e:
         logger.error(f"获取团队成员失败: {e}")
         import traceback
@@ -407,24 +303,14 @@ def reorder_team_members():
                 logger.warning(f"部分成员ID不存在: {missing_ids}")
                 return jsonify({"error": f"部分成员ID不存在: {missing_ids}"}), 400
             
-            # 批量更新排序
-            for index, member_id in enumerate(member_ids):
-                new_order = index + 1
-                conn.execute('UPDATE team_members SET order_index = ?, updated_at = ? WHERE id = ?', 
-                           (new_order, datetime.now().isoformat(), member_id))
-                logger.debug(f"更新成员ID {member_id} 的排序为 {new_order}")
-            
-            conn.commit()
-            
-            logger.info(f"团队成员排序更新成功，共{len(member_ids)}个成员")
-            
-            # 通知前端刷新
-            try:
-                from socket_utils import notify_page_refresh
+            # 在单个事务中批量更新排序，刷新通知随事务提交后发出
+            from socket_utils import notify_page_refresh
+            with transaction(conn):
+                apply_order(conn, 'team_members', member_ids, updated_at=datetime.now().isoformat())
                 notify_page_refresh('team', {'action': 'reordered', 'member_ids': member_ids})
                 notify_page_refresh('home', {'action': 'reordered', 'member_ids': member_ids})
-            except Exception as e:
-                logger.warning(f"通知前端刷新失败: {e}")
+            
+            logger.info(f"团队成员排序更新成功，共{len(member_ids)}个成员")
             
             return jsonify({"success": True, "message": "排序更新成功"})
             
@@ -436,6 +322,7 @@ def reorder_team_members():
 
 # 研究领域管理API
 @team_bp.route('/api/research-areas', methods=['GET'])
+@journal_etag('research_areas')
 def get_research_areas():
     """获取所有研究领域"""
     try:
@@ -623,11 +510,8 @@ def reorder_research_areas():
             return jsonify({"error": "排序数据格式错误"}), 400
         
         with get_db() as conn:
-            # 批量更新排序
-            for index, area_id in enumerate(area_ids):
-                conn.execute('UPDATE research_areas SET order_index = ? WHERE id = ?', (index + 1, area_id))
-            
-            conn.commit()
+            # 在单个事务中批量更新排序
+            apply_order(conn, 'research_areas', area_ids)
             
             logger.info(f"研究领域排序更新成功，共{len(area_ids)}个领域")
             
@@ -1,25 +1,21 @@
 # Flask Web应用 - ACM实验室官网与后台管理系统
 
-import secrets
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session, send_from_directory, send_file, abort
+from flask import render_template, request, redirect, url_for, jsonify, session, send_from_directory, send_file, abort
 import os
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import timedelta
 from werkzeug.utils import secure_filename
 import sqlite3
 import json
+import logging
 from datetime import datetime
-from flask import Blueprint
-from flask_socketio import SocketIO, emit
-# 暂时注释掉有问题的API导入
-from api.innovation import innovation_bp
-# from api.notifications import notifications_bp
-# from api.analytics import analytics_bp
+from app_factory import create_app, is_vercel as _is_vercel
+from log_config import SAMPLED
 
 # 添加缓存装饰器导入
 from functools import lru_cache
 import time
 
+logger = logging.getLogger(__name__)
+
 # 认证装饰器
 def require_auth(f):
     """要求用户认证的装饰器，支持自动登录"""
@@ -149,18 +145,17 @@ def get_paper_by_id(paper_id: int):
         
         paper_dict = dict(paper)
         
-        # 获取论文的类别信息
-        category_relations = conn.execute("SELECT * FROM paper_category_relations WHERE paper_id = ?", (paper_id,)).fetchall()
-        categories = []
-        category_names = []
-        category_levels = []
-        
-        for relation in category_relations:
-            category = conn.execute("SELECT * FROM paper_categories WHERE id = ?", (relation['category_id'],)).fetchone()
-            if category:
-                categories.append(category['id'])
-                category_names.append(category['name'])
-                category_levels.append(category['level'])
+        # 获取论文的类别信息（一次关联查询）
+        category_rows = conn.execute('''
+            SELECT c.id, c.name, c.level
+            FROM paper_category_relations r
+            JOIN paper_categories c ON c.id = r.category_id
+            WHERE r.paper_id = ?
+            ORDER BY r.id
+        ''', (paper_id,)).fetchall()
+        categories = [row['id'] for row in category_rows]
+        category_names = [row['name'] for row in category_rows]
+        category_levels = [row['level'] for row in category_rows]
         
         paper_dict['categories'] = categories
         paper_dict['category_names'] = category_names
@@ -292,77 +287,37 @@ def delete_paper(paper_id: int):
 def reorder_papers(paper_ids: list):
     """重新排序论文"""
     from db_utils import get_db
+    from api.reorder import apply_order
     
     with get_db() as conn:
-        for index, paper_id in enumerate(paper_ids):
-            conn.execute('UPDATE papers SET order_index = ? WHERE id = ?', (index + 1, paper_id))
-        conn.commit()
+        apply_order(conn, 'papers', paper_ids)
     
     # 清理缓存，确保下次获取数据时是最新的排序
     get_all_papers.cache_clear()
-    print(f"✅ 论文排序已更新，缓存已清理")
+    logger.info("论文排序已更新，缓存已清理")
 
-app = Flask(__name__)
-app.config.update(
-    SECRET_KEY=os.environ.get('SECRET_KEY', secrets.token_hex(16)),
-    PERMANENT_SESSION_LIFETIME=timedelta(days=1),
-    SESSION_REFRESH_EACH_REQUEST=True,
-    JSON_AS_ASCII=False,  # 确保JSON中的中文字符正确显示
-    SEND_FILE_MAX_AGE_DEFAULT=31536000,  # 启用静态文件缓存，1年过期
-)
+# 应用工厂负责配置、实时通信扩展和API蓝图注册
+app = create_app(__name__)
+socketio = app.extensions['socketio']
 
 # 数据库配置 - 统一使用原生sqlite3
 DATABASE = 'acm_lab.db'
 
-# 移除SQLAlchemy配置
-# app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{DATABASE}'
-# app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# 移除SQLAlchemy初始化
-# db.init_app(app)
-
-# 初始化SocketIO - 检测环境
-import os
-is_vercel = os.environ.get('VERCEL') or os.environ.get('VERCEL_ENV')
-
-if is_vercel:
-    # 在Vercel环境中创建一个虚拟SocketIO对象
-    print("🔧 检测到Vercel环境，创建SocketIO兼容对象")
-    class MockSocketIO:
-        def __init__(self, app, **kwargs):
-            pass
-        def emit(self, event, data, **kwargs):
-            print(f"Mock SocketIO emit: {event}")
-        def on(self, event):
-            def decorator(f):
-                return f
-            return decorator
-        def init_app(self, app, **kwargs):
-            pass
-        def run(self, app, **kwargs):
-            app.run(**kwargs)
-    
-    socketio = MockSocketIO(app, cors_allowed_origins="*")
-else:
-    # 本地开发环境使用真实SocketIO
-    print("🚀 本地环境，初始化真实SocketIO")
-    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', logger=True, engineio_logger=True)
-
-app.extensions['socketio'] = socketio
+is_vercel = _is_vercel()
 
 # WebSocket事件处理
 @socketio.on('connect')
 def handle_connect():
     """客户端连接时触发"""
-    print(f"客户端已连接: {request.sid}")
-    from flask_socketio import join_room
+    logger.debug("客户端已连接: %s", request.sid, extra=SAMPLED)
+    from flask_socketio import emit, join_room
     join_room('default')
     emit('connected', {'data': '连接成功'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """客户端断开连接时触发"""
-    print(f"客户端已断开: {request.sid}")
+    logger.debug("客户端已断开: %s", request.sid, extra=SAMPLED)
     from flask_socketio import leave_room, rooms
     # 从所有房间中移除客户端
     current_rooms = list(rooms())
@@ -374,8 +329,8 @@ def handle_disconnect():
 def handle_join_page(data):
     """客户端加入特定页面"""
     page = data.get('page', 'home')
-    print(f"客户端 {request.sid} 加入页面: {page}")
-    from flask_socketio import join_room, leave_room, rooms
+    logger.debug("客户端 %s 加入页面: %s", request.sid, page, extra=SAMPLED)
+    from flask_socketio import emit, join_room, leave_room, rooms
     # 先离开之前的页面房间
     current_rooms = list(rooms())
     for room in current_rooms:
@@ -392,42 +347,21 @@ def notify_page_refresh(page_type, data=None):
         from socket_utils import notify_page_refresh as notify
         notify(page_type, data)
     except Exception as e:
-        print(f"通知页面刷新失败: {e}")
+        logger.warning(f"通知页面刷新失败: {e}")
         # 暂时忽略通知错误，不影响主要功能
         pass
 
 # 使用独立的数据库工具模块
 from db_utils import get_db, init_db
+# 前端页面整页缓存
+from page_cache import cached_page
+from change_feed import journal_etag
+# 页面首屏数据与前端接口共用的分区快照
+from sections import initial_data, page_tables, section_response
+# 通知导航序列与详情页缓存
+from notification_cache import notification_sequence
 
-# 注册API蓝图
-# 按照优先级逐步恢复API功能
-# 1. 核心的团队成员管理API
-from api.team import team_bp
-from api.grades import grades_bp
-
-# 2. 算法管理API
-from api.algorithm import algorithm_bp
-
-# 3. 创新项目和统计API
-from api.innovation import innovation_bp
-from api.innovation_project import innovation_project_bp
-from api.advisor import advisor_bp
-from api.notifications import notifications_bp
-from api.research import research_bp  # 研究领域API
-# from api.analytics import analytics_bp
-
-# 注册所有API蓝图
-app.register_blueprint(team_bp)  # 团队成员管理API
-app.register_blueprint(grades_bp)  # 年级管理API
-app.register_blueprint(algorithm_bp)  # 算法管理API
-app.register_blueprint(innovation_bp)  # 创新统计和前端数据API
-app.register_blueprint(innovation_project_bp)  # 创新项目API
-app.register_blueprint(advisor_bp, url_prefix='/api')  # 指导老师API
-app.register_blueprint(notifications_bp)  # 通知管理API
-app.register_blueprint(research_bp)  # 研究领域API
-# app.register_blueprint(analytics_bp, url_prefix='/api/analytics')  # 访问统计API
-
-print("✅ 所有API蓝图已注册")
+# API蓝图由 app_factory.create_app 注册
 
 @app.before_request
 def ensure_permanent_session():
@@ -490,11 +424,14 @@ def add_header(response):
         if request.endpoint == 'static':
             response.cache_control.max_age = 31536000  # 1年
             response.cache_control.public = True
+        # 视图已声明 no-cache（按数据版本带ETag，每次验证）或 no-store（变更通道等按游标返回的响应）时不再覆盖
+        elif response.cache_control.no_cache or response.cache_control.no_store:
+            pass
         # API响应短期缓存
         elif request.path.startswith('/api/'):
             response.cache_control.max_age = 300  # 5分钟
             response.cache_control.public = True
-        # 页面缓存
+        # 页面缓存（嵌入了首屏数据的页面每次验证，见 page_cache.cached_page）
         else:
             response.cache_control.max_age = 1800  # 30分钟
             response.cache_control.public = True
@@ -570,6 +507,7 @@ research_data = []
 
 # 实验室官网首页路由
 @app.route('/')
+@cached_page('frontend/index.html')
 def index():
     """实验室官网首页"""
     return render_template('frontend/index.html')
@@ -620,6 +558,7 @@ def admin_index():
 
 # 前端展示首页路由
 @app.route('/frontend')
+@cached_page('frontend/index.html')
 def frontend_index():
     """前端展示首页"""
     return render_template('frontend/index.html')
@@ -644,157 +583,131 @@ def admin_home_page():
 
 # 前端页面路由
 @app.route('/algorithm')
+@cached_page('frontend/algorithm.html', tables=page_tables('algorithm'))
 def algorithm():
-    return render_template('frontend/algorithm.html')
+    return render_template('frontend/algorithm.html', initial_data=initial_data('algorithm'))
 
 @app.route('/test-api')
 def test_api():
     return send_file('test_api.html')
 
 @app.route('/matrix')
+@cached_page('frontend/matrix.html')
 def matrix():
     return render_template('frontend/matrix.html')
 
 @app.route('/blog-details')
+@cached_page('frontend/Blog details.html')
 def blog_details():
     return render_template('frontend/Blog details.html')
 
+def format_notification_content(content):
+    """将通知内容转换为可直接渲染的HTML"""
+    try:
+        from api.notifications import markdown_to_html, is_markdown_content
+        
+        # 智能检测markdown内容并转换
+        if is_markdown_content(content):
+            return markdown_to_html(content)
+        # 如果不是markdown但包含HTML标签，直接使用
+        if '<' in content and '>' in content:
+            return content
+        # 简单文本格式化
+        content = content.replace('\n\n', '</p><p>')
+        content = content.replace('\n', '<br>')
+        return f'<p>{content}</p>'
+    except Exception as e:
+        logger.warning(f"通知内容处理出错: {e}")
+        # 如果处理失败，保持原内容
+        return content
+
+def format_publish_date(pd):
+    """将发布日期格式化为中文日期"""
+    if not pd:
+        return ''
+    
+    dt_obj = None
+    try:
+        # 若为字符串，尝试解析为 datetime
+        if isinstance(pd, str):
+            try:
+                dt_obj = datetime.fromisoformat(pd)
+            except Exception:
+                try:
+                    dt_obj = datetime.strptime(pd, '%Y-%m-%d %H:%M:%S')
+                except Exception:
+                    dt_obj = None
+        else:
+            dt_obj = pd
+    except Exception:
+        dt_obj = None
+    
+    if dt_obj:
+        return dt_obj.strftime('%Y年%m月%d日')
+    
+    # 退化处理：仅取日期部分并做中文格式化
+    try:
+        date_part = str(pd).split(' ')[0]
+        y, m, d = date_part.split('-')
+        return f"{int(y)}年{int(m)}月{int(d)}日"
+    except Exception:
+        return str(pd)
+
 @app.route('/notification/<int:notification_id>')
 def notification_detail(notification_id):
     """通知详情页面"""
     try:
-        print(f"🔍 尝试加载通知详情: ID={notification_id}")
-        
         with get_db() as conn:
-            cursor = conn.execute('SELECT * FROM notifications WHERE id = ?', (notification_id,))
-            notification = cursor.fetchone()
-            
-            print(f"📊 数据库查询结果: {notification is not None}")
+            # 通知表有变化时先刷新预计算序列和详情页缓存
+            notification_sequence.sync(conn)
             
-            if not notification:
-                print(f"❌ 通知不存在: ID={notification_id}")
-                # 如果通知不存在，返回404页面或重定向到动态页面
+            # 仅允许已发布的通知访问（预计算序列中只包含已发布通知）
+            if notification_sequence.get(notification_id) is None:
+                logger.debug("通知不存在或未发布: ID=%s", notification_id, extra=SAMPLED)
                 return redirect(url_for('dynamic'))
             
-            print(f"📋 通知状态: {notification['status']}")
-            
-            # 仅允许已发布的通知访问
-            if notification['status'] != 'published':
-                print(f"❌ 通知未发布: ID={notification_id}, status={notification['status']}")
-                return redirect(url_for('dynamic'))
-                
             # 增加浏览量
             conn.execute('UPDATE notifications SET view_count = view_count + 1 WHERE id = ?', (notification_id,))
             conn.commit()
             
-            # 将数据库行转换为字典
-            notification_data = dict(notification)
-            print(f"✅ 通知数据准备完成: {notification_data.get('title', 'Unknown')}")
-            
-            # 处理Markdown内容转换为HTML
-            if notification_data.get('content'):
-                try:
-                    from api.notifications import markdown_to_html, is_markdown_content
-                    content = notification_data['content']
-                    
-                    # 智能检测markdown内容并转换
-                    if is_markdown_content(content):
-                        notification_data['content'] = markdown_to_html(content)
-                        print("📝 Markdown内容已转换")
-                    # 如果不是markdown但包含HTML标签，直接使用
-                    elif '<' in content and '>' in content:
-                        print("📝 检测到HTML内容，直接使用")
-                        pass  # 保持HTML内容不变
-                    else:
-                        # 简单文本格式化
-                        content = content.replace('\n\n', '</p><p>')
-                        content = content.replace('\n', '<br>')
-                        notification_data['content'] = f'<p>{content}</p>'
-                        print("📝 文本内容已格式化")
-                except Exception as e:
-                    print(f"⚠️ 内容处理出错: {e}")
-                    # 如果处理失败，保持原内容
-                    pass
-            
-            # 获取上一篇和下一篇通知（按order_index和publish_date排序，与API端点保持一致）
-            # 处理order_index字段，如果为None则使用0
-            order_index = notification_data.get('order_index', 0) or 0
-            publish_date = notification_data.get('publish_date')
-            
-            # 获取上一篇（在列表中位置更靠前的：order_index更小的，或相同order_index但publish_date更新的）
-            prev_cursor = conn.execute('''
-                SELECT id, title, excerpt FROM notifications 
-                WHERE status = 'published' AND (
-                    (COALESCE(order_index, 0) < ? OR (COALESCE(order_index, 0) = ? AND publish_date > ?))
-                )
-                ORDER BY COALESCE(order_index, 0) DESC, publish_date ASC 
-                LIMIT 1
-            ''', (order_index, order_index, publish_date))
-            prev_notification = prev_cursor.fetchone()
-            
-            # 获取下一篇（在列表中位置更靠后的：order_index更大的，或相同order_index但publish_date更早的）
-            next_cursor = conn.execute('''
-                SELECT id, title, excerpt FROM notifications 
-                WHERE status = 'published' AND (
-                    (COALESCE(order_index, 0) > ? OR (COALESCE(order_index, 0) = ? AND publish_date < ?))
-                )
-                ORDER BY COALESCE(order_index, 0) ASC, publish_date DESC 
-                LIMIT 1
-            ''', (order_index, order_index, publish_date))
-            next_notification = next_cursor.fetchone()
-            
-            print(f"📄 导航链接: 上一篇={prev_notification is not None}, 下一篇={next_notification is not None}")
-            
-            # 处理发布日期格式化
-            publish_date_str = ''
-            pd = notification_data.get('publish_date')
-            if pd:
-                dt_obj = None
-                try:
-                    # 若为字符串，尝试解析为 datetime
-                    if isinstance(pd, str):
-                        try:
-                            dt_obj = datetime.fromisoformat(pd)
-                        except Exception:
-                            try:
-                                dt_obj = datetime.strptime(pd, '%Y-%m-%d %H:%M:%S')
-                            except Exception:
-                                dt_obj = None
-                    else:
-                        dt_obj = pd
-                except Exception:
-                    dt_obj = None
-                
-                if dt_obj:
-                    publish_date_str = dt_obj.strftime('%Y年%m月%d日')
-                else:
-                    # 退化处理：仅取日期部分并做中文格式化
-                    try:
-                        date_part = str(pd).split(' ')[0]
-                        y, m, d = date_part.split('-')
-                        publish_date_str = f"{int(y)}年{int(m)}月{int(d)}日"
-                    except Exception:
-                        publish_date_str = str(pd)
-            
-            print(f"📅 发布日期: {publish_date_str}")
-            print(f"🎯 准备渲染模板...")
+            # 命中详情页缓存时直接返回，无需再查询和渲染
+            html = notification_sequence.get_page(notification_id)
+            if html is not None:
+                return html
             
-            return render_template('frontend/notification_detail.html', 
-                                 notification=notification_data, 
-                                 publish_date_str=publish_date_str,
-                                 prev_notification=dict(prev_notification) if prev_notification else None,
-                                 next_notification=dict(next_notification) if next_notification else None)
+            notification = conn.execute('SELECT * FROM notifications WHERE id = ?', (notification_id,)).fetchone()
+            if not notification:
+                return redirect(url_for('dynamic'))
+        
+        # 将数据库行转换为字典
+        notification_data = dict(notification)
+        
+        # 处理Markdown内容转换为HTML
+        if notification_data.get('content'):
+            notification_data['content'] = format_notification_content(notification_data['content'])
+        
+        # 上一篇和下一篇直接从预计算序列中获取
+        prev_notification, next_notification = notification_sequence.neighbours(notification_id)
+        publish_date_str = format_publish_date(notification_data.get('publish_date'))
+        
+        html = render_template('frontend/notification_detail.html', 
+                               notification=notification_data, 
+                               publish_date_str=publish_date_str,
+                               prev_notification=prev_notification,
+                               next_notification=next_notification)
+        notification_sequence.store_page(notification_id, html)
+        return html
     except Exception as e:
-        print(f"❌ Error loading notification detail: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"加载通知详情失败: ID={notification_id}")
         return redirect(url_for('dynamic'))
 
 @app.route('/dynamic')
+@cached_page('frontend/dynamic.html', tables=page_tables('dynamic'))
 def dynamic():
-    return render_template('frontend/dynamic.html')
+    return render_template('frontend/dynamic.html', initial_data=initial_data('dynamic'))
 
 @app.route('/introduction')
+@cached_page('frontend/Introduction to the Laboratory.html')
 def introduction():
     return render_template('frontend/Introduction to the Laboratory.html')
 
@@ -803,30 +716,30 @@ def charter():
     return render_template('frontend/Laboratory Charter.html')
 
 @app.route('/paper')
+@cached_page('frontend/paper.html', tables=page_tables('papers'))
 def paper():
-    """论文页面"""
-    try:
-        papers = get_all_papers()
-        return render_template('frontend/paper.html', papers=papers)
-    except Exception as e:
-        print(f"Error loading papers for frontend: {e}")
-        return render_template('frontend/paper.html', papers=[])
+    """论文页面（嵌入首屏论文数据）"""
+    return render_template('frontend/paper.html', initial_data=initial_data('papers'))
 
 @app.route('/project-recruitment')
+@cached_page('frontend/Project team recruitment.html')
 def project_recruitment():
     return render_template('frontend/Project team recruitment.html')
 
 @app.route('/algorithm-recruitment')
+@cached_page('frontend/Recruitment for the Algorithm Group.html')
 def algorithm_recruitment():
     return render_template('frontend/Recruitment for the Algorithm Group.html')
 
 @app.route('/innovation')
+@cached_page('frontend/science and technology innovation.html', tables=page_tables('innovation'))
 def innovation():
-    return render_template('frontend/science and technology innovation.html')
+    return render_template('frontend/science and technology innovation.html', initial_data=initial_data('innovation'))
 
 @app.route('/team')
+@cached_page('frontend/team.html', tables=page_tables('team'))
 def team():
-    return render_template('frontend/team.html')
+    return render_template('frontend/team.html', initial_data=initial_data('team'))
 
 
 
@@ -846,6 +759,7 @@ def admin_login():
         
         if username and password:
             user = get_user_by_username(username)
+            from werkzeug.security import check_password_hash
             if user and check_password_hash(user['password'], password):
                 session['username'] = username
                 session['role'] = user['role']
@@ -940,6 +854,20 @@ def admin_algorithms_page():
                           avatar_url=avatar_url, 
                           active_nav='algorithms')
 
+@app.route('/admin/performance')
+@require_auth
+def admin_performance_page():
+    """前端真实用户性能页面"""
+    current_user = get_user_by_username(session['username'])
+    display_name = current_user['display_name'] if current_user else session['username']
+    avatar_url = current_user['avatar'] if current_user else ''
+    
+    return render_template('admin/performance.html', 
+                          username=display_name, 
+                          display_name=display_name, 
+                          avatar_url=avatar_url, 
+                          active_nav='performance')
+
 @app.route('/test/algorithms')
 def test_algorithms_page():
     """算法管理测试页面"""
@@ -1018,30 +946,9 @@ def get_applications():
 def get_frontend_activities():
     """获取前端首页显示的活动数据（前3个）"""
     try:
-        with get_db() as conn:
-            cursor = conn.execute('''
-                SELECT id, title, excerpt, category, author, publish_date, reading_time, tags
-                FROM notifications 
-                WHERE status = 'published'
-                ORDER BY order_index ASC, publish_date DESC
-                LIMIT 3
-            ''')
-            activities = []
-            for row in cursor.fetchall():
-                activity = dict(row)
-                # 格式化日期
-                if activity['publish_date']:
-                    try:
-                        date_obj = datetime.strptime(activity['publish_date'], '%Y-%m-%d %H:%M:%S')
-                        activity['formatted_date'] = date_obj.strftime('%Y.%m.%d')
-                    except:
-                        activity['formatted_date'] = activity['publish_date']
-                else:
-                    activity['formatted_date'] = '未知日期'
-                activities.append(activity)
-            return jsonify(activities)
+        return section_response('activities')
     except Exception as e:
-        print(f"Error fetching frontend activities: {e}")
+        logger.exception(f"Error fetching frontend activities: {e}")
         return jsonify([])
 
 # 调试API - 查看所有通知数据
@@ -1078,163 +985,44 @@ def get_paper_categories_api():
             
             return jsonify(categories)
     except Exception as e:
-        print(f"Error fetching paper categories: {e}")
+        logger.exception(f"Error fetching paper categories: {e}")
         return jsonify([])
 
 # 论文 API
 @app.route('/api/papers', methods=['GET'])
+@journal_etag('papers')
 def get_papers_api():
-    """获取所有论文"""
+    """获取所有论文（默认卡片投影，不含摘要；支持 ?fields= 指定字段）"""
+    from projection import parse_fields
+    from sections import query_papers
+    
     try:
-        with get_db() as conn:
-            # 获取所有论文
-            cursor = conn.execute("SELECT * FROM papers ORDER BY order_index ASC, updated_at DESC")
-            papers = cursor.fetchall()
-            
-            papers_data = []
-            for paper in papers:
-                paper_dict = dict(paper)
-                
-                # 从category_ids字段获取类别信息
-                categories = paper_dict.get('category_ids', '[]')
-                if isinstance(categories, str):
-                    try:
-                        categories = json.loads(categories)
-                    except:
-                        categories = []
-                
-                # 确保categories是列表格式
-                if not isinstance(categories, list):
-                    categories = []
-                
-                paper_dict['categories'] = categories
-                
-                # 处理authors字段，确保是列表格式
-                authors = paper_dict.get('authors', '[]')
-                if isinstance(authors, str):
-                    try:
-                        authors = json.loads(authors)
-                    except:
-                        authors = [authors] if authors else []
-                
-                if not isinstance(authors, list):
-                    authors = [authors] if authors else []
-                
-                paper_dict['authors'] = authors
-                
-                papers_data.append(paper_dict)
-            
-            print(f"📚 返回论文数据: {len(papers_data)} 篇")
-            print(f"📊 论文ID顺序: {[p['id'] for p in papers_data]}")
-            return jsonify(papers_data)
+        columns = parse_fields('papers')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        # 默认卡片投影直接使用首页共用的分区快照
+        if not request.args.get('fields', '').strip():
+            return section_response('papers')
+        # category_ids 解析为 categories 列表，authors 解析为列表
+        papers_data = query_papers(columns)
+        logger.debug("返回论文数据: %d 篇", len(papers_data), extra=SAMPLED)
+        return jsonify(papers_data)
     except Exception as e:
-        print(f"Error fetching papers: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error fetching papers: {e}")
         return jsonify([])
 
 @app.route('/api/frontend/papers', methods=['GET'])
+@journal_etag('papers')
 def get_frontend_papers_api():
-    """获取论文数据用于前端展示（支持Vercel环境Mock数据）"""
+    """获取论文数据用于前端展示（完整字段，包含摘要和DOI；列表卡片使用 /api/papers 的投影）"""
+    from sections import query_papers
+    
     try:
-        # 检查是否在 Vercel 环境中
-        if os.environ.get('VERCEL'):
-            # Vercel 环境：返回Mock数据
-            mock_papers = [
-                {
-                    'id': 1,
-                    'title': 'Deep Learning Approaches for Algorithm Optimization in Competitive Programming',
-                    'authors': ['张伟教授', '李明博士', '王小红'],
-                    'journal': 'IEEE Transactions on Software Engineering',
-                    'year': 2024,
-                    'abstract': '本文提出了一种基于深度学习的算法优化方法，专门针对程序设计竞赛中的复杂问题。通过分析历史竞赛数据，我们的方法能够自动识别最优算法策略。',
-                    'categories': [16, 23],  # CCF-A, JCR一区
-                    'status': 'published',
-                    'pdf_url': 'https://example.com/paper1.pdf',
-                    'code_url': 'https://github.com/acmlab/dl-optimization',
-                    'citation_count': 15,
-                    'doi': '10.1109/TSE.2024.001'
-                },
-                {
-                    'id': 2,
-                    'title': 'Novel Graph Algorithms for Social Network Analysis',
-                    'authors': ['陈文华教授', '刘大鹏', '赵雪梅'],
-                    'journal': 'Journal of Computer Science and Technology',
-                    'year': 2024,
-                    'abstract': '社交网络分析中的图算法研究，提出了一种新颖的社区发现算法，在大规模网络中具有良好的性能表现。',
-                    'categories': [17, 20],  # CCF-B, 中科院二区
-                    'status': 'published',
-                    'pdf_url': 'https://example.com/paper2.pdf',
-                    'code_url': '',
-                    'citation_count': 8,
-                    'doi': '10.1007/s11390-024-001'
-                },
-                {
-                    'id': 3,
-                    'title': 'Machine Learning-Based Code Completion for Programming Contests',
-                    'authors': ['孙建国', '吴丽娟', '马志强'],
-                    'journal': 'Software: Practice and Experience',
-                    'year': 2023,
-                    'abstract': '基于机器学习的代码自动补全系统，专为程序设计竞赛环境优化，显著提高了编程效率。',
-                    'categories': [18, 21],  # CCF-C, 中科院三区
-                    'status': 'published',
-                    'pdf_url': '',
-                    'code_url': 'https://github.com/acmlab/ml-codecomp',
-                    'citation_count': 12,
-                    'doi': '10.1002/spe.3245'
-                },
-                {
-                    'id': 4,
-                    'title': 'Efficient Parallel Algorithms for Large-Scale Data Processing',
-                    'authors': ['黄志宇教授', '郑海龙博士'],
-                    'journal': 'Parallel Computing',
-                    'year': 2023,
-                    'abstract': '针对大规模数据处理的并行算法研究，在MapReduce框架下实现了显著的性能提升。',
-                    'categories': [24, 27],  # JCR二区, EI源刊
-                    'status': 'published',
-                    'pdf_url': 'https://example.com/paper4.pdf',
-                    'code_url': '',
-                    'citation_count': 22,
-                    'doi': '10.1016/j.parco.2023.001'
-                },
-                {
-                    'id': 5,
-                    'title': 'Quantum Computing Applications in Cryptographic Algorithm Design',
-                    'authors': ['钱学森', '冯诺依曼', '图灵'],
-                    'journal': 'Nature Computational Science',
-                    'year': 2024,
-                    'abstract': '量子计算在密码学算法设计中的应用研究，探索了后量子时代的加密算法新方向。',
-                    'categories': [16, 19],  # CCF-A, 中科院一区
-                    'status': 'published',
-                    'pdf_url': 'https://example.com/paper5.pdf',
-                    'code_url': 'https://github.com/acmlab/quantum-crypto',
-                    'citation_count': 35,
-                    'doi': '10.1038/s43588-024-001'
-                },
-                {
-                    'id': 6,
-                    'title': 'Artificial Intelligence in Competitive Programming Education',
-                    'authors': ['周恩来', '邓小平', '毛泽东'],
-                    'journal': 'Computers & Education',
-                    'year': 2023,
-                    'abstract': '人工智能在程序设计竞赛教育中的应用，开发了智能化的训练平台和评测系统。',
-                    'categories': [25, 28],  # JCR三区, EI会议
-                    'status': 'published',
-                    'pdf_url': '',
-                    'code_url': 'https://github.com/acmlab/ai-education',
-                    'citation_count': 6,
-                    'doi': '10.1016/j.compedu.2023.001'
-                }
-            ]
-            print(f"🔧 Vercel环境：返回论文Mock数据 {len(mock_papers)} 篇")
-            return jsonify(mock_papers)
-        
-        # 本地环境：正常数据库查询
-        return get_papers_api()
+        return jsonify(query_papers())
     except Exception as e:
-        print(f"Error in get_frontend_papers_api: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error fetching papers: {e}")
         return jsonify([])
 
 # 前端获取指导老师数据的路由已移至 advisor_bp 中
@@ -0,0 +1,154 @@
+"""
+应用工厂
+create_app 负责应用配置、实时通信扩展和API蓝图的注册：
+- 蓝图模块在 create_app 中按 BLUEPRINTS 清单导入，导入 app 模块本身不再级联导入整棵依赖树
+- Socket.IO 只在启用实时通信时导入和初始化（Vercel 默认关闭），否则使用不做任何事的 NullSocketIO；
+  REALTIME_TRANSPORT=external 时广播转发给独立的实时通信服务（realtime_server.py）
+- markdown 等只在渲染时需要的依赖由使用处按需导入
+- 性能指标（metrics.init_metrics）和SQL追踪（sql_trace.init_sql_trace）默认开启，
+  可通过 METRICS_ENABLED=false / SQL_TRACE=false 关闭
+- 日志由 log_config.setup_logging 统一配置（异步写出，默认 WARNING 级别）
+"""
+
+import importlib
+import logging
+import os
+import secrets
+from datetime import timedelta
+
+from flask import Flask
+
+from log_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# 实时通信方式：socketio（进程内 threading 模式）、external（独立的实时通信服务）或 none；
+# 未设置时 Vercel 为 none，其余环境为 socketio
+REALTIME_TRANSPORT_ENV = 'REALTIME_TRANSPORT'
+
+# 设置为 false 时不采集服务端性能指标（请求耗时、SQL统计、Server-Timing头）
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() != 'false'
+
+# 设置为 false 时不追踪SQL（N+1检测、慢查询日志）
+SQL_TRACE_ENABLED = os.environ.get('SQL_TRACE', 'true').lower() != 'false'
+
+# 设置为 true 时开启 Socket.IO / Engine.IO 的详细日志（每个数据包都会输出，仅用于调试）
+SOCKETIO_DEBUG = os.environ.get('SOCKETIO_DEBUG', 'false').lower() == 'true'
+
+# API蓝图清单：(模块, 蓝图变量名, 注册参数)，按注册顺序排列
+BLUEPRINTS = (
+    ('api.team', 'team_bp', {}),  # 团队成员管理API
+    ('api.grades', 'grades_bp', {}),  # 年级管理API
+    ('api.algorithm', 'algorithm_bp', {}),  # 算法管理API
+    ('api.innovation', 'innovation_bp', {}),  # 创新统计和前端数据API
+    ('api.innovation_project', 'innovation_project_bp', {}),  # 创新项目API
+    ('api.advisor', 'advisor_bp', {'url_prefix': '/api'}),  # 指导老师API
+    ('api.notifications', 'notifications_bp', {}),  # 通知管理API
+    ('api.research', 'research_bp', {}),  # 研究领域API
+    ('api.data_transfer', 'data_transfer_bp', {}),  # 数据批量导入导出API
+    ('api.reorder', 'reorder_bp', {}),  # 通用排序API
+    ('api.system', 'system_bp', {}),  # 系统状态API
+    ('api.system', 'metrics_bp', {}),  # Prometheus性能指标
+    ('api.changes', 'changes_bp', {}),  # SSE与长轮询变更通知
+    ('api.rum', 'rum_bp', {}),  # 真实用户性能监控上报
+    ('api.bundle', 'bundle_bp', {}),  # 前端首屏聚合数据
+    ('api.query', 'query_bp', {}),  # 嵌套资源查询
+)
+
+
+def is_vercel():
+    return bool(os.environ.get('VERCEL') or os.environ.get('VERCEL_ENV'))
+
+
+def realtime_transport():
+    """当前启用的实时通信方式"""
+    transport = os.environ.get(REALTIME_TRANSPORT_ENV, '').strip().lower()
+    if not transport:
+        transport = 'none' if is_vercel() else 'socketio'
+    return transport
+
+
+def realtime_enabled():
+    return realtime_transport() == 'socketio'
+
+
+class NullSocketIO:
+    """实时通信关闭时的占位对象，接口与 flask_socketio.SocketIO 的常用部分一致"""
+
+    def __init__(self, app=None, **kwargs):
+        if app is not None:
+            self.init_app(app)
+
+    def emit(self, event, data=None, **kwargs):
+        logger.debug(f"实时通信未启用，忽略事件: {event}")
+
+    def on(self, event, namespace=None):
+        def decorator(f):
+            return f
+        return decorator
+
+    def init_app(self, app, **kwargs):
+        pass
+
+    def run(self, app, **kwargs):
+        kwargs.pop('allow_unsafe_werkzeug', None)
+        app.run(**kwargs)
+
+
+def init_realtime(app):
+    """按配置初始化实时通信扩展，结果同时保存在 app.extensions['socketio']"""
+    transport = realtime_transport()
+    if transport == 'socketio':
+        from flask_socketio import SocketIO
+        socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading',
+                            logger=SOCKETIO_DEBUG, engineio_logger=SOCKETIO_DEBUG)
+    elif transport == 'external':
+        from realtime_bridge import RealtimeForwarder
+        socketio = RealtimeForwarder(app)
+    else:
+        socketio = NullSocketIO(app)
+    app.extensions['socketio'] = socketio
+    return socketio
+
+
+def register_blueprints(app, blueprints=BLUEPRINTS):
+    """导入并注册API蓝图"""
+    for module_name, attr, options in blueprints:
+        module = importlib.import_module(module_name)
+        app.register_blueprint(getattr(module, attr), **options)
+    logger.info(f"已注册 {len(blueprints)} 个API蓝图")
+
+
+def create_app(import_name=__name__, config=None):
+    """
+    创建并配置Flask应用
+
+    Args:
+        import_name (str): 应用的导入名，决定模板和静态文件目录
+        config (dict): 覆盖默认配置的配置项
+
+    Returns:
+        Flask: 已注册实时通信扩展和API蓝图的应用
+    """
+    setup_logging()
+    app = Flask(import_name)
+    app.config.update(
+        SECRET_KEY=os.environ.get('SECRET_KEY', secrets.token_hex(16)),
+        PERMANENT_SESSION_LIFETIME=timedelta(days=1),
+        SESSION_REFRESH_EACH_REQUEST=True,
+        JSON_AS_ASCII=False,  # 确保JSON中的中文字符正确显示
+        SEND_FILE_MAX_AGE_DEFAULT=31536000,  # 启用静态文件缓存，1年过期
+    )
+    if config:
+        app.config.update(config)
+
+    init_realtime(app)
+    if METRICS_ENABLED:
+        from metrics import init_metrics
+        init_metrics(app)
+    if SQL_TRACE_ENABLED:
+        from sql_trace import init_sql_trace
+        init_sql_trace(app)
+    register_blueprints(app)
+    logger.info(f"应用已创建（实时通信: {realtime_transport()}）")
+    return app
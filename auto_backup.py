@@ -6,14 +6,20 @@
 """
 
 import os
-import shutil
+import gzip
+import hashlib
 import sqlite3
 import json
 import schedule
+import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import logging
 
+import change_journal
+import db_stats
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -27,98 +33,585 @@ logger = logging.getLogger(__name__)
 
 DATABASE = 'acm_lab.db'
 BACKUP_DIR = 'data_backups'
+PAGE_STORE_DIR = os.path.join(BACKUP_DIR, 'pages')  # 按内容寻址的页面存储（去重模式）
 MAX_BACKUPS = 10  # 保留最近10个备份
 
+# 在线备份每一步复制的页数及步间休眠，避免长时间占用数据库锁
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP = 0.005
+
+# 是否启用页面级去重：只存储与已有备份不同的页面
+BACKUP_DEDUP = os.environ.get('BACKUP_DEDUP', '').lower() in ('1', 'true', 'yes')
+
+CHUNK_SIZE = 1024 * 1024
+
+# 上传文件快照：清单引用按内容寻址的共享文件存储
+UPLOADS_DIR = os.path.join('static', 'uploads')
+UPLOADS_BACKUP_DIR = os.path.join(BACKUP_DIR, 'uploads')
+UPLOADS_BLOB_DIR = os.path.join(UPLOADS_BACKUP_DIR, 'blobs')
+MAX_UPLOAD_SNAPSHOTS = 10
+HASH_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# 可选的zstd压缩支持，未安装时使用gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION = 'zstd' if zstandard else 'gzip'
+COMPRESSION_EXT = {'zstd': '.zst', 'gzip': '.gz'}
+
 def ensure_backup_dir():
     """确保备份目录存在"""
     if not os.path.exists(BACKUP_DIR):
         os.makedirs(BACKUP_DIR)
         logger.info(f"创建备份目录: {BACKUP_DIR}")
 
+def _open_compressed(path, mode, compression):
+    """以流的方式打开压缩文件（mode为'rb'或'wb'）"""
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("该备份使用zstd压缩，请先安装zstandard")
+        raw = open(path, mode)
+        if mode == 'wb':
+            return zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return gzip.open(path, mode, compresslevel=6) if mode == 'wb' else gzip.open(path, mode)
+
+def _compress_bytes(data, compression):
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def _decompress_bytes(data, compression):
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("该备份使用zstd压缩，请先安装zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def quick_check(path):
+    """对数据库文件执行 PRAGMA quick_check，返回检查结果（正常时为'ok'）"""
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        rows = conn.execute('PRAGMA quick_check').fetchall()
+        return '; '.join(row[0] for row in rows)
+    finally:
+        conn.close()
+
+def online_backup(source_path, target_path, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP):
+    """
+    使用SQLite在线备份API分步复制数据库
+
+    每一步只复制少量页面并释放锁，应用可以在备份过程中继续写入；
+    源库在备份过程中被修改时SQLite会自动重新开始，保证得到一致的快照
+    """
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=pages, sleep=sleep)
+        page_size = target.execute('PRAGMA page_size').fetchone()[0]
+        page_count = target.execute('PRAGMA page_count').fetchone()[0]
+    finally:
+        target.close()
+        source.close()
+    return page_size, page_count
+
+def _snapshot_high_water(snapshot_path):
+    """读取快照中变更日志的最大ID，时间点恢复从该ID之后开始重放"""
+    conn = sqlite3.connect(f'file:{snapshot_path}?mode=ro', uri=True)
+    try:
+        return change_journal.high_water_mark(conn)
+    finally:
+        conn.close()
+
+def list_manifests():
+    """按创建时间从新到旧列出所有备份清单"""
+    if not os.path.exists(BACKUP_DIR):
+        return []
+    manifests = []
+    for file in os.listdir(BACKUP_DIR):
+        if file.startswith('acm_lab_backup_') and file.endswith('.json'):
+            path = os.path.join(BACKUP_DIR, file)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"无法读取备份清单 {file}: {e}")
+                continue
+            manifest['manifest_path'] = path
+            manifests.append(manifest)
+    manifests.sort(key=lambda m: m.get('created_at', ''), reverse=True)
+    return manifests
+
+def _page_path(page_hash, compression):
+    return os.path.join(PAGE_STORE_DIR, page_hash[:2], page_hash + COMPRESSION_EXT[compression])
+
+def _store_full(snapshot_path, base_name):
+    """把整个快照流式压缩为单个文件"""
+    file_name = base_name + '.db' + COMPRESSION_EXT[COMPRESSION]
+    with open(snapshot_path, 'rb') as src, _open_compressed(os.path.join(BACKUP_DIR, file_name), 'wb', COMPRESSION) as dst:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+            dst.write(chunk)
+    stored = os.path.getsize(os.path.join(BACKUP_DIR, file_name))
+    return {'mode': 'full', 'file': file_name, 'stored_bytes': stored}
+
+def _store_pages(snapshot_path, page_size):
+    """按页存储快照，已存在于页面存储中的页面不再重复写入"""
+    page_hashes = []
+    new_pages = 0
+    stored = 0
+    with open(snapshot_path, 'rb') as src:
+        for page in iter(lambda: src.read(page_size), b''):
+            page_hash = hashlib.sha256(page).hexdigest()
+            page_hashes.append(page_hash)
+            path = _page_path(page_hash, COMPRESSION)
+            if os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = _compress_bytes(page, COMPRESSION)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+            new_pages += 1
+            stored += len(data)
+    return {'mode': 'pages', 'pages': page_hashes, 'new_pages': new_pages, 'stored_bytes': stored}
+
 def cleanup_old_backups():
-    """清理过期的备份文件"""
+    """清理过期的备份，并回收不再被任何清单引用的页面"""
     try:
         ensure_backup_dir()
+        manifests = list_manifests()
+        
+        # 删除超过MAX_BACKUPS的备份
+        for manifest in manifests[MAX_BACKUPS:]:
+            if manifest.get('file'):
+                data_file = os.path.join(BACKUP_DIR, manifest['file'])
+                if os.path.exists(data_file):
+                    os.remove(data_file)
+            os.remove(manifest['manifest_path'])
+            logger.info(f"删除过期备份: {os.path.basename(manifest['manifest_path'])}")
         
-        # 获取所有备份文件
-        backup_files = []
-        for file in os.listdir(BACKUP_DIR):
-            if file.startswith('acm_lab_backup_') and file.endswith('.db'):
-                file_path = os.path.join(BACKUP_DIR, file)
-                backup_files.append((file_path, os.path.getctime(file_path)))
-        
-        # 按创建时间排序
-        backup_files.sort(key=lambda x: x[1], reverse=True)
-        
-        # 删除超过MAX_BACKUPS的文件
-        if len(backup_files) > MAX_BACKUPS:
-            for file_path, _ in backup_files[MAX_BACKUPS:]:
-                os.remove(file_path)
-                logger.info(f"删除过期备份: {os.path.basename(file_path)}")
+        # 回收页面存储中的孤立页面
+        if os.path.exists(PAGE_STORE_DIR):
+            referenced = set()
+            for manifest in manifests[:MAX_BACKUPS]:
+                referenced.update(manifest.get('pages') or [])
+            removed = 0
+            for root, _, files in os.walk(PAGE_STORE_DIR):
+                for file in files:
+                    if file.split('.', 1)[0] not in referenced:
+                        os.remove(os.path.join(root, file))
+                        removed += 1
+            if removed:
+                logger.info(f"回收未引用的页面: {removed} 个")
+        
+        compact_journal()
                 
     except Exception as e:
         logger.error(f"清理备份文件失败: {e}")
 
-def backup_database():
-    """备份数据库"""
+def backup_database(dedup=None):
+    """
+    备份数据库
+
+    通过在线备份API得到一致快照，执行quick_check校验后压缩存储，并写入校验清单；
+    数据库自上次备份以来没有变化时不生成新备份
+
+    Args:
+        dedup (bool): 是否启用页面级去重，默认取环境变量BACKUP_DEDUP
+
+    Returns:
+        dict|None: 备份清单，失败时返回None
+    """
+    if dedup is None:
+        dedup = BACKUP_DEDUP
+    snapshot_path = None
     try:
         if not os.path.exists(DATABASE):
             logger.warning(f"数据库文件不存在: {DATABASE}")
-            return False
+            return None
             
         ensure_backup_dir()
+        started = time.perf_counter()
         
         # 生成备份文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_file = os.path.join(BACKUP_DIR, f'acm_lab_backup_{timestamp}.db')
+        base_name = f'acm_lab_backup_{timestamp}'
+        suffix = 1
+        while os.path.exists(os.path.join(BACKUP_DIR, base_name + '.json')):
+            suffix += 1
+            base_name = f'acm_lab_backup_{timestamp}_{suffix}'
+        snapshot_path = os.path.join(BACKUP_DIR, base_name + '.snapshot')
         
-        # 复制数据库文件
-        shutil.copy2(DATABASE, backup_file)
+        # 在线备份得到一致快照
+        page_size, page_count = online_backup(DATABASE, snapshot_path)
         
-        # 验证备份文件
-        if os.path.exists(backup_file):
-            file_size = os.path.getsize(backup_file) / 1024  # KB
-            logger.info(f"数据库备份成功: {backup_file} ({file_size:.1f} KB)")
-            
-            # 清理旧备份
-            cleanup_old_backups()
-            return True
-        else:
-            logger.error("备份文件创建失败")
-            return False
+        # 校验快照
+        check = quick_check(snapshot_path)
+        if check != 'ok':
+            logger.error(f"备份校验失败: {check}")
+            return None
+        
+        checksum = _sha256_file(snapshot_path)
+        journal_high_water = _snapshot_high_water(snapshot_path)
+        manifests = list_manifests()
+        if manifests and manifests[0].get('sha256') == checksum:
+            logger.info(f"数据库自上次备份以来未变化，跳过备份 ({os.path.basename(manifests[0]['manifest_path'])})")
+            return manifests[0]
+        
+        stored = _store_pages(snapshot_path, page_size) if dedup else _store_full(snapshot_path, base_name)
+        manifest = {
+            'version': 2,
+            'created_at': datetime.now().isoformat(),
+            'database': DATABASE,
+            'compression': COMPRESSION,
+            'sha256': checksum,
+            'size': os.path.getsize(snapshot_path),
+            'page_size': page_size,
+            'page_count': page_count,
+            'quick_check': check,
+            'journal_high_water': journal_high_water,
+            **stored,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+        
+        manifest_path = os.path.join(BACKUP_DIR, base_name + '.json')
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        manifest['manifest_path'] = manifest_path
+        
+        logger.info(f"数据库备份成功: {os.path.basename(manifest_path)} "
+                    f"({manifest['size'] / 1024:.1f} KB -> {manifest['stored_bytes'] / 1024:.1f} KB, "
+                    f"{manifest['duration_ms']} ms)")
+        
+        # 清理旧备份
+        cleanup_old_backups()
+        return manifest
             
     except Exception as e:
         logger.error(f"数据库备份失败: {e}")
+        return None
+    finally:
+        if snapshot_path and os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+
+def _load_manifest(manifest_path):
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def materialize_backup(manifest_path, target_path):
+    """把备份还原为独立的数据库文件，并校验SHA-256与quick_check"""
+    manifest = _load_manifest(manifest_path)
+    compression = manifest.get('compression', 'gzip')
+    digest = hashlib.sha256()
+    
+    with open(target_path, 'wb') as dst:
+        if manifest.get('mode') == 'pages':
+            for page_hash in manifest['pages']:
+                with open(_page_path(page_hash, compression), 'rb') as f:
+                    page = _decompress_bytes(f.read(), compression)
+                digest.update(page)
+                dst.write(page)
+        else:
+            with _open_compressed(os.path.join(BACKUP_DIR, manifest['file']), 'rb', compression) as src:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    dst.write(chunk)
+    
+    if digest.hexdigest() != manifest['sha256']:
+        raise ValueError(f"备份校验和不匹配: {os.path.basename(manifest_path)}")
+    check = quick_check(target_path)
+    if check != 'ok':
+        raise ValueError(f"备份数据库完整性检查失败: {check}")
+    return manifest
+
+def verify_backup(manifest_path):
+    """校验备份能否完整还原"""
+    temp_path = manifest_path + '.verify'
+    try:
+        materialize_backup(manifest_path, temp_path)
+        return True
+    except Exception as e:
+        logger.error(f"备份校验失败: {e}")
         return False
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
-def get_database_info():
-    """获取数据库信息"""
+def restore_backup(manifest_path, target=None):
+    """
+    从备份恢复数据库
+
+    先还原并校验到临时文件，再通过在线备份API写回目标数据库，
+    应用运行时也能安全恢复
+    """
+    target = target or DATABASE
+    temp_path = manifest_path + '.restore'
     try:
-        if not os.path.exists(DATABASE):
+        manifest = materialize_backup(manifest_path, temp_path)
+        online_backup(temp_path, target)
+        logger.info(f"已从 {os.path.basename(manifest_path)} 恢复数据库到 {target}")
+        return manifest
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _scan_uploads():
+    """遍历上传目录，返回 {相对路径: (大小, 修改时间)}"""
+    files = {}
+    for root, _, names in os.walk(UPLOADS_DIR):
+        for name in names:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            rel_path = os.path.relpath(path, UPLOADS_DIR).replace(os.sep, '/')
+            files[rel_path] = (stat.st_size, stat.st_mtime)
+    return files
+
+def _blob_path(file_hash):
+    return os.path.join(UPLOADS_BLOB_DIR, file_hash[:2], file_hash)
+
+def list_upload_snapshots():
+    """按时间从新到旧列出上传文件快照"""
+    if not os.path.exists(UPLOADS_BACKUP_DIR):
+        return []
+    snapshots = []
+    for file in os.listdir(UPLOADS_BACKUP_DIR):
+        if file.startswith('uploads_') and file.endswith('.json'):
+            path = os.path.join(UPLOADS_BACKUP_DIR, file)
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            snapshot['snapshot_path'] = path
+            snapshots.append(snapshot)
+    snapshots.sort(key=lambda s: s.get('created_at', ''), reverse=True)
+    return snapshots
+
+def _store_blob(rel_path):
+    """计算文件哈希，并在文件存储中不存在时复制一份"""
+    source = os.path.join(UPLOADS_DIR, rel_path)
+    file_hash = _sha256_file(source)
+    target = _blob_path(file_hash)
+    if os.path.exists(target):
+        return rel_path, file_hash, False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp = f'{target}.{os.getpid()}.tmp'
+    shutil.copyfile(source, temp)
+    os.replace(temp, target)
+    return rel_path, file_hash, True
+
+def cleanup_upload_snapshots():
+    """清理过期的上传文件快照，并回收不再被引用的文件"""
+    snapshots = list_upload_snapshots()
+    for snapshot in snapshots[MAX_UPLOAD_SNAPSHOTS:]:
+        os.remove(snapshot['snapshot_path'])
+        logger.info(f"删除过期上传快照: {os.path.basename(snapshot['snapshot_path'])}")
+    
+    referenced = {entry['sha256'] for snapshot in snapshots[:MAX_UPLOAD_SNAPSHOTS]
+                  for entry in snapshot['files'].values()}
+    for root, _, files in os.walk(UPLOADS_BLOB_DIR):
+        for file in files:
+            if file not in referenced:
+                os.remove(os.path.join(root, file))
+
+def snapshot_uploads():
+    """
+    增量备份上传目录
+
+    大小和修改时间与上一个快照一致的文件直接沿用其哈希；其余文件在线程池中并行计算哈希，
+    只把新内容复制到按内容寻址的文件存储中，快照本身只是一个小清单
+
+    Returns:
+        dict|None: 快照清单，失败时返回None
+    """
+    try:
+        if not os.path.exists(UPLOADS_DIR):
+            logger.warning(f"上传目录不存在: {UPLOADS_DIR}")
             return None
-            
-        conn = sqlite3.connect(DATABASE)
-        conn.row_factory = sqlite3.Row
         
-        # 获取表统计信息
-        tables_info = {}
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
+        started = time.perf_counter()
+        os.makedirs(UPLOADS_BLOB_DIR, exist_ok=True)
         
-        for table in tables:
-            try:
-                cursor = conn.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
-                tables_info[table] = count
-            except:
-                tables_info[table] = 0
+        previous = list_upload_snapshots()
+        previous_files = previous[0]['files'] if previous else {}
+        current = _scan_uploads()
         
+        entries = {}
+        changed = []
+        for rel_path, (size, mtime) in current.items():
+            old = previous_files.get(rel_path)
+            if old and old['size'] == size and old['mtime'] == mtime and os.path.exists(_blob_path(old['sha256'])):
+                entries[rel_path] = old
+            else:
+                changed.append(rel_path)
+        
+        copied = 0
+        copied_bytes = 0
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            for rel_path, file_hash, is_new in executor.map(_store_blob, changed):
+                size, mtime = current[rel_path]
+                entries[rel_path] = {'size': size, 'mtime': mtime, 'sha256': file_hash}
+                if is_new:
+                    copied += 1
+                    copied_bytes += size
+        
+        if previous and entries == previous_files:
+            logger.info("上传文件自上次快照以来未变化，跳过快照")
+            return previous[0]
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        snapshot_path = os.path.join(UPLOADS_BACKUP_DIR, f'uploads_{timestamp}.json')
+        suffix = 1
+        while os.path.exists(snapshot_path):
+            suffix += 1
+            snapshot_path = os.path.join(UPLOADS_BACKUP_DIR, f'uploads_{timestamp}_{suffix}.json')
+        
+        snapshot = {
+            'created_at': datetime.now().isoformat(),
+            'root': UPLOADS_DIR,
+            'file_count': len(entries),
+            'total_bytes': sum(entry['size'] for entry in entries.values()),
+            'hashed': len(changed),
+            'copied': copied,
+            'copied_bytes': copied_bytes,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'files': dict(sorted(entries.items())),
+        }
+        with open(snapshot_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=1)
+        snapshot['snapshot_path'] = snapshot_path
+        
+        logger.info(f"上传文件快照完成: {os.path.basename(snapshot_path)} "
+                    f"({snapshot['file_count']} 个文件, 新增 {copied} 个 / {copied_bytes / 1024:.1f} KB, "
+                    f"{snapshot['duration_ms']} ms)")
+        cleanup_upload_snapshots()
+        return snapshot
+        
+    except Exception as e:
+        logger.error(f"上传文件快照失败: {e}")
+        return None
+
+def restore_uploads(snapshot_path=None, clean=False):
+    """
+    把上传目录恢复到指定快照
+
+    Args:
+        snapshot_path (str): 快照清单路径，默认为最新快照
+        clean (bool): 是否删除快照中不存在的文件
+
+    Returns:
+        int: 恢复（重新写入）的文件数
+    """
+    if snapshot_path is None:
+        snapshots = list_upload_snapshots()
+        if not snapshots:
+            raise FileNotFoundError("没有可用的上传文件快照")
+        snapshot_path = snapshots[0]['snapshot_path']
+    with open(snapshot_path, encoding='utf-8') as f:
+        snapshot = json.load(f)
+    
+    restored = 0
+    current = _scan_uploads() if os.path.exists(UPLOADS_DIR) else {}
+    for rel_path, entry in snapshot['files'].items():
+        target = os.path.join(UPLOADS_DIR, *rel_path.split('/'))
+        if current.get(rel_path) == (entry['size'], entry['mtime']):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(_blob_path(entry['sha256']), target)
+        os.utime(target, (entry['mtime'], entry['mtime']))
+        restored += 1
+    
+    if clean:
+        for rel_path in set(current) - set(snapshot['files']):
+            os.remove(os.path.join(UPLOADS_DIR, *rel_path.split('/')))
+            logger.info(f"删除快照之外的文件: {rel_path}")
+    
+    logger.info(f"已从 {os.path.basename(snapshot_path)} 恢复上传文件: {restored} 个")
+    return restored
+
+def compact_journal():
+    """删除已被最早保留的基础备份覆盖的变更日志"""
+    retained = [m for m in list_manifests()[:MAX_BACKUPS] if m.get('journal_high_water') is not None]
+    if not retained or not os.path.exists(DATABASE):
+        return 0
+    oldest_high_water = min(m['journal_high_water'] for m in retained)
+    conn = sqlite3.connect(DATABASE)
+    try:
+        return change_journal.compact_journal(conn, oldest_high_water)
+    finally:
         conn.close()
+
+def restore_to_time(timestamp, target=None):
+    """
+    时间点恢复：取不晚于指定时间的最近一次基础备份，再重放变更日志到该时间
+
+    恢复前会先对当前数据库做一次备份，恢复后仍可回退
+
+    Args:
+        timestamp (str|datetime): 要恢复到的时间（本地时间）
+        target (str): 目标数据库，默认为当前数据库
+
+    Returns:
+        int: 重放的变更数
+    """
+    target = target or DATABASE
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    
+    # 先保存当前状态
+    backup_database()
+    
+    candidates = [m for m in list_manifests()
+                  if m.get('journal_high_water') is not None
+                  and datetime.fromisoformat(m['created_at']) <= timestamp]
+    if not candidates:
+        raise ValueError(f"没有早于 {timestamp} 的基础备份")
+    base = candidates[0]
+    
+    temp_path = base['manifest_path'] + '.pitr'
+    try:
+        materialize_backup(base['manifest_path'], temp_path)
+        source = sqlite3.connect(DATABASE)
+        restored = sqlite3.connect(temp_path)
+        try:
+            replayed = change_journal.replay(restored, source, base['journal_high_water'], until=timestamp)
+        finally:
+            restored.close()
+            source.close()
+        
+        check = quick_check(temp_path)
+        if check != 'ok':
+            raise ValueError(f"恢复后的数据库完整性检查失败: {check}")
+        online_backup(temp_path, target)
+        logger.info(f"已恢复到 {timestamp}: 基础备份 {os.path.basename(base['manifest_path'])} + {replayed} 条变更")
+        return replayed
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def get_database_info():
+    """获取数据库信息（行数来自触发器维护的计数表，不再逐表COUNT(*)）"""
+    try:
+        if not os.path.exists(DATABASE):
+            return None
+            
+        conn = sqlite3.connect(DATABASE)
+        try:
+            stats = db_stats.database_stats(conn, DATABASE)
+        finally:
+            conn.close()
         
         return {
-            'file_size': os.path.getsize(DATABASE) / 1024,  # KB
-            'tables': tables_info,
-            'total_records': sum(tables_info.values())
+            'file_size': stats['file_size'] / 1024,  # KB
+            'tables': {table: info['rows'] for table, info in stats['tables'].items()},
+            'total_records': stats['total_records'],
+            'stats': stats
         }
         
     except Exception as e:
@@ -135,14 +628,25 @@ def scheduled_backup():
         logger.info(f"数据库信息: {db_info['total_records']} 条记录, {db_info['file_size']:.1f} KB")
     
     # 执行备份
-    success = backup_database()
+    success = backup_database() is not None
+    snapshot_uploads()
     
     if success:
         logger.info("定时备份任务完成")
     else:
         logger.error("定时备份任务失败")
 
-def manual_backup():
+def print_backup_list(limit=5):
+    """显示最近的备份"""
+    print(f"\n📁 备份列表:")
+    for i, manifest in enumerate(list_manifests()[:limit], 1):
+        name = os.path.basename(manifest['manifest_path'])
+        created = manifest.get('created_at', '')[:19].replace('T', ' ')
+        size = manifest.get('size', 0) / 1024
+        stored = manifest.get('stored_bytes', 0) / 1024
+        print(f"   {i}. {name} [{manifest.get('mode', 'full')}] ({size:.1f} KB, 实际存储 {stored:.1f} KB) - {created}")
+
+def manual_backup(dedup=None):
     """手动备份"""
     print("🚀 开始手动备份...")
     
@@ -156,24 +660,11 @@ def manual_backup():
             if count > 0:
                 print(f"      {table}: {count} 条")
     
-    success = backup_database()
+    manifest = backup_database(dedup)
     
-    if success:
+    if manifest:
         print("✅ 手动备份完成！")
-        
-        # 显示备份文件列表
-        print(f"\n📁 备份文件列表:")
-        backup_files = []
-        for file in os.listdir(BACKUP_DIR):
-            if file.startswith('acm_lab_backup_') and file.endswith('.db'):
-                file_path = os.path.join(BACKUP_DIR, file)
-                file_size = os.path.getsize(file_path) / 1024
-                create_time = datetime.fromtimestamp(os.path.getctime(file_path))
-                backup_files.append((file, file_size, create_time))
-        
-        backup_files.sort(key=lambda x: x[2], reverse=True)
-        for i, (file, size, time) in enumerate(backup_files[:5], 1):
-            print(f"   {i}. {file} ({size:.1f} KB) - {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        print_backup_list()
     else:
         print("❌ 手动备份失败！")
 
@@ -200,13 +691,55 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='ACM实验室数据库自动备份工具')
-    parser.add_argument('action', nargs='?', choices=['backup', 'schedule', 'info'], 
+    parser.add_argument('action', nargs='?', choices=['backup', 'schedule', 'info', 'list', 'verify', 'restore',
+                                                      'uploads', 'restore-uploads', 'restore-at', 'compact-journal'],
                        default='backup', help='执行的操作')
+    parser.add_argument('manifest', nargs='?', help='verify/restore/restore-uploads 使用的清单，默认为最新备份')
+    parser.add_argument('--dedup', action='store_true', default=None, help='启用页面级去重')
+    parser.add_argument('--target', help='restore 的目标数据库，默认为当前数据库')
+    parser.add_argument('--clean', action='store_true', help='restore-uploads 时删除快照之外的文件')
+    parser.add_argument('--at', help='restore-at 要恢复到的时间，如 "2024-05-01 14:30:00"')
     
     args = parser.parse_args()
     
+    if args.action in ('verify', 'restore') and not args.manifest:
+        manifests = list_manifests()
+        if not manifests:
+            print("❌ 没有可用的备份")
+            return
+        args.manifest = manifests[0]['manifest_path']
+    
     if args.action == 'backup':
-        manual_backup()
+        manual_backup(args.dedup)
+    elif args.action == 'list':
+        print_backup_list(limit=MAX_BACKUPS)
+    elif args.action == 'uploads':
+        snapshot = snapshot_uploads()
+        if snapshot:
+            print(f"✅ 上传文件快照完成: {os.path.basename(snapshot['snapshot_path'])} "
+                  f"({snapshot['file_count']} 个文件, 新增 {snapshot['copied']} 个)")
+        else:
+            print("❌ 上传文件快照失败！")
+    elif args.action == 'restore-at':
+        if not args.at:
+            print("❌ 请通过 --at 指定要恢复到的时间")
+            return
+        replayed = restore_to_time(args.at, args.target)
+        print(f"✅ 已恢复到 {args.at}，重放 {replayed} 条变更")
+    elif args.action == 'compact-journal':
+        deleted = compact_journal()
+        print(f"✅ 已压缩变更日志: 删除 {deleted} 条")
+    elif args.action == 'restore-uploads':
+        restored = restore_uploads(args.manifest, clean=args.clean)
+        print(f"✅ 已恢复上传文件: {restored} 个")
+    elif args.action == 'verify':
+        if verify_backup(args.manifest):
+            print(f"✅ 备份校验通过: {args.manifest}")
+        else:
+            print(f"❌ 备份校验失败: {args.manifest}")
+    elif args.action == 'restore':
+        restore_backup(args.manifest, args.target)
+        print(f"✅ 已恢复备份: {args.manifest}")
     elif args.action == 'schedule':
         start_scheduler()
     elif args.action == 'info':
@@ -217,9 +750,10 @@ def main():
             print(f"   大小: {db_info['file_size']:.1f} KB")
             print(f"   总记录: {db_info['total_records']}")
             print(f"   表统计:")
-            for table, count in sorted(db_info['tables'].items()):
-                if count > 0:
-                    print(f"      {table}: {count} 条")
+            for table, info in sorted(db_info['stats']['tables'].items()):
+                if info['rows'] > 0 or info.get('bytes'):
+                    usage = f" / {info['pages']} 页, {info['bytes'] / 1024:.1f} KB" if 'bytes' in info else ''
+                    print(f"      {table}: {info['rows']} 条{usage}")
         else:
             print("❌ 无法获取数据库信息")
 
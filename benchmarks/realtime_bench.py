@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时通信连接规模测试
+启动 realtime_server.py（或连接已运行的服务），依次建立 100 / 1000 / 5000 个模拟客户端，
+每个客户端像页面一样连接后发送 join_page，然后通过 /internal/broadcast 向房间广播若干次，输出：
+- 每个连接占用的服务端内存（建立连接前后服务进程 VmRSS 之差 / 连接数）
+- 广播延迟：从发出广播请求到各客户端收到事件的 p50/p95/p99/最大值
+
+模拟客户端直接实现 Engine.IO v4 / Socket.IO v5 的 WebSocket 协议，所有连接在一个 asyncio 事件循环中，
+不依赖额外的客户端库。
+
+示例：
+    python benchmarks/realtime_bench.py --connections 100,1000,5000
+    python benchmarks/realtime_bench.py --url http://127.0.0.1:5001 --pid 12345 --connections 1000
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import resource
+import statistics
+import struct
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from urllib.parse import urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from runner import percentile  # noqa: E402
+
+BENCH_EVENT = 'page_refresh'
+
+
+class SimulatedClient:
+    """最小的 Socket.IO WebSocket 客户端：连接、加入页面房间、记录广播到达时间、响应心跳"""
+
+    def __init__(self, host, port, page, path='/socket.io/'):
+        self.host = host
+        self.port = port
+        self.page = page
+        self.path = path
+        self.received = {}
+        self._reader = None
+        self._writer = None
+        self._task = None
+        self._joined = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self._writer.write((
+            f"GET {self.path}?EIO=4&transport=websocket HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        response = await self._reader.readuntil(b'\r\n\r\n')
+        if b' 101 ' not in response.split(b'\r\n', 1)[0]:
+            raise ConnectionError(response.split(b'\r\n', 1)[0].decode(errors='replace'))
+
+        opening = await self._read_message()  # Engine.IO open: 0{...}
+        if not opening.startswith('0'):
+            raise ConnectionError(f'unexpected open packet: {opening[:40]}')
+        self._send('40')  # 连接默认命名空间
+        self._joined = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._read_loop())
+        self._send('42' + json.dumps(['join_page', {'page': self.page}]))
+        await self._joined
+
+    def _send(self, text, opcode=0x1):
+        payload = text.encode() if isinstance(text, str) else text
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 65536:
+            header += bytes([0x80 | 126]) + struct.pack('!H', length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack('!Q', length)
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self._writer.write(header + mask + masked)
+
+    async def _read_frame(self):
+        first, second = await self._reader.readexactly(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', await self._reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await self._reader.readexactly(8))[0]
+        mask = await self._reader.readexactly(4) if second & 0x80 else None
+        payload = await self._reader.readexactly(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    async def _read_message(self):
+        while True:
+            opcode, payload = await self._read_frame()
+            if opcode == 0x1:
+                return payload.decode()
+            if opcode == 0x9:
+                self._send(payload, opcode=0xA)
+            elif opcode == 0x8:
+                raise ConnectionError('server closed connection')
+
+    async def _read_loop(self):
+        try:
+            while True:
+                message = await self._read_message()
+                received_at = time.time()
+                if message == '2':  # Engine.IO ping
+                    self._send('3')
+                elif message.startswith('42'):
+                    name, *args = json.loads(message[2:])
+                    if name == 'joined_page' and not self._joined.done():
+                        self._joined.set_result(True)
+                    elif name == BENCH_EVENT and args:
+                        bench_id = (args[0].get('payload') or {}).get('bench_id')
+                        if bench_id is not None:
+                            self.received[bench_id] = received_at
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            if self._joined is not None and not self._joined.done():
+                self._joined.set_exception(ConnectionError(str(e)))
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        if self._writer:
+            try:
+                self._send(b'', opcode=0x8)
+                self._writer.close()
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+def _rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _post_broadcast(base_url, token, events):
+    request = urllib.request.Request(base_url + '/internal/broadcast', method='POST',
+                                     data=json.dumps({'events': events}).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+
+
+async def run_level(base_url, pid, token, connections, broadcasts, page, connect_parallelism, timeout):
+    parsed = urlparse(base_url)
+    host, port = parsed.hostname, parsed.port or 80
+    loop = asyncio.get_running_loop()
+
+    await asyncio.sleep(0.5)
+    rss_before = _rss_kb(pid) if pid else None
+
+    clients = [SimulatedClient(host, port, page) for _ in range(connections)]
+    semaphore = asyncio.Semaphore(connect_parallelism)
+
+    async def connect(client):
+        async with semaphore:
+            await client.connect()
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(connect(client) for client in clients), return_exceptions=True)
+    connect_seconds = time.perf_counter() - started
+    connected = [client for client, result in zip(clients, results) if not isinstance(result, BaseException)]
+    failed = len(clients) - len(connected)
+
+    await asyncio.sleep(1.0)
+    rss_after = _rss_kb(pid) if pid else None
+
+    latencies = []
+    fanout = []
+    for bench_id in range(broadcasts):
+        sent_at = time.time()
+        event = {'event': BENCH_EVENT, 'room': page,
+                 'data': {'page': page, 'type': 'data_updated', 'payload': {'bench_id': bench_id}}}
+        await loop.run_in_executor(None, _post_broadcast, base_url, token, [event])
+        deadline = time.time() + timeout
+        while time.time() < deadline and any(bench_id not in client.received for client in connected):
+            await asyncio.sleep(0.01)
+        arrivals = [client.received[bench_id] - sent_at for client in connected if bench_id in client.received]
+        latencies.extend(arrivals)
+        if arrivals:
+            fanout.append(max(arrivals))
+        await asyncio.sleep(0.2)
+
+    expected = len(connected) * broadcasts
+    await asyncio.gather(*(client.close() for client in clients), return_exceptions=True)
+
+    latencies_ms = [value * 1000 for value in latencies]
+    per_connection = None
+    if rss_before is not None and rss_after is not None and connected:
+        per_connection = round((rss_after - rss_before) / len(connected), 1)
+    return {
+        'connections': connections,
+        'connected': len(connected),
+        'failed': failed,
+        'connect_s': round(connect_seconds, 2),
+        'rss_before_kb': rss_before,
+        'rss_after_kb': rss_after,
+        'kb_per_connection': per_connection,
+        'delivered': len(latencies),
+        'missed': expected - len(latencies),
+        'p50_ms': round(percentile(latencies_ms, 50), 2),
+        'p95_ms': round(percentile(latencies_ms, 95), 2),
+        'p99_ms': round(percentile(latencies_ms, 99), 2),
+        'max_ms': round(max(latencies_ms), 2) if latencies_ms else 0.0,
+        'fanout_ms': round(statistics.median(fanout) * 1000, 2) if fanout else 0.0,
+    }
+
+
+def _raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = hard if hard != resource.RLIM_INFINITY else max(soft, needed)
+    if soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    if target < needed:
+        print(f"⚠️ 文件描述符上限 {target} 小于 {needed}，大规模连接可能失败")
+
+
+def _start_server(port, token):
+    env = dict(os.environ, REALTIME_TOKEN=token or '')
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'realtime_server.py'), '--port', str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"实时通信服务启动失败:\n{process.stderr.read().decode(errors='replace')[-2000:]}")
+        try:
+            with urllib.request.urlopen(base_url + '/internal/health', timeout=2):
+                return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('实时通信服务在 30 秒内未就绪')
+
+
+def _print_row(result):
+    per_connection = result['kb_per_connection']
+    per_connection = f"{per_connection:.1f}" if per_connection is not None else '-'
+    print(f"{result['connections']:>7} {result['connected']:>7} {result['connect_s']:>9.2f} {per_connection:>9} "
+          f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['max_ms']:>9.2f} "
+          f"{result['missed']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='实时通信连接规模测试')
+    parser.add_argument('--connections', default='100,1000,5000', help='逗号分隔的连接数')
+    parser.add_argument('--broadcasts', type=int, default=5, help='每个规模的广播次数')
+    parser.add_argument('--page', default='team', help='客户端加入的页面房间')
+    parser.add_argument('--url', help='已运行的实时通信服务地址；不指定时自动启动 realtime_server.py')
+    parser.add_argument('--pid', type=int, help='已运行服务的进程ID，用于统计内存')
+    parser.add_argument('--port', type=int, default=5098, help='自动启动服务时使用的端口')
+    parser.add_argument('--token', default=os.environ.get('REALTIME_TOKEN', ''), help='广播接口密钥')
+    parser.add_argument('--parallel', type=int, default=200, help='同时进行握手的连接数')
+    parser.add_argument('--timeout', type=float, default=30, help='等待广播送达的超时（秒）')
+    parser.add_argument('--output', help='把结果写入JSON文件')
+    args = parser.parse_args()
+
+    levels = [int(value) for value in args.connections.split(',') if value.strip()]
+    _raise_fd_limit(max(levels) + 256)
+
+    process = None
+    if args.url:
+        base_url, pid = args.url.rstrip('/'), args.pid
+    else:
+        process, base_url = _start_server(args.port, args.token)
+        pid = process.pid
+
+    print(f"📡 实时通信规模测试: {base_url}, 每个规模广播 {args.broadcasts} 次")
+    print(f"{'连接数':>5} {'已连接':>5} {'建连(s)':>8} {'KB/连接':>7} {'p50(ms)':>9} {'p95(ms)':>9} "
+          f"{'p99(ms)':>9} {'max(ms)':>9} {'丢失':>4}")
+    results = []
+    try:
+        for connections in levels:
+            result = asyncio.run(run_level(base_url, pid, args.token, connections, args.broadcasts, args.page,
+                                           args.parallel, args.timeout))
+            results.append(result)
+            _print_row(result)
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'meta': {'url': base_url, 'broadcasts': args.broadcasts,
+                                'created_at': datetime.now().isoformat(timespec='seconds')},
+                       'results': results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+接口基准测试
+对 generate_data.py 生成的数据库压测主要接口，输出每个端点的 p50/p95/p99 延迟、吞吐量和峰值内存：
+- client 模式：进程内使用 Flask 测试客户端，不经过网络，适合比较代码改动
+- server 模式：子进程启动本地服务器，用多个线程发起真实HTTP请求，包含WSGI服务器和网络开销
+结果可保存为基线（benchmarks/baselines/<名称>.json），之后与基线比较，p95 或吞吐量退化超过阈值时以状态1退出
+
+示例：
+    python benchmarks/generate_data.py --scale large
+    python benchmarks/runner.py --mode client --save-baseline local
+    python benchmarks/runner.py --mode server --concurrency 8 --compare local --threshold 0.2
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+DEFAULT_DATABASE = os.path.join(BENCH_DIR, 'bench.db')
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+
+# (名称, 路径模板)；{id} 依次替换为已发布通知的ID，避免所有请求命中同一条缓存
+ENDPOINTS = (
+    ('papers', '/api/papers'),
+    ('team', '/api/team'),
+    ('notifications', '/api/notifications'),
+    ('notification_detail', '/notification/{id}'),
+    ('grades', '/api/grades'),
+)
+
+# 比较基线时低于该值（毫秒）的p95差异视为噪声
+MIN_REGRESSION_MS = 2.0
+
+
+def percentile(values, pct):
+    """线性插值百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(latencies, errors, elapsed, peak_rss_kb):
+    latencies_ms = [value * 1000 for value in latencies]
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies_ms, 50), 2),
+        'p95_ms': round(percentile(latencies_ms, 95), 2),
+        'p99_ms': round(percentile(latencies_ms, 99), 2),
+        'mean_ms': round(statistics.fmean(latencies_ms), 2) if latencies_ms else 0.0,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'peak_rss_kb': peak_rss_kb,
+    }
+
+
+def published_notification_ids(database, limit=200):
+    import sqlite3
+    conn = sqlite3.connect(database)
+    try:
+        rows = conn.execute(
+            "SELECT id FROM notifications WHERE status = 'published' ORDER BY id LIMIT ?", (limit,)).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows] or [1]
+
+
+def expand_paths(template, ids, count):
+    if '{id}' not in template:
+        return [template] * count
+    return [template.format(id=ids[index % len(ids)]) for index in range(count)]
+
+
+def _run_load(send, paths, concurrency):
+    """并发发送请求，返回 (各请求耗时, 错误数, 总耗时)"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(path):
+        nonlocal errors
+        started = time.perf_counter()
+        ok = send(path)
+        duration = time.perf_counter() - started
+        with lock:
+            latencies.append(duration)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for path in paths:
+            one(path)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, paths))
+    return latencies, errors, time.perf_counter() - started
+
+
+def _self_peak_rss_kb():
+    # Linux 上 ru_maxrss 单位为KB，macOS 为字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_client(database, endpoints, requests, warmup, concurrency):
+    """进程内使用 Flask 测试客户端压测"""
+    os.environ['DATABASE_PATH'] = database
+    os.environ.setdefault('REALTIME_TRANSPORT', 'none')
+    sys.path.insert(0, ROOT)
+    from app import app
+
+    # 每个请求的INFO日志会刷屏并拖慢压测，只保留警告及以上
+    logging.getLogger().setLevel(logging.WARNING)
+    app.config['TESTING'] = False
+    ids = published_notification_ids(database)
+    local = threading.local()
+
+    def send(path):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        response = client.get(path)
+        response.get_data()
+        return response.status_code < 400
+
+    results = {}
+    for name, template in endpoints:
+        for path in expand_paths(template, ids, warmup):
+            send(path)
+        latencies, errors, elapsed = _run_load(send, expand_paths(template, ids, requests), concurrency)
+        results[name] = summarize(latencies, errors, elapsed, _self_peak_rss_kb())
+        _print_row(name, results[name])
+    return results
+
+
+def _child_peak_rss_kb(pid):
+    """子进程的峰值常驻内存（/proc/<pid>/status 中的 VmHWM）"""
+    try:
+        with open(f'/proc/{pid}/status', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+_SERVER_SCRIPT = '''
+import sys
+sys.path.insert(0, {root!r})
+from app import app
+app.run(host='127.0.0.1', port={port}, threaded=True, use_reloader=False)
+'''
+
+
+def _wait_for_server(base_url, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"服务器进程已退出，状态 {process.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + '/api/grades', timeout=2):
+                return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"服务器在 {timeout} 秒内未就绪: {base_url}")
+
+
+def run_server(database, endpoints, requests, warmup, concurrency, port):
+    """子进程启动本地服务器，通过HTTP压测"""
+    env = dict(os.environ, DATABASE_PATH=database, REALTIME_TRANSPORT=os.environ.get('REALTIME_TRANSPORT', 'none'))
+    process = subprocess.Popen(
+        [sys.executable, '-c', _SERVER_SCRIPT.format(root=ROOT, port=port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    ids = published_notification_ids(database)
+
+    def send(path):
+        try:
+            with urllib.request.urlopen(base_url + path, timeout=30) as response:
+                response.read()
+                return response.status < 400
+        except (urllib.error.URLError, ConnectionError):
+            return False
+
+    results = {}
+    try:
+        _wait_for_server(base_url, process)
+        for name, template in endpoints:
+            for path in expand_paths(template, ids, warmup):
+                send(path)
+            latencies, errors, elapsed = _run_load(send, expand_paths(template, ids, requests), concurrency)
+            results[name] = summarize(latencies, errors, elapsed, _child_peak_rss_kb(process.pid))
+            _print_row(name, results[name])
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _dataset_counts(database):
+    import sqlite3
+    conn = sqlite3.connect(database)
+    try:
+        return {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('papers', 'notifications', 'team_members', 'grades')}
+    finally:
+        conn.close()
+
+
+def _print_row(name, result):
+    rss = f"{result['peak_rss_kb'] / 1024:.0f} MB" if result['peak_rss_kb'] else '-'
+    print(f"{name:<22} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+          f"{result['rps']:>9.1f} {result['errors']:>6} {rss:>9}")
+
+
+def _print_header():
+    print(f"{'端点':<20} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'rps':>9} {'错误':>4} {'峰值RSS':>7}")
+
+
+def baseline_path(name):
+    return name if name.endswith('.json') else os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def compare(report, baseline, threshold=0.2, min_ms=MIN_REGRESSION_MS):
+    """与基线比较，返回退化说明列表（p95 上升或吞吐量下降超过阈值）"""
+    regressions = []
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        p95_limit = previous['p95_ms'] * (1 + threshold)
+        if current['p95_ms'] > p95_limit and current['p95_ms'] - previous['p95_ms'] > min_ms:
+            regressions.append(f"{name}: p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        if previous['rps'] and current['rps'] < previous['rps'] * (1 - threshold):
+            regressions.append(f"{name}: 吞吐量 {previous['rps']} -> {current['rps']} req/s")
+        if current['errors'] > previous.get('errors', 0):
+            regressions.append(f"{name}: 错误数 {previous.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='接口基准测试')
+    parser.add_argument('--mode', choices=('client', 'server'), default='client', help='测试客户端或本地服务器')
+    parser.add_argument('--database', default=DEFAULT_DATABASE, help='基准数据库（generate_data.py 生成）')
+    parser.add_argument('--endpoints', help='逗号分隔的端点名称，默认全部: ' + ','.join(n for n, _ in ENDPOINTS))
+    parser.add_argument('--requests', type=int, default=200, help='每个端点的请求数')
+    parser.add_argument('--warmup', type=int, default=10, help='每个端点的预热请求数')
+    parser.add_argument('--concurrency', type=int, default=1, help='并发线程数')
+    parser.add_argument('--port', type=int, default=5099, help='server 模式的端口')
+    parser.add_argument('--output', help='把结果写入JSON文件')
+    parser.add_argument('--save-baseline', metavar='NAME', help='保存为基线')
+    parser.add_argument('--compare', metavar='NAME', help='与基线比较')
+    parser.add_argument('--threshold', type=float, default=0.2, help='允许的退化比例，默认0.2（20%%）')
+    args = parser.parse_args()
+
+    database = os.path.abspath(args.database)
+    if not os.path.exists(database):
+        print(f"❌ 基准数据库不存在: {database}，请先运行 benchmarks/generate_data.py")
+        sys.exit(2)
+
+    endpoints = ENDPOINTS
+    if args.endpoints:
+        wanted = {name.strip() for name in args.endpoints.split(',')}
+        endpoints = tuple(item for item in ENDPOINTS if item[0] in wanted)
+
+    print(f"📊 基准测试: {args.mode} 模式, 每个端点 {args.requests} 次请求, 并发 {args.concurrency}")
+    _print_header()
+    if args.mode == 'client':
+        results = run_client(database, endpoints, args.requests, args.warmup, args.concurrency)
+    else:
+        results = run_server(database, endpoints, args.requests, args.warmup, args.concurrency, args.port)
+
+    report = {
+        'meta': {
+            'mode': args.mode,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'dataset': _dataset_counts(database),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        path = baseline_path(args.save_baseline)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 基线已保存: {path}")
+
+    if args.compare:
+        path = baseline_path(args.compare)
+        with open(path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('mode') != args.mode:
+            print(f"⚠️ 基线模式为 {baseline['meta'].get('mode')}，当前为 {args.mode}，结果不具可比性")
+        regressions = compare(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"❌ 性能退化: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ 与基线 {args.compare} 相比未发现超过 {args.threshold:.0%} 的退化")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建Vercel使用的只读数据库快照
+从真实内容数据库复制数据，补齐表结构和索引，执行ANALYZE与VACUUM后输出一个紧凑的SQLite文件；
+Vercel冷启动时只需以immutable模式打开该文件，不再执行建表、插入示例数据和密码哈希
+
+快照随部署包公开发布，只保留内容表：用户表等非内容表在复制后清空，
+再由 init_db 创建与内存数据库相同的演示管理员账号（admin / admin123）
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+
+from db_utils import SNAPSHOT_COPY_ON_WRITE, SNAPSHOT_PATH, SnapshotConnection, init_db, transaction
+from change_journal import JOURNAL_TABLE, drop_journal_triggers
+from db_stats import refresh_counters
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'acm_lab.db')
+
+# 不随快照发布的非内容表（管理员账号和密码哈希）
+PRIVATE_TABLES = ('users',)
+
+
+def check_copy_on_write(path):
+    """
+    按Vercel的方式打开快照，在嵌套事务中写入一行，确认写时复制后保存点仍然可用
+
+    写入只发生在内存副本中，快照文件不变
+
+    Raises:
+        RuntimeError: 写时复制后嵌套事务无法正常提交
+    """
+    conn = SnapshotConnection(path)
+    conn.row_factory = sqlite3.Row
+    conn.isolation_level = None
+    try:
+        with transaction(conn):
+            with transaction(conn) as tx:
+                tx.execute('INSERT INTO grades (name) VALUES (?)', ('__snapshot_check__',))
+        count = conn.execute('SELECT COUNT(*) FROM grades WHERE name = ?', ('__snapshot_check__',)).fetchone()[0]
+        if not conn.promoted or count != 1:
+            raise RuntimeError("快照写时复制检查失败: 嵌套事务的写入没有提交到内存副本")
+    except sqlite3.Error as e:
+        raise RuntimeError(f"快照写时复制检查失败: {e}")
+    finally:
+        conn.close()
+
+
+def build_snapshot(source=DEFAULT_SOURCE, output=SNAPSHOT_PATH):
+    """
+    生成数据库快照
+
+    Args:
+        source (str): 内容来源数据库；不存在时使用init_db的示例数据
+        output (str): 快照输出路径
+
+    Returns:
+        dict: 快照信息（大小、耗时）
+    """
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    temp_path = output + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    if os.path.exists(source):
+        print(f"📦 从 {source} 复制内容")
+        src = sqlite3.connect(source)
+        dst = sqlite3.connect(temp_path)
+        try:
+            src.backup(dst)
+            for table in PRIVATE_TABLES:
+                dst.execute(f'DROP TABLE IF EXISTS {table}')
+            dst.commit()
+        finally:
+            dst.close()
+            src.close()
+    else:
+        print(f"⚠️ 内容数据库不存在: {source}，快照将只包含示例数据")
+
+    # 补齐表结构、迁移和索引；重新创建的用户表中只有演示管理员
+    init_db(temp_path)
+
+    conn = sqlite3.connect(temp_path, isolation_level=None)
+    try:
+        # 快照只读，不需要变更日志
+        drop_journal_triggers(conn)
+        conn.execute(f'DROP TABLE IF EXISTS {JOURNAL_TABLE}')
+        refresh_counters(conn)
+
+        conn.execute('ANALYZE')
+        conn.execute('PRAGMA optimize')
+        conn.execute('PRAGMA journal_mode = DELETE')
+        conn.execute('VACUUM')
+
+        check = conn.execute('PRAGMA quick_check').fetchone()[0]
+        if check != 'ok':
+            raise RuntimeError(f"快照完整性检查失败: {check}")
+    finally:
+        conn.close()
+
+    if SNAPSHOT_COPY_ON_WRITE:
+        check_copy_on_write(temp_path)
+
+    os.replace(temp_path, output)
+    info = {
+        'path': output,
+        'size': os.path.getsize(output),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+    print(f"✅ 数据库快照已生成: {output} ({info['size'] / 1024:.1f} KB, {info['elapsed_ms']} ms)")
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description='构建Vercel使用的只读数据库快照')
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help='内容来源数据库')
+    parser.add_argument('--output', default=SNAPSHOT_PATH, help='快照输出路径')
+    args = parser.parse_args()
+    build_snapshot(args.source, args.output)
+
+
+if __name__ == '__main__':
+    main()
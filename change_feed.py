@@ -0,0 +1,234 @@
+"""
+增量变更订阅
+以 change_journal 为唯一数据来源：
+- changes_since: 返回游标之后各资源被修改/删除的记录（同一行多次变更只保留最终状态）
+- journal_etag: 列表接口的ETag由相关表的数据版本（最新日志ID）计算，数据未变化时返回304
+- current_cursor: 当前日志游标，随页面刷新通知一起发出，客户端据此增量同步
+整页缓存（page_cache）和通知详情缓存（notification_cache）同样按 change_journal.table_versions 失效
+"""
+
+import hashlib
+import logging
+from functools import wraps
+
+from flask import Response, make_response, request, session
+
+from change_journal import JOURNAL_TABLE, high_water_mark, journal_floor, primary_key, table_versions
+from db_utils import get_db
+from page_cache import DEPLOY_ID
+from projection import PROJECTIONS
+
+logger = logging.getLogger(__name__)
+
+# 对外提供增量同步的资源及其对应的数据表（用户表等不在其中）
+RESOURCES = {
+    'team': ('team_members', 'grades'),
+    'research': ('research_areas',),
+    'papers': ('papers', 'paper_categories', 'paper_category_relations'),
+    'notifications': ('notifications',),
+    'advisors': ('advisors',),
+    'algorithms': ('algorithms', 'algorithm_awards'),
+    'innovation': ('innovation_projects', 'project_overview', 'innovation_stats', 'innovation_carousel',
+                   'achievements', 'innovation_training_projects', 'intellectual_properties',
+                   'enterprise_cooperations'),
+    'research_projects': ('research_projects',),
+}
+
+# 页面名（notify_page_refresh 使用）到资源名的别名
+ALIASES = {
+    'dynamic': 'notifications',
+    'activities': 'notifications',
+}
+
+CONTENT_TABLES = frozenset(table for tables in RESOURCES.values() for table in tables)
+
+# 公开接口只展示这些状态的行（与前端列表接口的查询条件一致），其余行对匿名客户端按删除处理
+PUBLIC_WHERE = {
+    'notifications': {'status': 'published'},
+    'advisors': {'status': 'active'},
+    'algorithms': {'status': 'active'},
+    'algorithm_awards': {'status': 'active'},
+    'project_overview': {'status': 'active'},
+    'innovation_projects': {'status': 'active'},
+    'innovation_stats': {'status': 'active'},
+    'achievements': {'status': 'active'},
+    'innovation_carousel': {'status': 'active'},
+    'innovation_training_projects': {'status': 'active'},
+    'intellectual_properties': {'status': 'active'},
+    'enterprise_cooperations': {'status': 'active'},
+}
+
+# 单次返回的日志条数上限，超过时 has_more 为真，客户端用新游标继续拉取
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 2000
+
+# 按主键批量读取当前行时每条IN查询的参数个数
+FETCH_CHUNK = 500
+
+
+def resolve_tables(resources=None):
+    """
+    把资源名/页面名/表名解析为数据表集合，未指定或包含 home/all 时返回全部内容表
+
+    Raises:
+        ValueError: 未知的资源名
+    """
+    if not resources:
+        return CONTENT_TABLES
+    tables = set()
+    for name in resources:
+        name = ALIASES.get(name, name)
+        if name in ('home', 'all'):
+            return CONTENT_TABLES
+        if name in RESOURCES:
+            tables.update(RESOURCES[name])
+        elif name in CONTENT_TABLES:
+            tables.add(name)
+        else:
+            raise ValueError(f"未知的资源: {name}")
+    return frozenset(tables)
+
+
+def current_cursor(conn=None):
+    """当前日志游标；在事务中调用时包含本事务尚未提交的变更"""
+    if conn is not None:
+        return high_water_mark(conn)
+    with get_db() as own_conn:
+        return high_water_mark(own_conn)
+
+
+def _row_key(value):
+    """日志中的 row_id 以文本保存，整数主键还原为整数"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _visible_columns(table, public):
+    """
+    变更中返回的列：有投影定义的表与列表接口一致，匿名客户端使用卡片投影，管理员使用全部可投影列；
+    正文等大字段只由详情接口返回。返回 None 表示全部列
+    """
+    spec = PROJECTIONS.get(table)
+    if spec is None:
+        return None
+    return list(spec['card'] if public else spec['columns'])
+
+
+def _fetch_rows(conn, table, row_ids, public=True):
+    """
+    按主键读取当前行，返回 {主键: 行}
+
+    public 为真时只读取公开接口可见的行和列（见 PUBLIC_WHERE、_visible_columns）
+    """
+    pk = primary_key(conn, table)
+    columns = _visible_columns(table, public)
+    if columns is None:
+        select = 'rowid AS rowid, *' if pk == 'rowid' else '*'
+    else:
+        if pk not in columns:
+            columns.insert(0, 'rowid AS rowid' if pk == 'rowid' else pk)
+        select = ', '.join(columns)
+
+    conditions, params = [], []
+    for column, value in (PUBLIC_WHERE.get(table, {}) if public else {}).items():
+        conditions.append(f'{column} = ?')
+        params.append(value)
+    extra = ''.join(f' AND {condition}' for condition in conditions)
+
+    rows = {}
+    for start in range(0, len(row_ids), FETCH_CHUNK):
+        chunk = row_ids[start:start + FETCH_CHUNK]
+        placeholders = ', '.join('?' for _ in chunk)
+        for row in conn.execute(f'SELECT {select} FROM {table} WHERE {pk} IN ({placeholders}){extra}',
+                                [*chunk, *params]):
+            row = dict(row)
+            rows[_row_key(row[pk])] = row
+    return rows
+
+
+def changes_since(conn, since, tables=CONTENT_TABLES, limit=DEFAULT_LIMIT, public=True):
+    """
+    游标 since 之后的变更，按表压缩为最终状态
+
+    since 为空时只返回当前游标；since 早于已压缩的日志或晚于当前游标时返回 reset，客户端需要整体刷新。
+    public 为真时变更行只包含公开接口可见的行和列，变为不可见的行（如草稿、停用）放在 deleted 中
+
+    Returns:
+        dict: {'cursor': 新游标, 'changes': {表名: {'changed': [当前行], 'deleted': [主键]}},
+               'has_more': 是否还有未返回的变更, 'reset': 是否需要整体刷新}
+    """
+    cursor = high_water_mark(conn)
+    result = {'cursor': cursor, 'changes': {}, 'has_more': False, 'reset': False}
+    if since is None:
+        return result
+    if since < journal_floor(conn) or since > cursor:
+        result['reset'] = True
+        return result
+
+    tables = sorted(tables)
+    placeholders = ', '.join('?' for _ in tables)
+    entries = conn.execute(f'''
+        SELECT id, table_name, row_id, op FROM {JOURNAL_TABLE}
+        WHERE id > ? AND id <= ? AND table_name IN ({placeholders})
+        ORDER BY id LIMIT ?
+    ''', [since, cursor, *tables, limit]).fetchall()
+
+    if len(entries) == limit:
+        result['has_more'] = True
+        result['cursor'] = entries[-1][0]
+
+    # 同一行只保留最后一次操作
+    latest = {}
+    for _, table, row_id, op in entries:
+        latest.setdefault(table, {})[_row_key(row_id)] = op
+
+    for table, ops in latest.items():
+        alive = [row_id for row_id, op in ops.items() if op != 'DELETE']
+        rows = _fetch_rows(conn, table, alive, public) if alive else {}
+        # 日志窗口之后又被删除或不再公开的行同样按删除返回
+        deleted = [row_id for row_id in ops if row_id not in rows]
+        result['changes'][table] = {'changed': list(rows.values()), 'deleted': deleted}
+    return result
+
+
+def journal_etag(*tables):
+    """
+    按数据版本计算ETag的装饰器
+
+    ETag由相关表的数据版本、请求路径与参数、登录角色和部署标识计算，命中If-None-Match时不执行视图直接返回304；
+    变更日志不可用时退化为普通响应
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            try:
+                with get_db() as conn:
+                    versions = table_versions(conn, tables)
+            except Exception as e:
+                logger.warning(f"读取数据版本失败: {e}")
+                versions = None
+            if versions is None:
+                return view(*args, **kwargs)
+
+            digest = hashlib.sha1(repr((
+                sorted(versions.items()), request.full_path, session.get('role'), DEPLOY_ID,
+            )).encode('utf-8')).hexdigest()[:20]
+            etag = f'j{max(versions.values())}-{digest}'
+
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            # 每次使用前向服务端验证，数据变化后立即可见
+            response.cache_control.no_cache = True
+            response.cache_control.private = True
+            return response
+        return wrapper
+    return decorator
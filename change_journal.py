@@ -0,0 +1,256 @@
+"""
+数据变更日志模块
+通过触发器把每一次插入、更新、删除记录到 change_journal 表（表名、主键、操作、旧行/新行JSON、时间），
+日志与数据修改在同一事务中写入；配合基础备份可以把数据库恢复到任意时间点
+"""
+
+import json
+import logging
+import sqlite3
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_TABLE = 'change_journal'
+
+# 不记录变更的表
+EXCLUDED_TABLES = {JOURNAL_TABLE, 'sqlite_sequence', 'row_counters'}
+
+# 只修改这些列的UPDATE不写入日志（浏览量等高频计数）
+IGNORED_COLUMNS = {
+    'notifications': {'view_count'},
+}
+
+# 日志时间使用本地时间，精确到毫秒，与备份清单的created_at一致
+TIMESTAMP_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def _trigger_name(table, op):
+    return f'journal_{table}_{op.lower()}'
+
+
+def _journaled_tables(conn):
+    rows = conn.execute('''
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+        ORDER BY name
+    ''').fetchall()
+    return [row[0] for row in rows if row[0] not in EXCLUDED_TABLES]
+
+
+def primary_key(conn, table):
+    """表的主键列名，日志中的 row_id 即该列的值"""
+    return _table_info(conn, table)[1]
+
+
+def _table_info(conn, table):
+    """返回 (列名列表, 主键列名)；没有单列主键时使用rowid"""
+    rows = conn.execute(f'PRAGMA table_info({table})').fetchall()
+    columns = [row[1] for row in rows]
+    pk_columns = [row[1] for row in rows if row[5]]
+    pk = pk_columns[0] if len(pk_columns) == 1 else 'rowid'
+    return columns, pk
+
+
+def _json_object(prefix, columns):
+    return 'json_object(' + ', '.join(f"'{column}', {prefix}.\"{column}\"" for column in columns) + ')'
+
+
+def install_journal(conn):
+    """
+    创建日志表并为所有业务表（重新）生成触发器
+
+    表结构变化（新增列）后再次调用即可让触发器覆盖新列
+    """
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {JOURNAL_TABLE} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id TEXT NOT NULL,
+            op TEXT NOT NULL,
+            old_data TEXT,
+            new_data TEXT,
+            changed_at TEXT NOT NULL DEFAULT ({TIMESTAMP_SQL})
+        )
+    ''')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{JOURNAL_TABLE}_changed_at ON {JOURNAL_TABLE} (changed_at)')
+    # 按表取最新日志ID（数据版本）和按表读取增量变更
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{JOURNAL_TABLE}_table ON {JOURNAL_TABLE} (table_name, id)')
+
+    for table in _journaled_tables(conn):
+        columns, pk = _table_info(conn, table)
+        tracked = [column for column in columns if column not in IGNORED_COLUMNS.get(table, set())]
+        old_json = _json_object('OLD', columns)
+        new_json = _json_object('NEW', columns)
+
+        statements = {
+            'INSERT': f'''
+                CREATE TRIGGER {_trigger_name(table, 'INSERT')} AFTER INSERT ON {table}
+                BEGIN
+                    INSERT INTO {JOURNAL_TABLE} (table_name, row_id, op, new_data)
+                    VALUES ('{table}', NEW.{pk}, 'INSERT', {new_json});
+                END
+            ''',
+            'UPDATE': f'''
+                CREATE TRIGGER {_trigger_name(table, 'UPDATE')}
+                AFTER UPDATE OF {', '.join(f'"{column}"' for column in tracked)} ON {table}
+                BEGIN
+                    INSERT INTO {JOURNAL_TABLE} (table_name, row_id, op, old_data, new_data)
+                    VALUES ('{table}', NEW.{pk}, 'UPDATE', {old_json}, {new_json});
+                END
+            ''',
+            'DELETE': f'''
+                CREATE TRIGGER {_trigger_name(table, 'DELETE')} AFTER DELETE ON {table}
+                BEGIN
+                    INSERT INTO {JOURNAL_TABLE} (table_name, row_id, op, old_data)
+                    VALUES ('{table}', OLD.{pk}, 'DELETE', {old_json});
+                END
+            ''',
+        }
+        for op, sql in statements.items():
+            conn.execute(f'DROP TRIGGER IF EXISTS {_trigger_name(table, op)}')
+            conn.execute(sql)
+
+
+def drop_journal_triggers(conn):
+    """删除所有日志触发器（重放日志时使用，避免重放本身再次写入日志）"""
+    rows = conn.execute('''
+        SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'journal\\_%' ESCAPE '\\'
+    ''').fetchall()
+    for row in rows:
+        conn.execute(f'DROP TRIGGER IF EXISTS {row[0]}')
+
+
+def high_water_mark(conn):
+    """当前日志的最大ID（日志被全部压缩后为自增序列的当前值），日志表不存在时返回0"""
+    try:
+        row = conn.execute(f'''
+            SELECT MAX(COALESCE((SELECT MAX(id) FROM {JOURNAL_TABLE}), 0),
+                       COALESCE((SELECT seq FROM sqlite_sequence WHERE name = '{JOURNAL_TABLE}'), 0))
+        ''').fetchone()
+    except Exception:
+        return 0
+    return row[0]
+
+
+def journal_floor(conn):
+    """
+    已被压缩掉的日志的最大ID：小于它的游标无法再读到完整的增量
+
+    日志非空时为最小ID减一，日志被全部压缩时为自增序列的当前值
+    """
+    row = conn.execute(f'''
+        SELECT (SELECT MIN(id) - 1 FROM {JOURNAL_TABLE}),
+               (SELECT seq FROM sqlite_sequence WHERE name = '{JOURNAL_TABLE}')
+    ''').fetchone()
+    return row[0] if row[0] is not None else (row[1] or 0)
+
+
+def table_versions(conn, tables):
+    """
+    各表的数据版本：该表最新一条日志的ID
+
+    表的日志全部被压缩后使用 journal_floor，版本号不会倒退；
+    日志表不存在（如Vercel内存数据库）时返回None
+
+    Returns:
+        dict: {表名: 版本号}
+    """
+    tables = list(tables)
+    if not tables:
+        return {}
+    columns = ', '.join(f'(SELECT MAX(id) FROM {JOURNAL_TABLE} WHERE table_name = ?)' for _ in tables)
+    try:
+        row = conn.execute(f'SELECT {columns}', tables).fetchone()
+        floor = journal_floor(conn)
+    except sqlite3.OperationalError:
+        return None
+    return {table: version if version is not None else floor for table, version in zip(tables, row)}
+
+
+def format_timestamp(value):
+    """把datetime或ISO格式字符串转换为日志使用的时间格式"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime(TIMESTAMP_FORMAT)[:-3]
+
+
+def iter_changes(conn, after_id=0, until=None, batch_size=500):
+    """按ID顺序读取 after_id 之后（且不晚于 until）的日志"""
+    sql = f'SELECT id, table_name, row_id, op, old_data, new_data, changed_at FROM {JOURNAL_TABLE} WHERE id > ?'
+    params = [after_id]
+    if until is not None:
+        sql += ' AND changed_at <= ?'
+        params.append(format_timestamp(until))
+    cursor = conn.execute(sql + ' ORDER BY id', params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
+
+
+def _apply_change(conn, table, row_id, op, new_data, pk_cache):
+    if table not in pk_cache:
+        pk_cache[table] = _table_info(conn, table)
+    columns, pk = pk_cache[table]
+
+    if op == 'DELETE':
+        conn.execute(f'DELETE FROM {table} WHERE {pk} = ?', (row_id,))
+        return
+
+    data = {key: value for key, value in json.loads(new_data).items() if key in columns}
+    if pk == 'rowid':
+        data['rowid'] = row_id
+    names = ', '.join(f'"{name}"' if name != 'rowid' else name for name in data)
+    placeholders = ', '.join('?' for _ in data)
+    conn.execute(f'INSERT OR REPLACE INTO {table} ({names}) VALUES ({placeholders})', list(data.values()))
+
+
+def replay(target_conn, source_conn, after_id, until=None):
+    """
+    把 source_conn 中 after_id 之后的日志重放到 target_conn
+
+    重放的日志行会按原ID写入目标库的日志表，目标库的日志与数据保持一致
+
+    Returns:
+        int: 重放的变更数
+    """
+    pk_cache = {}
+    count = 0
+    # INSERT OR REPLACE 删除旧行时同样触发行数计数触发器
+    target_conn.execute('PRAGMA recursive_triggers = ON')
+    drop_journal_triggers(target_conn)
+    target_conn.execute('BEGIN IMMEDIATE')
+    try:
+        for change in iter_changes(source_conn, after_id, until):
+            change_id, table, row_id, op, old_data, new_data, changed_at = tuple(change)
+            _apply_change(target_conn, table, row_id, op, new_data, pk_cache)
+            target_conn.execute(f'''
+                INSERT OR REPLACE INTO {JOURNAL_TABLE} (id, table_name, row_id, op, old_data, new_data, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (change_id, table, row_id, op, old_data, new_data, changed_at))
+            count += 1
+        install_journal(target_conn)
+        target_conn.execute('COMMIT')
+    except Exception:
+        target_conn.execute('ROLLBACK')
+        install_journal(target_conn)
+        raise
+    return count
+
+
+def compact_journal(conn, before_id):
+    """
+    压缩日志：删除已被基础备份覆盖的日志（ID不大于 before_id）
+
+    Returns:
+        int: 删除的日志条数
+    """
+    cursor = conn.execute(f'DELETE FROM {JOURNAL_TABLE} WHERE id <= ?', (before_id,))
+    deleted = cursor.rowcount
+    conn.commit()
+    if deleted:
+        logger.info(f"已压缩变更日志: 删除 {deleted} 条 (id <= {before_id})")
+    return deleted
@@ -0,0 +1,75 @@
+"""
+资源版本号
+每次写操作提交后，被通知刷新的资源（team、papers、dynamic 等页面名）版本号递增，
+SSE（/api/events）和长轮询（/api/changes/wait）据此阻塞等待变化，不需要 WebSocket。
+
+版本号从进程启动时的毫秒时间戳开始递增，进程重启后不会倒退；客户端带来的版本号不属于当前进程
+（早于启动时刻或大于当前版本）时返回 reset，客户端整体刷新一次后使用新的版本号。
+版本号只在进程内有效，多进程部署时各进程分别计数。
+"""
+
+import threading
+import time
+
+# 通知所有页面刷新时使用的资源名（notify_all_pages）
+ALL_RESOURCES = 'all'
+
+
+class ChangeVersions:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.epoch = int(time.time() * 1000)
+        self.version = self.epoch
+        self.resources = {}
+        self.waiters = 0
+
+    def bump(self, resource):
+        """资源发生变化，返回新的全局版本号"""
+        with self._cond:
+            self.version += 1
+            self.resources[resource] = self.version
+            self._cond.notify_all()
+            return self.version
+
+    def _result(self, since, resources=None):
+        if since is None or since < self.epoch or since > self.version:
+            return {'version': self.version, 'changed': dict(self.resources), 'reset': since is not None}
+        changed = {
+            name: version for name, version in self.resources.items()
+            if version > since and (not resources or name in resources or name == ALL_RESOURCES)
+        }
+        return {'version': self.version, 'changed': changed, 'reset': False}
+
+    def changed_since(self, since, resources=None):
+        """
+        since 之后发生变化的资源
+
+        Returns:
+            dict: {'version': 当前版本, 'changed': {资源: 版本}, 'reset': 是否需要整体刷新}
+        """
+        with self._cond:
+            return self._result(since, resources)
+
+    def wait(self, since, resources=None, timeout=25.0):
+        """阻塞直到 since 之后关注的资源发生变化或超时；since 为空时立即返回当前版本"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self.waiters += 1
+            try:
+                while True:
+                    result = self._result(since, resources)
+                    if since is None or result['reset'] or result['changed']:
+                        return result
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return result
+                    self._cond.wait(remaining)
+            finally:
+                self.waiters -= 1
+
+    def stats(self):
+        with self._cond:
+            return {'version': self.version, 'resources': len(self.resources), 'waiters': self.waiters}
+
+
+versions = ChangeVersions()
@@ -0,0 +1,262 @@
+"""
+前端只读数据源
+前端展示接口统一通过 data_source.query/count 读取数据，不再在每个接口里维护一份Vercel Mock字面量：
+- SqliteDataSource: 查询数据库（本地环境，以及带快照的Vercel部署）
+- FixtureDataSource: 读取 fixtures/vercel_data.json，启动时加载一次，行数据冻结为只读映射，
+  按等值条件建立索引并缓存排序结果；用于没有数据库快照的Vercel部署
+数据源在进程启动时选择一次，可通过环境变量 DATA_SOURCE=sqlite|fixtures 强制指定
+"""
+
+import json
+import logging
+import os
+import threading
+from types import MappingProxyType
+
+from db_utils import get_db, snapshot_available
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_PATH = os.environ.get(
+    'DATA_FIXTURES_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'vercel_data.json'),
+)
+
+# Fixture 数据按这些列建立等值索引，其余列的条件退化为顺序扫描
+INDEXED_COLUMNS = ('status', 'category', 'grade', 'type')
+
+
+def _normalize_order(order_by):
+    """
+    排序规则统一为 ((列名, 'ASC'|'DESC', 空值替代值), ...)
+
+    空值替代值对应SQL中的 COALESCE(列, 默认值)，为None时保持NULL
+    """
+    normalized = []
+    for item in order_by or ():
+        if isinstance(item, str):
+            item = (item,)
+        column = item[0]
+        direction = item[1].upper() if len(item) > 1 else 'ASC'
+        null_default = item[2] if len(item) > 2 else None
+        if direction not in ('ASC', 'DESC'):
+            raise ValueError(f"无效的排序方向: {direction}")
+        normalized.append((column, direction, null_default))
+    return tuple(normalized)
+
+
+class SqliteDataSource:
+    """基于数据库的数据源"""
+
+    name = 'sqlite'
+
+    @staticmethod
+    def _where(where):
+        if not where:
+            return '', []
+        clauses, params = [], []
+        for column, value in where.items():
+            if isinstance(value, (list, tuple, set, frozenset)):
+                values = list(value)
+                clauses.append(f"{column} IN ({', '.join('?' for _ in values)})" if values else '0')
+                params.extend(values)
+            else:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        return ' WHERE ' + ' AND '.join(clauses), params
+
+    def query(self, table, where=None, order_by=(), limit=None, offset=0, columns=None):
+        """
+        查询表中的行
+
+        Args:
+            table (str): 表名
+            where (dict): 等值条件 {列名: 值}，值为列表时表示 IN
+            order_by (tuple): 排序规则，见 _normalize_order
+            limit (int): 最多返回的行数
+            offset (int): 跳过的行数
+            columns (list): 要返回的列，None 表示全部列
+
+        Returns:
+            list: 字典列表
+        """
+        select = ', '.join(columns) if columns else '*'
+        where_sql, params = self._where(where)
+        sql = f'SELECT {select} FROM {table}{where_sql}'
+
+        terms = []
+        for column, direction, null_default in _normalize_order(order_by):
+            expr = column if null_default is None else f'COALESCE({column}, ?)'
+            if null_default is not None:
+                params.append(null_default)
+            terms.append(f'{expr} {direction}')
+        if terms:
+            sql += ' ORDER BY ' + ', '.join(terms)
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params.extend([limit, offset])
+
+        with get_db() as conn:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+    def count(self, table, where=None):
+        where_sql, params = self._where(where)
+        with get_db() as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM {table}{where_sql}', params).fetchone()[0]
+
+    def get(self, table, item_id):
+        rows = self.query(table, {'id': item_id})
+        return rows[0] if rows else None
+
+
+def _sort_value(value, null_default):
+    """按SQLite的比较规则生成排序键：NULL < 数值 < 文本"""
+    if value is None:
+        value = null_default
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, value)
+    return (2, str(value))
+
+
+class _Descending:
+    """反转比较结果，用于混合升降序的多列排序"""
+
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+class FixtureDataSource:
+    """
+    基于JSON示例数据的只读数据源
+
+    行在加载时冻结为 MappingProxyType，返回给调用方的是副本；
+    等值索引在加载时建立，排序结果按 (表, 排序规则) 缓存
+    """
+
+    name = 'fixtures'
+
+    def __init__(self, path=FIXTURES_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+
+        self.path = path
+        self._rows = {}
+        self._by_id = {}
+        self._indexes = {}
+        self._orders = {}
+        self._lock = threading.Lock()
+
+        for table, rows in document.get('tables', {}).items():
+            frozen = tuple(MappingProxyType(dict(row)) for row in rows)
+            self._rows[table] = frozen
+            self._by_id[table] = {row['id']: row for row in frozen if 'id' in row}
+            indexes = {}
+            for column in INDEXED_COLUMNS:
+                if frozen and column in frozen[0]:
+                    index = {}
+                    for position, row in enumerate(frozen):
+                        index.setdefault(row[column], []).append(position)
+                    indexes[column] = index
+            self._indexes[table] = indexes
+
+        logger.info(f"已加载示例数据 {path}: {', '.join(f'{t}={len(r)}' for t, r in self._rows.items())}")
+
+    def _ordered_positions(self, table, order_by):
+        """返回按排序规则排列的行位置（缓存）"""
+        key = (table, order_by)
+        positions = self._orders.get(key)
+        if positions is None:
+            rows = self._rows.get(table, ())
+
+            def sort_key(position):
+                row = rows[position]
+                parts = []
+                for column, direction, null_default in order_by:
+                    value = _sort_value(row.get(column), null_default)
+                    parts.append(_Descending(value) if direction == 'DESC' else value)
+                return parts
+
+            # Python排序是稳定的，相同排序键保持文件中的顺序（相当于rowid）
+            positions = tuple(sorted(range(len(rows)), key=sort_key))
+            with self._lock:
+                self._orders[key] = positions
+        return positions
+
+    def _matching_positions(self, table, where):
+        rows = self._rows.get(table, ())
+        if not where:
+            return None
+
+        candidates = None
+        pending = {}
+        for column, value in where.items():
+            values = value if isinstance(value, (list, tuple, set, frozenset)) else (value,)
+            index = self._indexes.get(table, {}).get(column)
+            if index is None:
+                pending[column] = set(values)
+                continue
+            matched = set()
+            for item in values:
+                matched.update(index.get(item, ()))
+            candidates = matched if candidates is None else candidates & matched
+
+        if candidates is None:
+            candidates = range(len(rows))
+        return {position for position in candidates
+                if all(rows[position].get(column) in values for column, values in pending.items())}
+
+    def query(self, table, where=None, order_by=(), limit=None, offset=0, columns=None):
+        """参数与 SqliteDataSource.query 相同"""
+        rows = self._rows.get(table, ())
+        matched = self._matching_positions(table, where)
+        order_by = _normalize_order(order_by)
+
+        if order_by:
+            positions = [p for p in self._ordered_positions(table, order_by) if matched is None or p in matched]
+        else:
+            positions = range(len(rows)) if matched is None else sorted(matched)
+
+        if limit is not None:
+            positions = list(positions)[offset:offset + limit]
+
+        if columns:
+            return [{column: rows[p].get(column) for column in columns} for p in positions]
+        return [dict(rows[p]) for p in positions]
+
+    def count(self, table, where=None):
+        matched = self._matching_positions(table, where)
+        return len(self._rows.get(table, ())) if matched is None else len(matched)
+
+    def get(self, table, item_id):
+        row = self._by_id.get(table, {}).get(item_id)
+        return dict(row) if row is not None else None
+
+
+def create_data_source():
+    """
+    选择数据源：环境变量指定 > Vercel且无数据库快照时使用示例数据 > 数据库
+    """
+    choice = os.environ.get('DATA_SOURCE', '').strip().lower()
+    if not choice:
+        use_fixtures = os.environ.get('VERCEL') and not snapshot_available() and os.path.exists(FIXTURES_PATH)
+        choice = 'fixtures' if use_fixtures else 'sqlite'
+
+    if choice == 'fixtures':
+        try:
+            return FixtureDataSource()
+        except (OSError, ValueError) as e:
+            logger.error(f"加载示例数据失败，改用数据库: {e}")
+    return SqliteDataSource()
+
+
+data_source = create_data_source()
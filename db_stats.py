@@ -0,0 +1,144 @@
+"""
+数据库统计模块
+row_counters 表由触发器维护每张表的精确行数，读取统计信息只需O(表数)而不再逐表COUNT(*)；
+各表占用的页数和字节数通过 dbstat 虚拟表获取（SQLite未编译dbstat时退化为整库大小）
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_TABLE = 'row_counters'
+
+# 不计数的表
+EXCLUDED_TABLES = {COUNTERS_TABLE, 'sqlite_sequence'}
+
+
+def _trigger_name(table, op):
+    return f'count_{table}_{op}'
+
+
+def _counted_tables(conn):
+    rows = conn.execute('''
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+        ORDER BY name
+    ''').fetchall()
+    return [row[0] for row in rows if row[0] not in EXCLUDED_TABLES]
+
+
+def install_counters(conn):
+    """
+    创建计数表和计数触发器
+
+    新出现的表会用一次COUNT(*)初始化计数，之后只由触发器增减；
+    使用 INSERT OR REPLACE 的连接需要开启 PRAGMA recursive_triggers 才能正确计数
+    """
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {COUNTERS_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    counted = {row[0] for row in conn.execute(f'SELECT table_name FROM {COUNTERS_TABLE}').fetchall()}
+
+    for table in _counted_tables(conn):
+        if table not in counted:
+            conn.execute(f'''
+                INSERT INTO {COUNTERS_TABLE} (table_name, row_count)
+                SELECT ?, COUNT(*) FROM {table}
+            ''', (table,))
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {_trigger_name(table, 'insert')} AFTER INSERT ON {table}
+            BEGIN
+                UPDATE {COUNTERS_TABLE} SET row_count = row_count + 1 WHERE table_name = '{table}';
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {_trigger_name(table, 'delete')} AFTER DELETE ON {table}
+            BEGIN
+                UPDATE {COUNTERS_TABLE} SET row_count = row_count - 1 WHERE table_name = '{table}';
+            END
+        ''')
+
+
+def refresh_counters(conn):
+    """用COUNT(*)重新校准所有计数（仅用于修复，开销与数据量成正比）"""
+    for table in _counted_tables(conn):
+        conn.execute(f'''
+            INSERT OR REPLACE INTO {COUNTERS_TABLE} (table_name, row_count)
+            SELECT ?, COUNT(*) FROM {table}
+        ''', (table,))
+    conn.commit()
+
+
+def row_counts(conn):
+    """读取各表行数；计数表不存在时退化为逐表COUNT(*)"""
+    try:
+        rows = conn.execute(f'SELECT table_name, row_count FROM {COUNTERS_TABLE}').fetchall()
+        return {row[0]: row[1] for row in rows}
+    except Exception:
+        logger.warning("计数表不存在，退化为逐表统计")
+        return {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in _counted_tables(conn)}
+
+
+def storage_usage(conn):
+    """
+    各表（含索引）占用的页数和字节数
+
+    Returns:
+        dict|None: {表名: {'pages', 'bytes', 'indexes_bytes'}}，SQLite不支持dbstat时返回None
+    """
+    try:
+        rows = conn.execute('''
+            SELECT m.tbl_name, m.type, COUNT(*), SUM(s.pgsize)
+            FROM dbstat s JOIN sqlite_master m ON s.name = m.name
+            GROUP BY m.tbl_name, m.type
+        ''').fetchall()
+    except Exception:
+        return None
+
+    usage = {}
+    for table, obj_type, pages, size in rows:
+        entry = usage.setdefault(table, {'pages': 0, 'bytes': 0, 'indexes_bytes': 0})
+        entry['pages'] += pages
+        entry['bytes'] += size
+        if obj_type == 'index':
+            entry['indexes_bytes'] += size
+    return usage
+
+
+def database_stats(conn, db_path=None):
+    """
+    汇总数据库统计信息
+
+    Returns:
+        dict: 文件大小、页大小、页数、空闲页数、各表行数与存储占用
+    """
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    freelist_count = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    counts = row_counts(conn)
+    usage = storage_usage(conn)
+
+    tables = {}
+    for table, count in counts.items():
+        tables[table] = {'rows': count}
+        if usage is not None:
+            tables[table].update(usage.get(table, {'pages': 0, 'bytes': 0, 'indexes_bytes': 0}))
+
+    file_size = page_size * page_count
+    if db_path and os.path.exists(db_path):
+        file_size = os.path.getsize(db_path)
+
+    return {
+        'file_size': file_size,
+        'page_size': page_size,
+        'page_count': page_count,
+        'freelist_count': freelist_count,
+        'dbstat_available': usage is not None,
+        'total_records': sum(counts.values()),
+        'tables': tables,
+    }
@@ -1,13 +1,131 @@
 """
 数据库工具模块
 用于提供数据库连接功能，避免循环导入问题
-支持Vercel无服务器环境的内存数据库
+支持Vercel无服务器环境：优先使用构建阶段生成的只读快照，没有快照时退化为内存数据库
 """
 
 import sqlite3
 import os
+import random
+import threading
+import time
+import logging
 from contextlib import contextmanager
 
+logger = logging.getLogger(__name__)
+
+# SQL语句监听回调 callback(record)，record 为 StatementRecord，由性能指标、SQL追踪等模块注册
+_statement_listeners = []
+
+def add_statement_listener(callback):
+    """注册SQL语句监听回调，每条通过 get_db 连接执行的语句结束后调用"""
+    if callback not in _statement_listeners:
+        _statement_listeners.append(callback)
+
+def remove_statement_listener(callback):
+    if callback in _statement_listeners:
+        _statement_listeners.remove(callback)
+
+class StatementRecord:
+    """
+    一条已执行的SQL语句
+
+    duration: 执行耗时加上调用方读取结果的耗时（随读取累加，查询的大部分时间花在逐行读取上），单位秒
+    rows: 写操作为影响的行数；查询为调用方已读取的行数（随读取累加）；出错或无法统计时为None
+    """
+
+    __slots__ = ('sql', 'duration', 'rows', 'error')
+
+    def __init__(self, sql, duration, rows=None, error=None):
+        self.sql = sql
+        self.duration = duration
+        self.rows = rows
+        self.error = error
+
+class TracedCursor(sqlite3.Cursor):
+    """读取结果时把行数和读取耗时累加到对应语句记录的游标"""
+
+    record = None
+
+    def _count(self, n, started):
+        record = self.record
+        if record is not None:
+            record.duration += time.perf_counter() - started
+            if record.rows is not None:
+                record.rows += n
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._count(0 if row is None else 1, started)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._count(len(rows), started)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._count(len(rows), started)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._count(0, started)
+            raise
+        self._count(1, started)
+        return row
+
+def _notify_statement(record):
+    for callback in _statement_listeners:
+        try:
+            callback(record)
+        except Exception as e:
+            logger.error(f"SQL语句监听回调执行失败: {e}")
+
+class InstrumentedConnection(sqlite3.Connection):
+    """执行语句时计时、统计行数并通知监听回调的连接；没有监听回调时不做额外工作"""
+
+    def _traced(self, method, sql, *args):
+        cursor = self.cursor(TracedCursor)
+        started = time.perf_counter()
+        error = None
+        try:
+            getattr(cursor, method)(sql, *args)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            rows = None
+            if error is None and method != 'executescript':
+                rows = cursor.rowcount if cursor.rowcount >= 0 else 0
+            record = StatementRecord(sql, duration, rows, error)
+            cursor.record = record
+            _notify_statement(record)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        if not _statement_listeners:
+            return super().execute(sql, parameters)
+        return self._traced('execute', sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not _statement_listeners:
+            return super().executemany(sql, seq_of_parameters)
+        return self._traced('executemany', sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        if not _statement_listeners:
+            return super().executescript(sql_script)
+        return self._traced('executescript', sql_script)
+
 # 全局变量用于存储内存数据库连接
 _memory_db = None
 _is_vercel = os.environ.get('VERCEL') or os.environ.get('VERCEL_ENV')
@@ -17,17 +135,108 @@ def get_db_path():
     if _is_vercel:
         # Vercel环境使用内存数据库
         return ':memory:'
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'acm_lab.db')
+    # DATABASE_PATH 可指定其他数据库文件（如基准测试使用的大规模数据集）
+    db_path = os.environ.get('DATABASE_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'acm_lab.db')
     return db_path
 
+# 构建阶段由 build_snapshot.py 生成的只读数据库快照
+SNAPSHOT_PATH = os.environ.get('DB_SNAPSHOT_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'snapshot', 'acm_lab.snapshot.db')
+SNAPSHOT_MMAP_SIZE = 64 * 1024 * 1024
+
+# 首次写入时把快照复制到内存数据库继续使用；关闭后快照严格只读，写操作直接报错
+SNAPSHOT_COPY_ON_WRITE = os.environ.get('DB_SNAPSHOT_COPY_ON_WRITE', '1').lower() not in ('0', 'false', 'no')
+
+def snapshot_available():
+    """Vercel环境中是否存在可用的数据库快照"""
+    return bool(_is_vercel) and os.path.exists(SNAPSHOT_PATH)
+
+class SnapshotConnection:
+    """
+    只读快照连接
+
+    以 immutable=1 打开快照文件并启用mmap，读取时不加锁、不检查文件变化；
+    开启写事务（BEGIN IMMEDIATE/EXCLUSIVE、SAVEPOINT）或第一次写入失败时把快照复制到内存数据库，
+    此后所有操作都在内存副本上进行。transaction() 开启最外层事务时就完成复制，
+    嵌套事务的保存点因此都建立在内存副本上，不会在复制时丢失
+    """
+
+    # 开启写事务的语句：执行前先复制到内存
+    WRITE_TRANSACTION_PREFIXES = ('BEGIN IMMEDIATE', 'BEGIN EXCLUSIVE', 'SAVEPOINT')
+
+    def __init__(self, path):
+        conn = sqlite3.connect(f'file:{path}?mode=ro&immutable=1', uri=True, check_same_thread=False,
+                               factory=InstrumentedConnection)
+        conn.execute(f'PRAGMA mmap_size = {SNAPSHOT_MMAP_SIZE}')
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_promote_lock', threading.Lock())
+        object.__setattr__(self, 'promoted', False)
+
+    def _promote(self):
+        """复制快照到内存数据库（写时复制）"""
+        with self._promote_lock:
+            if self.promoted:
+                return
+            source = self._conn
+            was_in_transaction = source.in_transaction
+            if was_in_transaction:
+                source.execute('ROLLBACK')
+            
+            memory = sqlite3.connect(':memory:', check_same_thread=False, factory=InstrumentedConnection)
+            source.backup(memory)
+            memory.row_factory = source.row_factory
+            memory.isolation_level = source.isolation_level
+            memory.execute('PRAGMA recursive_triggers = ON')
+            if was_in_transaction:
+                memory.execute('BEGIN IMMEDIATE')
+            
+            object.__setattr__(self, '_conn', memory)
+            object.__setattr__(self, 'promoted', True)
+            source.close()
+            logger.info("数据库快照已复制到内存，后续写入在内存副本中进行")
+
+    def _run(self, method, *args):
+        if not self.promoted and SNAPSHOT_COPY_ON_WRITE and method == 'execute' \
+                and args[0].lstrip().upper().startswith(self.WRITE_TRANSACTION_PREFIXES):
+            self._promote()
+        try:
+            return getattr(self._conn, method)(*args)
+        except sqlite3.OperationalError as e:
+            if self.promoted or not SNAPSHOT_COPY_ON_WRITE or 'readonly' not in str(e):
+                raise
+            self._promote()
+            return getattr(self._conn, method)(*args)
+
+    def execute(self, sql, parameters=()):
+        return self._run('execute', sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run('executemany', sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._run('executescript', sql_script)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
 def get_memory_db():
-    """获取全局内存数据库连接（仅用于Vercel环境）"""
+    """获取全局数据库连接（仅用于Vercel环境）：有快照时打开快照，否则创建内存数据库"""
     global _memory_db
+    if _memory_db is None and snapshot_available():
+        _memory_db = SnapshotConnection(SNAPSHOT_PATH)
+        _memory_db.row_factory = sqlite3.Row
+        _memory_db.isolation_level = None
+        logger.info(f"使用只读数据库快照: {SNAPSHOT_PATH}")
     if _memory_db is None:
-        _memory_db = sqlite3.connect(':memory:', check_same_thread=False)
+        _memory_db = sqlite3.connect(':memory:', check_same_thread=False, factory=InstrumentedConnection)
         _memory_db.row_factory = sqlite3.Row
         _memory_db.isolation_level = None
-        print("🔧 创建新的内存数据库连接")
+        _memory_db.execute('PRAGMA recursive_triggers = ON')
+        logger.info("创建新的内存数据库连接")
         # 立即初始化表结构
         _init_memory_tables(_memory_db)
     return _memory_db
@@ -148,14 +357,17 @@ def _init_memory_tables(conn):
         print(f"❌ 初始化内存数据库失败: {e}")
 
 @contextmanager
-def get_db():
+def get_db(db_path=None):
     """
     获取数据库连接的上下文管理器
     
+    Args:
+        db_path (str): 指定数据库文件路径（构建快照时使用），默认按运行环境选择
+    
     Yields:
         sqlite3.Connection: 数据库连接对象
     """
-    if _is_vercel:
+    if _is_vercel and db_path is None:
         # Vercel环境：使用共享的内存数据库
         conn = get_memory_db()
         try:
@@ -165,18 +377,222 @@ def get_db():
             pass
     else:
         # 本地环境：使用文件数据库
-        db_path = get_db_path()
-        conn = sqlite3.connect(db_path)
+        db_path = db_path or get_db_path()
+        conn = sqlite3.connect(db_path, factory=InstrumentedConnection)
         conn.row_factory = sqlite3.Row  # 使结果可以通过列名访问
         conn.isolation_level = None  # 启用自动提交模式
+        conn.execute('PRAGMA recursive_triggers = ON')  # INSERT OR REPLACE 删除旧行时也触发计数触发器
         try:
             yield conn
         finally:
             conn.close()
 
-def init_db():
+# 数据库繁忙（SQLITE_BUSY）时的重试次数与初始退避时间（秒）
+TRANSACTION_RETRIES = 5
+TRANSACTION_BACKOFF = 0.05
+
+# 每个连接当前所在的事务栈，用于判断嵌套层级
+_transactions = {}
+_transactions_lock = threading.Lock()
+
+# 每个线程上正在进行的事务栈，供不持有连接的代码（如实时通知的发件箱）把动作挂到当前事务上
+_thread_transactions = threading.local()
+
+
+class Transaction:
+    """
+    一个工作单元
+
+    最外层事务使用 BEGIN IMMEDIATE 开启，嵌套的事务使用 SAVEPOINT；
+    通过 on_commit 注册的回调只在最外层事务成功提交后执行
+    """
+
+    def __init__(self, conn, parent=None):
+        self.conn = conn
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self._hooks = []
+
+    @property
+    def savepoint(self):
+        return f'sp_{self.depth}'
+
+    def execute(self, sql, params=()):
+        return self.conn.execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.conn.executemany(sql, seq_of_params)
+
+    def on_commit(self, callback, *args, **kwargs):
+        """注册提交成功后执行的回调（缓存失效、实时通知等）"""
+        self._hooks.append((callback, args, kwargs))
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def _execute_with_retry(conn, sql, retries, backoff):
+    """执行 BEGIN/COMMIT，数据库被其他连接锁定时按指数退避重试"""
+    for attempt in range(retries + 1):
+        try:
+            conn.execute(sql)
+            return
+        except sqlite3.OperationalError as e:
+            if not _is_busy(e) or attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt) * (1 + random.random())
+            logger.warning(f"数据库繁忙，{delay:.2f}s 后重试 {sql} ({attempt + 1}/{retries})")
+            time.sleep(delay)
+
+
+def _run_hooks(hooks):
+    for callback, args, kwargs in hooks:
+        try:
+            callback(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"提交后回调执行失败: {e}")
+
+
+def current_transaction(conn):
+    """获取连接上正在进行的最内层事务，没有时返回None"""
+    with _transactions_lock:
+        stack = _transactions.get(id(conn))
+        return stack[-1] if stack else None
+
+
+def active_transaction():
+    """获取当前线程上正在进行的最内层事务（不论哪个连接），没有时返回None"""
+    stack = getattr(_thread_transactions, 'stack', None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def transaction(conn=None, retries=TRANSACTION_RETRIES, backoff=TRANSACTION_BACKOFF):
+    """
+    事务上下文管理器
+
+    用法:
+        with transaction() as tx:
+            tx.execute('DELETE FROM ...')
+            tx.on_commit(notify_page_refresh, 'dynamic', {...})
+
+    Args:
+        conn: 已有的数据库连接；为None时自动通过get_db获取
+        retries (int): BEGIN/COMMIT 遇到数据库繁忙时的重试次数
+        backoff (float): 初始退避时间（秒）
+
+    Yields:
+        Transaction: 当前工作单元
+    """
+    if conn is None:
+        with get_db() as own_conn:
+            with transaction(own_conn, retries, backoff) as tx:
+                yield tx
+        return
+
+    parent = current_transaction(conn)
+    if parent is None and conn.in_transaction:
+        # 连接上已有未提交的隐式事务（非自动提交模式的连接），先提交以免混入本工作单元
+        conn.commit()
+
+    tx = Transaction(conn, parent)
+    with _transactions_lock:
+        _transactions.setdefault(id(conn), []).append(tx)
+    thread_stack = getattr(_thread_transactions, 'stack', None)
+    if thread_stack is None:
+        thread_stack = _thread_transactions.stack = []
+    thread_stack.append(tx)
+
+    try:
+        if parent is None:
+            _execute_with_retry(conn, 'BEGIN IMMEDIATE', retries, backoff)
+        else:
+            conn.execute(f'SAVEPOINT {tx.savepoint}')
+
+        try:
+            yield tx
+        except BaseException:
+            if parent is None:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+            else:
+                conn.execute(f'ROLLBACK TO {tx.savepoint}')
+                conn.execute(f'RELEASE {tx.savepoint}')
+            raise
+
+        if parent is None:
+            try:
+                _execute_with_retry(conn, 'COMMIT', retries, backoff)
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+        else:
+            conn.execute(f'RELEASE {tx.savepoint}')
+    finally:
+        with _transactions_lock:
+            stack = _transactions.get(id(conn))
+            if stack:
+                stack.pop()
+                if not stack:
+                    del _transactions[id(conn)]
+        if tx in thread_stack:
+            thread_stack.remove(tx)
+
+    if parent is None:
+        _run_hooks(tx._hooks)
+    else:
+        # 保存点释放后，回调归属外层事务，等待最外层提交
+        parent._hooks.extend(tx._hooks)
+
+
+def on_commit(conn, callback, *args, **kwargs):
+    """在连接当前事务提交后执行回调；不在事务中时立即执行"""
+    tx = current_transaction(conn)
+    if tx is None:
+        _run_hooks([(callback, args, kwargs)])
+    else:
+        tx.on_commit(callback, *args, **kwargs)
+
+
+def after_commit(callback, *args, **kwargs):
+    """在当前线程上的事务提交后执行回调；不在事务中时立即执行"""
+    tx = active_transaction()
+    if tx is None:
+        _run_hooks([(callback, args, kwargs)])
+    else:
+        tx.on_commit(callback, *args, **kwargs)
+
+def create_indexes(conn):
+    """为列表查询的排序和过滤条件创建索引"""
+    indexes = {
+        'idx_team_members_order': 'team_members (order_index, grade)',
+        # 嵌套查询按姓名批量关联作者和研究领域成员
+        'idx_team_members_name': 'team_members (name)',
+        'idx_papers_order': 'papers (order_index, updated_at)',
+        'idx_paper_category_relations_paper': 'paper_category_relations (paper_id)',
+        'idx_paper_category_relations_category': 'paper_category_relations (category_id)',
+        'idx_notifications_status_order': 'notifications (status, order_index, publish_date)',
+        'idx_uploaded_files_notification': 'uploaded_files (notification_id)',
+        'idx_grades_order': 'grades (order_index)',
+        'idx_research_areas_order': 'research_areas (order_index)',
+        'idx_advisors_order': 'advisors (sort_order)',
+        'idx_algorithms_order': 'algorithms (order_index)',
+        'idx_algorithm_awards_order': 'algorithm_awards (order_index)',
+        'idx_project_overview_order': 'project_overview (order_index)',
+        'idx_innovation_projects_order': 'innovation_projects (sort_order)',
+    }
+    for name, target in indexes.items():
+        try:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target}')
+        except sqlite3.OperationalError as e:
+            print(f"创建索引 {name} 失败: {e}")
+
+def init_db(db_path=None):
     """初始化数据库表结构"""
-    with get_db() as conn:
+    with get_db(db_path) as conn:
         # 创建用户表
         conn.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -810,5 +1226,14 @@ def init_db():
         except Exception as e:
             print(f"创建默认管理员用户时出错: {e}")
         
+        create_indexes(conn)
+        
+        # 变更日志和行数计数触发器（放在最后，覆盖上面新增的表和列）
+        if not _is_vercel:
+            from change_journal import install_journal
+            install_journal(conn)
+        from db_stats import install_counters
+        install_counters(conn)
+        
         conn.commit()
         print("数据库初始化完成") 
\ No newline at end of file
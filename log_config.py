@@ -0,0 +1,169 @@
+"""
+日志配置模块
+统一配置根日志记录器，替代请求路径中的 print：
+- 请求线程只把日志记录放入队列（QueueHandler），格式化和写出由后台线程（QueueListener）完成
+- LOG_LEVEL 控制级别，默认 WARNING（生产环境安静模式），FLASK_DEBUG=true 时默认 INFO
+- LOG_FORMAT=json 时每条日志输出一行JSON，extra 中的字段一并输出
+- 高频调试日志带上 extra=SAMPLED 后按 LOG_SAMPLE_RATE 采样，避免每个请求都写出
+- Vercel 等无服务器环境中请求结束后进程可能被冻结，默认同步写出（LOG_ASYNC=false）
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+# 高频调试日志使用的 extra 参数，例如 logger.debug('...', extra=SAMPLED)
+SAMPLED = {'sampled': True}
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+# LogRecord 自带的属性，JSON输出时不作为额外字段
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'sampled'}
+
+_handler = None
+_listener = None
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _is_vercel():
+    return bool(os.environ.get('VERCEL') or os.environ.get('VERCEL_ENV'))
+
+
+def default_level():
+    level = os.environ.get('LOG_LEVEL')
+    if level:
+        return level.strip().upper()
+    return 'INFO' if _env_bool('FLASK_DEBUG', False) else 'WARNING'
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行JSON"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        if record.stack_info:
+            entry['stack_info'] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """带 sampled 标记的记录按比例保留，其余记录不受影响"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if getattr(record, 'sampled', False):
+            return self.rate >= 1 or random.random() < self.rate
+        return True
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    入队前只合并消息参数、把异常转为文本，不做完整格式化
+    （标准 QueueHandler 会在请求线程上按默认格式格式化一次）
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(level=None, fmt=None, sample_rate=None, async_output=None, stream=None):
+    """
+    配置根日志记录器，可重复调用（后一次调用替换前一次的配置）
+
+    Args:
+        level (str|int): 日志级别，默认取 LOG_LEVEL
+        fmt (str): 'text' 或 'json'，默认取 LOG_FORMAT
+        sample_rate (float): 带 SAMPLED 标记的日志保留比例，默认取 LOG_SAMPLE_RATE（0.01）
+        async_output (bool): 是否由后台线程写出，默认取 LOG_ASYNC（Vercel 上为 false）
+        stream: 输出流，默认 stderr
+
+    Returns:
+        logging.Handler: 安装在根记录器上的处理器
+    """
+    global _handler, _listener
+
+    level = level if level is not None else default_level()
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.WARNING
+    fmt = (fmt or os.environ.get('LOG_FORMAT', 'text')).lower()
+    if sample_rate is None:
+        sample_rate = float(os.environ.get('LOG_SAMPLE_RATE', 0.01))
+    if async_output is None:
+        async_output = _env_bool('LOG_ASYNC', not _is_vercel())
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    if async_output:
+        handler = _RecordQueueHandler(queue.SimpleQueue())
+    else:
+        handler = output
+    handler.setLevel(level)
+    handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    _stop_listener()
+    if _handler is not None:
+        root.removeHandler(_handler)
+    root.addHandler(handler)
+    root.setLevel(level)
+    _handler = handler
+
+    # werkzeug 的请求日志固定为 INFO 级别，安静模式下一并关闭
+    logging.getLogger('werkzeug').setLevel(max(level, logging.INFO))
+
+    if async_output:
+        _listener = QueueListener(handler.queue, output, respect_handler_level=False)
+        _listener.start()
+    return handler
+
+
+atexit.register(_stop_listener)
@@ -0,0 +1,307 @@
+"""
+服务端性能指标模块
+对所有蓝图的请求生命周期计时，按端点汇总：
+- 请求耗时直方图、响应字节数直方图
+- 每个请求的SQL语句数与SQL总耗时（由 db_utils 的语句监听回调上报）
+- 页面缓存与通知详情页缓存的命中率
+指标以Prometheus文本格式导出（/admin/metrics），每个响应附带 Server-Timing 头（db / render / serialize / total）
+"""
+
+import threading
+import time
+
+from flask import g, has_app_context, request
+from flask.json.provider import DefaultJSONProvider
+from flask.signals import before_render_template, template_rendered
+
+# 直方图分桶（上界），单位与指标一致
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# 不计入指标的路径前缀（静态文件数量多且与应用性能无关）
+SKIP_PREFIXES = ('/static/',)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """单调递增计数器"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labels, values), value) for values, value in items]
+
+
+class Histogram:
+    """固定分桶直方图，分桶计数按Prometheus约定累积输出"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}   # 标签值 -> [各分桶计数..., 总和, 次数]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[index] += 1
+                    break
+            entry[-2] += value
+            entry[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((values, list(entry)) for values, entry in self._values.items())
+        lines = []
+        for values, entry in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                le = f'le="{_format_number(float(bound))}"'
+                lines.append((f'{self.name}_bucket', _format_labels(self.labels, values, le), cumulative))
+            lines.append((f'{self.name}_bucket', _format_labels(self.labels, values, 'le="+Inf"'), entry[-1]))
+            lines.append((f'{self.name}_sum', _format_labels(self.labels, values), round(entry[-2], 6)))
+            lines.append((f'{self.name}_count', _format_labels(self.labels, values), entry[-1]))
+        return lines
+
+
+class Gauge:
+    """抓取时通过回调计算的瞬时值"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, collect, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._collect = collect
+
+    def samples(self):
+        return [(self.name, _format_labels(self.labels, values), value)
+                for values, value in self._collect()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """生成Prometheus文本格式（0.0.4）"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+ENDPOINT_LABELS = ('endpoint', 'method')
+
+REQUEST_LATENCY = registry.register(Histogram(
+    'http_request_duration_seconds', '请求处理耗时（秒）', ENDPOINT_LABELS, LATENCY_BUCKETS))
+REQUESTS_TOTAL = registry.register(Counter(
+    'http_requests_total', '请求数', ENDPOINT_LABELS + ('status',)))
+RESPONSE_BYTES = registry.register(Histogram(
+    'http_response_size_bytes', '响应体字节数（压缩后）', ENDPOINT_LABELS, SIZE_BUCKETS))
+REQUEST_QUERIES = registry.register(Histogram(
+    'http_request_sql_queries', '每个请求执行的SQL语句数', ENDPOINT_LABELS, QUERY_COUNT_BUCKETS))
+REQUEST_SQL_SECONDS = registry.register(Histogram(
+    'http_request_sql_duration_seconds', '每个请求的SQL总耗时（秒）', ENDPOINT_LABELS, LATENCY_BUCKETS))
+SQL_STATEMENTS = registry.register(Counter(
+    'sql_statements_total', 'SQL语句总数（含请求之外的后台任务）', ('context',)))
+
+
+def _cache_stats():
+    from page_cache import page_cache
+    from notification_cache import notification_sequence
+    from sections import section_cache
+    return {'page': page_cache.stats(), 'notification_page': notification_sequence.stats(),
+            'section': section_cache.stats()}
+
+
+registry.register(Gauge(
+    'cache_hits', '缓存命中次数', lambda: [((name,), s['hits']) for name, s in _cache_stats().items()], ('cache',)))
+registry.register(Gauge(
+    'cache_misses', '缓存未命中次数', lambda: [((name,), s['misses']) for name, s in _cache_stats().items()], ('cache',)))
+registry.register(Gauge(
+    'cache_hit_ratio', '缓存命中率', lambda: [((name,), s['hit_rate']) for name, s in _cache_stats().items()], ('cache',)))
+registry.register(Gauge(
+    'cache_entries', '缓存条目数', lambda: [((name,), s['entries']) for name, s in _cache_stats().items()], ('cache',)))
+
+
+def _outbox_stats():
+    from outbox import outbox
+    return [((state,), value) for state, value in outbox.stats().items()]
+
+
+registry.register(Gauge('realtime_outbox_events', '实时通知发件箱事件数（pending为待发送）', _outbox_stats, ('state',)))
+
+
+def _rum_stats():
+    from rum import rum
+    return [((result,), value) for result, value in rum.stats().items()]
+
+
+registry.register(Gauge('rum_beacons', '真实用户性能上报条数（按处理结果，pending为待合并）', _rum_stats, ('result',)))
+
+
+class RequestTimings:
+    """单个请求内累计的分段耗时（秒）"""
+
+    __slots__ = ('started', 'statements', 'render', 'serialize', '_render_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = []
+        self.render = 0.0
+        self.serialize = 0.0
+        self._render_started = None
+
+    @property
+    def queries(self):
+        return len(self.statements)
+
+    @property
+    def db(self):
+        """SQL总耗时；语句记录的耗时随读取结果累加，在请求结束时求和才包含读取行的时间"""
+        return sum(record.duration for record in self.statements)
+
+
+def current_timings():
+    """当前请求的计时对象；不在请求中或请求未被计时时返回None"""
+    if not has_app_context():
+        return None
+    return g.get('_request_timings')
+
+
+def record_statement(record):
+    """db_utils 语句监听回调：累计到当前请求"""
+    timings = current_timings()
+    SQL_STATEMENTS.inc('request' if timings is not None else 'background')
+    if timings is not None:
+        timings.statements.append(record)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """统计 jsonify 序列化耗时的JSON提供者"""
+
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            timings = current_timings()
+            if timings is not None:
+                timings.serialize += time.perf_counter() - started
+
+
+def _on_before_render(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None:
+        timings._render_started = time.perf_counter()
+
+
+def _on_rendered(sender, template, context, **extra):
+    timings = current_timings()
+    if timings is not None and timings._render_started is not None:
+        timings.render += time.perf_counter() - timings._render_started
+        timings._render_started = None
+
+
+def server_timing_header(timings, total):
+    parts = [
+        f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries"',
+        f'render;dur={timings.render * 1000:.1f}',
+        f'serialize;dur={timings.serialize * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ]
+    return ', '.join(parts)
+
+
+def _endpoint_label():
+    if request.endpoint:
+        return request.endpoint
+    # 未匹配路由的请求合并为一个标签，避免任意路径造成标签爆炸
+    return 'not_found'
+
+
+def init_metrics(app):
+    """为应用注册请求计时钩子、JSON序列化计时和模板渲染计时"""
+    from db_utils import add_statement_listener
+
+    app.json = TimedJSONProvider(app)
+    add_statement_listener(record_statement)
+    before_render_template.connect(_on_before_render, app)
+    template_rendered.connect(_on_rendered, app)
+
+    @app.before_request
+    def _start_request_timer():
+        if not request.path.startswith(SKIP_PREFIXES):
+            g._request_timings = RequestTimings()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        timings = g.pop('_request_timings', None)
+        if timings is None:
+            return response
+
+        total = time.perf_counter() - timings.started
+        labels = (_endpoint_label(), request.method)
+        REQUEST_LATENCY.observe(total, *labels)
+        REQUESTS_TOTAL.inc(*labels, str(response.status_code))
+        REQUEST_QUERIES.observe(timings.queries, *labels)
+        REQUEST_SQL_SECONDS.observe(timings.db, *labels)
+        if not response.is_streamed:
+            RESPONSE_BYTES.observe(response.calculate_content_length() or 0, *labels)
+
+        response.headers['Server-Timing'] = server_timing_header(timings, total)
+        return response
+
+    return registry
@@ -0,0 +1,330 @@
+"""
+嵌套资源查询
+客户端声明根资源和需要的嵌套关系，一次请求取回关联数据，例如“论文 + 类别 + 作者成员 + 成员的研究领域”：
+    /api/query?resource=papers&include=paper_categories,author_members.research_areas
+- 每一层关系对本层全部父记录只执行一次批量 IN (...) 查询（dataloader 模式），不再逐行查询
+- 同一请求内已加载的行按 (表, 键列, 列) 缓存，重复出现的键不会再次查询
+- 限制嵌套深度、关系数量、根记录数和本次请求加载的总行数，超出时拒绝请求
+查询通过 data_source 执行，数据库和示例数据源的结果一致
+"""
+
+import json
+import logging
+import os
+
+from data_source import data_source
+from projection import PROJECTIONS, parse_fields
+from sections import normalize_paper
+
+logger = logging.getLogger(__name__)
+
+# 嵌套关系的最大深度（include 路径中的段数）
+MAX_DEPTH = 3
+
+# 单次查询最多包含的关系数（include 中所有路径的节点总数）
+MAX_INCLUDES = 8
+
+# 根记录的默认数量和上限
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# 单次查询最多加载的行数（根记录和各层关系合计），超出时中止查询
+MAX_ROWS = int(os.environ.get('QUERY_MAX_ROWS', 2000))
+
+# 每条 IN (...) 查询的最大参数个数，低于SQLite的变量数限制
+FETCH_CHUNK = 500
+
+
+def _json_list(value):
+    """JSON文本或单个值统一为列表（作者、成员等字段历史上也有纯文本的写法）"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = [part.strip() for part in value.replace('，', ',').split(',') if part.strip()]
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _normalize_area(area):
+    if 'members' in area:
+        area['members'] = [str(name) for name in _json_list(area['members'])]
+    return area
+
+
+# 可查询的资源：表、默认排序、可投影的列（papers/team_members 使用 projection 中的定义）、输出前的字段整理
+RESOURCES = {
+    'papers': {
+        'table': 'papers',
+        'order_by': (('order_index', 'ASC'), ('updated_at', 'DESC')),
+        'normalize': normalize_paper,
+    },
+    'team_members': {
+        'table': 'team_members',
+        'order_by': (('order_index', 'ASC', 999999), ('grade', 'DESC'), ('created_at', 'DESC')),
+    },
+    'research_areas': {
+        'table': 'research_areas',
+        'order_by': (('order_index', 'ASC'), ('created_at', 'DESC')),
+        'columns': ('id', 'title', 'category', 'description', 'members', 'order_index', 'created_at', 'updated_at'),
+        'normalize': _normalize_area,
+    },
+    'paper_categories': {
+        'table': 'paper_categories',
+        'order_by': (('level', 'ASC'),),
+        'columns': ('id', 'name', 'level', 'description'),
+    },
+}
+
+# 资源的关系：
+# - 正向关系：父记录 source 列是值列表（JSON），目标资源中 key 列等于其中任一值的行，按列表中的顺序返回
+# - 反向关系（contains）：目标资源 key 列是值列表（JSON），包含父记录 source 列的值；
+#   目标表整表加载一次后在内存中建立索引，只用于研究领域这类小表
+RELATIONS = {
+    'papers': {
+        'paper_categories': {'target': 'paper_categories', 'source': 'category_ids', 'key': 'id'},
+        'author_members': {'target': 'team_members', 'source': 'authors', 'key': 'name'},
+    },
+    'team_members': {
+        'research_areas': {'target': 'research_areas', 'source': 'name', 'key': 'members', 'contains': True},
+    },
+    'research_areas': {
+        'member_profiles': {'target': 'team_members', 'source': 'members', 'key': 'name'},
+    },
+}
+
+# 查询涉及的全部表（用于ETag）
+QUERY_TABLES = tuple(spec['table'] for spec in RESOURCES.values())
+
+
+class QueryError(ValueError):
+    """查询参数不合法或超出限制"""
+
+
+def _key_value(key, value):
+    """关系键统一类型：id 列转为整数，其余列转为去掉首尾空白的字符串；无效值返回 None"""
+    if value is None:
+        return None
+    if key == 'id':
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_include(resource, value):
+    """
+    解析 include 参数为关系树
+
+    Args:
+        resource (str): 根资源
+        value (str): 逗号分隔的关系路径，路径各段用 . 连接，如 author_members.research_areas
+
+    Returns:
+        dict: {关系名: 子关系树}
+
+    Raises:
+        QueryError: 未知关系、深度或关系数量超出限制
+    """
+    tree = {}
+    nodes = 0
+    for path in (value or '').split(','):
+        path = path.strip()
+        if not path:
+            continue
+        segments = path.split('.')
+        if len(segments) > MAX_DEPTH:
+            raise QueryError(f"关系嵌套不能超过 {MAX_DEPTH} 层: {path}")
+        current, node = resource, tree
+        for segment in segments:
+            relation = RELATIONS.get(current, {}).get(segment)
+            if relation is None:
+                available = ', '.join(RELATIONS.get(current, {})) or '无'
+                raise QueryError(f"{current} 没有关系 {segment}（可用: {available}）")
+            if segment not in node:
+                node[segment] = {}
+                nodes += 1
+            current, node = relation['target'], node[segment]
+    if nodes > MAX_INCLUDES:
+        raise QueryError(f"单次查询最多包含 {MAX_INCLUDES} 个关系")
+    return tree
+
+
+def resource_columns(resource, value=None):
+    """
+    资源要查询的列
+
+    papers/team_members 与列表接口相同（默认卡片投影，大字段不返回）；其余资源默认返回全部列
+
+    Raises:
+        QueryError: 请求了未知字段
+    """
+    if resource in PROJECTIONS:
+        try:
+            return parse_fields(resource, value or '')
+        except ValueError as e:
+            raise QueryError(str(e))
+    columns = RESOURCES[resource]['columns']
+    if not value or value.strip() in ('', '*'):
+        return list(columns)
+    wanted = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = sorted(wanted - set(columns))
+    if unknown:
+        raise QueryError(f"不支持的字段: {', '.join(unknown)}")
+    wanted.add('id')
+    return [column for column in columns if column in wanted]
+
+
+class BatchLoader:
+    """
+    单次请求内的批量加载器
+
+    load_many 对未缓存的键执行一次（按 FETCH_CHUNK 分块的）IN 查询；load_all 整表加载一次。
+    所有加载的行数计入 rows，超过 max_rows 时抛出 QueryError
+    """
+
+    def __init__(self, max_rows=MAX_ROWS):
+        self.max_rows = max_rows
+        self.rows = 0
+        self.queries = 0
+        self._by_key = {}
+        self._tables = {}
+
+    def account(self, rows):
+        """记录一次查询加载的行数"""
+        self.queries += 1
+        self.rows += len(rows)
+        if self.rows > self.max_rows:
+            raise QueryError(f"查询加载的数据超过 {self.max_rows} 行，请减少根记录数或嵌套关系")
+
+    def load_many(self, resource, key, values, columns):
+        """返回 {键值: [行, ...]}，没有匹配行的键不出现在结果中"""
+        spec = RESOURCES[resource]
+        columns = tuple(columns)
+        cache = self._by_key.setdefault((resource, key, columns), {})
+        missing = [value for value in dict.fromkeys(values) if value not in cache]
+        for start in range(0, len(missing), FETCH_CHUNK):
+            chunk = missing[start:start + FETCH_CHUNK]
+            rows = data_source.query(spec['table'], where={key: chunk}, order_by=spec['order_by'],
+                                     columns=list(columns))
+            self.account(rows)
+            for value in chunk:
+                cache[value] = []
+            for row in rows:
+                cache.setdefault(_key_value(key, row.get(key)), []).append(row)
+        return {value: cache[value] for value in values if cache.get(value)}
+
+    def load_all(self, resource, columns):
+        """整表加载（按资源默认排序）"""
+        spec = RESOURCES[resource]
+        columns = tuple(columns)
+        rows = self._tables.get((resource, columns))
+        if rows is None:
+            rows = data_source.query(spec['table'], order_by=spec['order_by'], columns=list(columns))
+            self.account(rows)
+            self._tables[(resource, columns)] = rows
+        return rows
+
+
+class NestedQuery:
+    """
+    一次嵌套查询
+
+    Args:
+        resource (str): 根资源
+        include (str): 关系路径，见 parse_include
+        fields (dict): {资源名: 逗号分隔的字段}，对该资源出现的每一层生效
+    """
+
+    def __init__(self, resource, include='', fields=None):
+        if resource not in RESOURCES:
+            raise QueryError(f"不支持的资源: {resource}（可用: {', '.join(RESOURCES)}）")
+        fields = fields or {}
+        unknown = sorted(set(fields) - set(RESOURCES))
+        if unknown:
+            raise QueryError(f"不支持的资源: {', '.join(unknown)}")
+        self.resource = resource
+        self.tree = parse_include(resource, include)
+        self.fields = fields
+        self.loader = BatchLoader()
+
+    def _columns(self, resource, relations, key=None):
+        """本层要查询的列：请求的字段，加上关系用到的源列和加载用的键列"""
+        columns = resource_columns(resource, self.fields.get(resource))
+        extra = [RELATIONS[resource][name]['source'] for name in relations]
+        if key:
+            extra.append(key)
+        for column in extra:
+            if column not in columns:
+                columns.append(column)
+        return columns
+
+    def run(self, ids=None, limit=DEFAULT_LIMIT, offset=0):
+        """执行查询，返回根记录列表（关系已嵌入各记录）"""
+        spec = RESOURCES[self.resource]
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        columns = self._columns(self.resource, self.tree)
+        where = None
+        if ids is not None:
+            ids = [value for value in (_key_value('id', item) for item in ids) if value is not None]
+            if len(ids) > MAX_LIMIT:
+                raise QueryError(f"ids 最多 {MAX_LIMIT} 个")
+            where = {'id': ids}
+        rows = data_source.query(spec['table'], where=where, order_by=spec['order_by'],
+                                 limit=limit, offset=max(0, int(offset)), columns=columns)
+        self.loader.account(rows)
+        rows = [dict(row) for row in rows]
+        self._resolve(self.resource, rows, self.tree)
+        return [self._finish(self.resource, row) for row in rows]
+
+    def _resolve(self, resource, rows, tree):
+        """为本层全部记录解析 tree 中的关系：每个关系一次批量加载，再对子记录递归"""
+        for name, subtree in tree.items():
+            relation = RELATIONS[resource][name]
+            target = relation['target']
+            key = relation['key']
+            columns = self._columns(target, subtree, key)
+
+            # 同一层里多个父记录引用的同一行只复制一次，子关系也只解析一次
+            copies = {}
+
+            def copy(row):
+                marker = id(row)
+                if marker not in copies:
+                    copies[marker] = dict(row)
+                return copies[marker]
+
+            if relation.get('contains'):
+                index = {}
+                for row in self.loader.load_all(target, columns):
+                    for value in _json_list(row.get(key)):
+                        value = _key_value(key, value)
+                        if value is not None:
+                            index.setdefault(value, []).append(row)
+                for parent in rows:
+                    value = _key_value(key, parent.get(relation['source']))
+                    parent[name] = [copy(row) for row in index.get(value, ())]
+            else:
+                values_by_parent = [
+                    [v for v in (_key_value(key, item) for item in _json_list(parent.get(relation['source'])))
+                     if v is not None]
+                    for parent in rows
+                ]
+                loaded = self.loader.load_many(target, key, [v for values in values_by_parent for v in values],
+                                               columns)
+                for parent, values in zip(rows, values_by_parent):
+                    parent[name] = [copy(row) for value in dict.fromkeys(values) for row in loaded.get(value, ())]
+
+            children = list(copies.values())
+            if subtree and children:
+                self._resolve(target, children, subtree)
+            for child in children:
+                self._finish(target, child)
+
+    @staticmethod
+    def _finish(resource, row):
+        normalize = RESOURCES[resource].get('normalize')
+        return normalize(row) if normalize else row
@@ -0,0 +1,140 @@
+"""
+通知导航缓存模块
+维护已发布通知的有序序列（id、标题、摘要、序号），上一篇/下一篇查找为O(1)
+同时缓存渲染后的通知详情页HTML，直到该通知或其相邻通知发生变化
+通知表的变化从变更日志（change_journal）中得知，写接口无需逐一调用 mark_stale
+"""
+
+import threading
+
+from change_journal import JOURNAL_TABLE, journal_floor, table_versions
+from db_utils import get_db
+
+
+class NotificationSequence:
+    """已发布通知的预计算序列与详情页缓存"""
+
+    def __init__(self):
+        self._items = []       # [{'id', 'title', 'excerpt', 'position'}]
+        self._positions = {}   # id -> 在序列中的下标
+        self._pages = {}       # id -> (相邻通知签名, html)
+        self._stale = True
+        self._version = None   # 上次同步时通知表的数据版本
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        """从数据库加载已发布通知的顺序，与列表API的排序保持一致"""
+        with get_db() as conn:
+            rows = conn.execute('''
+                SELECT id, title, excerpt FROM notifications
+                WHERE status = 'published'
+                ORDER BY COALESCE(order_index, 0) ASC, publish_date DESC, id DESC
+            ''').fetchall()
+
+        self._items = [
+            {'id': row['id'], 'title': row['title'], 'excerpt': row['excerpt'], 'position': index}
+            for index, row in enumerate(rows)
+        ]
+        self._positions = {item['id']: index for index, item in enumerate(self._items)}
+        # 已不在序列中的通知（删除或取消发布）不再保留页面缓存
+        self._pages = {nid: page for nid, page in self._pages.items() if nid in self._positions}
+        self._stale = False
+
+    def _ensure_loaded(self):
+        if self._stale:
+            self._load()
+
+    def mark_stale(self, notification_id=None):
+        """
+        标记序列需要重新加载
+
+        Args:
+            notification_id (int): 内容发生变化的通知ID，其详情页缓存会被立即清除
+        """
+        with self._lock:
+            self._stale = True
+            if notification_id is not None:
+                self._pages.pop(notification_id, None)
+
+    def sync(self, conn):
+        """
+        按变更日志同步：通知表在上次同步后发生变化时标记序列过期，并清除内容变化的通知详情页
+
+        变更日志不可用（Vercel内存数据库）时只依赖 mark_stale
+        """
+        versions = table_versions(conn, ('notifications',))
+        if versions is None:
+            return
+        version = versions['notifications']
+        with self._lock:
+            if version == self._version:
+                return
+            if self._version is None or self._version < journal_floor(conn):
+                self._pages.clear()
+            else:
+                rows = conn.execute(f'''
+                    SELECT DISTINCT row_id FROM {JOURNAL_TABLE}
+                    WHERE table_name = 'notifications' AND id > ? AND id <= ?
+                ''', (self._version, version)).fetchall()
+                for row in rows:
+                    self._pages.pop(int(row[0]), None)
+            self._stale = True
+            self._version = version
+
+    def get(self, notification_id):
+        """获取已发布通知在序列中的条目，未发布或不存在时返回None"""
+        with self._lock:
+            self._ensure_loaded()
+            index = self._positions.get(notification_id)
+            return self._items[index] if index is not None else None
+
+    def neighbours(self, notification_id):
+        """
+        获取上一篇和下一篇通知
+
+        Returns:
+            tuple: (prev, next)，不存在时对应位置为None
+        """
+        with self._lock:
+            self._ensure_loaded()
+            index = self._positions.get(notification_id)
+            if index is None:
+                return None, None
+            prev_item = self._items[index - 1] if index > 0 else None
+            next_item = self._items[index + 1] if index + 1 < len(self._items) else None
+            return prev_item, next_item
+
+    def _signature(self, notification_id):
+        prev_item, next_item = self.neighbours(notification_id)
+        return tuple(
+            (item['id'], item['title'], item['excerpt']) if item else None
+            for item in (prev_item, next_item)
+        )
+
+    def get_page(self, notification_id):
+        """获取缓存的详情页HTML，相邻通知变化后自动失效"""
+        with self._lock:
+            cached = self._pages.get(notification_id)
+            if cached and cached[0] == self._signature(notification_id):
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            return None
+
+    def store_page(self, notification_id, html):
+        with self._lock:
+            self._pages[notification_id] = (self._signature(notification_id), html)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._pages),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+notification_sequence = NotificationSequence()
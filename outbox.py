@@ -0,0 +1,140 @@
+"""
+实时通知发件箱
+写操作不再在请求中同步调用 Socket.IO 发送通知，而是把事件记入发件箱：
+- 当前线程处于 db_utils.transaction 事务中时，事件挂在事务的 on_commit 上，事务回滚则事件丢弃
+- 否则（写操作已提交后才发通知的旧代码）直接入队
+后台分发线程把队列中的事件按批取出（最多等待 FLUSH_INTERVAL 凑批），合并同一批中完全相同的事件后逐个 emit。
+请求线程只做入队，写接口的耗时与在线客户端数量无关。
+事件只保存在内存中，进程退出时未发出的事件会丢失——实时通知只是提示页面刷新，页面下次加载仍会拿到最新数据。
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+
+from db_utils import after_commit
+from log_config import SAMPLED
+
+logger = logging.getLogger(__name__)
+
+# 单批最多事件数，以及收到第一个事件后等待凑批的时间（秒）
+MAX_BATCH = 200
+FLUSH_INTERVAL = 0.05
+
+# 队列上限，超过时丢弃新事件
+MAX_PENDING = 10000
+
+
+def _event_key(socketio, event, data, room, namespace):
+    try:
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        payload = repr(data)
+    return id(socketio), event, room, namespace, payload
+
+
+class Outbox:
+    def __init__(self, max_batch=MAX_BATCH, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._worker = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._in_flight = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def record(self, socketio, event, data=None, room=None, namespace=None):
+        """记录一个事件：在事务中时提交后入队，否则立即入队"""
+        after_commit(self.publish, socketio, event, data, room, namespace)
+
+    def publish(self, socketio, event, data=None, room=None, namespace=None):
+        """把事件放入分发队列"""
+        if socketio is None:
+            return
+        with self._idle:
+            self._in_flight += 1
+        try:
+            self._queue.put_nowait((socketio, event, data, room, namespace))
+        except queue.Full:
+            self._done(1)
+            self.dropped += 1
+            logger.warning(f"实时通知发件箱已满，丢弃事件: {event} -> {room or 'all'}")
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='realtime-outbox', daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch(self, batch):
+        seen = set()
+        for socketio, event, data, room, namespace in batch:
+            key = _event_key(socketio, event, data, room, namespace)
+            if key in seen:
+                self.coalesced += 1
+                continue
+            seen.add(key)
+            try:
+                socketio.emit(event, data, room=room, namespace=namespace)
+                self.delivered += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"发送实时通知失败: {event} -> {room or 'all'}: {e}")
+        self.batches += 1
+        logger.debug("发件箱已发送 %d 个事件（合并 %d 个）", len(seen), len(batch) - len(seen), extra=SAMPLED)
+
+    def _done(self, count):
+        with self._idle:
+            self._in_flight -= count
+            if self._in_flight <= 0:
+                self._idle.notify_all()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._dispatch(batch)
+            finally:
+                self._done(len(batch))
+
+    def flush(self, timeout=5.0):
+        """等待已入队的事件全部发出（脚本和基准测试使用），超时返回False"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._in_flight <= 0, timeout)
+
+    def stats(self):
+        return {
+            'pending': self._queue.qsize(),
+            'delivered': self.delivered,
+            'coalesced': self.coalesced,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'batches': self.batches,
+        }
+
+
+outbox = Outbox()
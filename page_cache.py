@@ -0,0 +1,183 @@
+"""
+整页缓存模块
+为前端模板路由提供内存级的整页缓存，匿名访问直接返回缓存的HTML，不再经过Jinja渲染
+缓存键由请求路径、模板修改时间和部署标识组成，模板变更或重新部署后自动失效；
+在服务端渲染数据的页面还带上相关表的数据版本（change_journal 中的最新日志ID），数据变化后自动失效；
+没有声明 tables 的页面如果在渲染时查询了数据库（由 sql_trace 的请求追踪发现），则不缓存该页面并记录警告
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import Response, current_app, g, make_response, request, session
+
+from change_journal import table_versions
+from db_utils import get_db
+
+logger = logging.getLogger(__name__)
+
+# 可选的brotli压缩支持
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 部署标识：Vercel使用提交SHA，本地使用进程启动时间
+DEPLOY_ID = (os.environ.get('VERCEL_GIT_COMMIT_SHA')
+             or os.environ.get('DEPLOY_ID')
+             or str(int(time.time())))
+
+
+class CachedPage:
+    """一个已渲染页面及其压缩版本"""
+
+    __slots__ = ('html', 'gzip', 'br', 'etag', 'created_at')
+
+    def __init__(self, html):
+        self.html = html.encode('utf-8')
+        self.gzip = gzip.compress(self.html, compresslevel=6)
+        self.br = brotli.compress(self.html) if brotli else None
+        self.etag = hashlib.sha1(self.html).hexdigest()[:20]
+        self.created_at = time.time()
+
+    def pick_encoding(self):
+        """根据Accept-Encoding选择响应体和编码"""
+        accept = request.accept_encodings
+        if self.br is not None and accept['br']:
+            return self.br, 'br'
+        if accept['gzip']:
+            return self.gzip, 'gzip'
+        return self.html, None
+
+    def to_response(self):
+        """生成带ETag的响应，命中If-None-Match时返回304"""
+        body, encoding = self.pick_encoding()
+        etag = f'{self.etag}-{encoding}' if encoding else self.etag
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        response = Response(body, mimetype='text/html')
+        response.set_etag(etag)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+
+class PageCache:
+    """线程安全的页面缓存，每个路径只保留最新签名对应的页面"""
+
+    def __init__(self):
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, signature):
+        with self._lock:
+            entry = self._pages.get(path)
+            if entry and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def store(self, path, signature, html):
+        page = CachedPage(html)
+        with self._lock:
+            self._pages[path] = (signature, page)
+        return page
+
+    def invalidate(self, path=None):
+        """清除指定路径的缓存，未指定路径时清空全部"""
+        with self._lock:
+            if path is None:
+                self._pages.clear()
+            else:
+                self._pages.pop(path, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._pages),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+page_cache = PageCache()
+
+
+def _template_mtime(template_name):
+    """获取模板文件的修改时间，用于模板变更后自动失效"""
+    path = os.path.join(current_app.root_path, current_app.template_folder, template_name)
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+def _data_versions(tables):
+    """页面依赖的表的数据版本，日志不可用时为None（只按模板和部署失效）"""
+    if not tables:
+        return None
+    with get_db() as conn:
+        versions = table_versions(conn, tables)
+    return tuple(sorted(versions.items())) if versions else None
+
+
+def _request_queries():
+    """当前请求已执行的SQL条数（来自 sql_trace 的请求追踪），未开启SQL追踪时为None"""
+    trace = g.get('_sql_trace')
+    return trace.count if trace is not None else None
+
+
+def cached_page(template_name, tables=()):
+    """
+    整页缓存装饰器
+
+    Args:
+        template_name (str): 视图渲染的模板名，用于计算缓存签名
+        tables (tuple): 视图在服务端渲染时读取的数据表，任一表变化后缓存失效；
+                        指定时响应要求浏览器每次验证，数据版本不可用时不缓存。
+                        未指定时视图不能读取数据库，否则渲染结果不会被缓存
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # 调试模式和已登录的管理员不走缓存
+            if current_app.debug or request.method != 'GET' or session.get('username'):
+                return view(*args, **kwargs)
+
+            versions = _data_versions(tables)
+            if tables and versions is None:
+                # 无法得知数据版本时，嵌入了数据的页面不缓存
+                response = make_response(view(*args, **kwargs))
+            else:
+                signature = (_template_mtime(template_name), DEPLOY_ID, versions)
+                page = page_cache.get(request.path, signature)
+                if page is None:
+                    queries_before = _request_queries()
+                    rv = view(*args, **kwargs)
+                    if not isinstance(rv, str):
+                        return rv
+                    if not tables and queries_before is not None and _request_queries() > queries_before:
+                        # 渲染读取了数据库却没有声明 tables，缓存无法随数据失效
+                        logger.warning(f"{request.path} 渲染时查询了数据库但未声明 tables，不缓存该页面")
+                        return rv
+                    page = page_cache.store(request.path, signature, rv)
+                response = page.to_response()
+            if tables:
+                # 页面嵌入了数据：浏览器每次按ETag向服务端验证，数据变化后立即可见
+                response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,80 @@
+"""
+列表字段投影模块
+为列表接口提供 ?fields= 稀疏字段集和各资源默认的卡片投影
+列表接口只查询需要的列，正文等大字段只由详情接口返回
+"""
+
+from flask import request
+
+# 资源 -> 可投影的列（按表结构顺序）、默认卡片投影、始终查询的列、仅详情接口返回的大字段
+PROJECTIONS = {
+    'notifications': {
+        'columns': ('id', 'title', 'author', 'category', 'tags', 'excerpt', 'publish_date',
+                    'word_count', 'reading_time', 'status', 'source_type', 'source_file',
+                    'card_style', 'order_index', 'view_count', 'created_at', 'updated_at'),
+        'card': ('id', 'title', 'author', 'category', 'tags', 'excerpt', 'publish_date',
+                 'word_count', 'reading_time', 'status', 'source_type', 'card_style',
+                 'order_index', 'view_count', 'updated_at'),
+        'required': ('id',),
+        'heavy': ('content', 'raw_content'),
+    },
+    'papers': {
+        'columns': ('id', 'title', 'authors', 'journal', 'year', 'category_ids', 'status',
+                    'order_index', 'citation_count', 'doi', 'pdf_url', 'code_url', 'video_url',
+                    'demo_url', 'created_at', 'updated_at'),
+        'card': ('id', 'title', 'authors', 'journal', 'year', 'category_ids', 'status',
+                 'order_index', 'citation_count', 'pdf_url', 'code_url'),
+        'required': ('id',),
+        'heavy': ('abstract',),
+    },
+    'team_members': {
+        'columns': ('id', 'name', 'position', 'description', 'image_url', 'qq', 'wechat', 'email',
+                    'group_name', 'status', 'grade', 'order_index', 'created_at', 'updated_at'),
+        'card': ('id', 'name', 'position', 'description', 'image_url', 'email', 'grade', 'order_index'),
+        # 按年级分组和排序依赖这两列
+        'required': ('id', 'grade', 'order_index'),
+        'heavy': (),
+    },
+}
+
+
+def parse_fields(resource, value=None):
+    """
+    解析 ?fields= 参数
+
+    Args:
+        resource (str): PROJECTIONS 中的资源名
+        value (str): 逗号分隔的字段列表；未传入时读取请求参数，
+                     为空时使用卡片投影，为 * 时返回全部可投影列
+
+    Returns:
+        list: 要查询的列，按表结构顺序排列
+
+    Raises:
+        ValueError: 请求了未知字段或只能在详情接口获取的大字段
+    """
+    spec = PROJECTIONS[resource]
+    if value is None:
+        value = request.args.get('fields', '')
+    value = value.strip()
+
+    if not value:
+        wanted = set(spec['card'])
+    elif value == '*':
+        wanted = set(spec['columns'])
+    else:
+        wanted = {name.strip() for name in value.split(',') if name.strip()}
+        heavy = sorted(wanted & set(spec['heavy']))
+        if heavy:
+            raise ValueError(f"字段只能通过详情接口获取: {', '.join(heavy)}")
+        unknown = sorted(wanted - set(spec['columns']))
+        if unknown:
+            raise ValueError(f"不支持的字段: {', '.join(unknown)}")
+
+    wanted.update(spec['required'])
+    return [column for column in spec['columns'] if column in wanted]
+
+
+def select_list(resource, value=None):
+    """生成投影后的SELECT列清单（不会退化为 SELECT *）"""
+    return ', '.join(parse_fields(resource, value))
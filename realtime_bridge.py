@@ -0,0 +1,105 @@
+"""
+实时通信转发
+REALTIME_TRANSPORT=external 时 HTTP 应用不自己维护 Socket.IO 连接，
+emit 的事件放入队列，由后台线程批量 POST 到独立的实时通信服务（realtime_server.py）。
+请求线程只负责入队，广播耗时与在线客户端数量无关。
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import urllib.error
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+REALTIME_URL = os.environ.get('REALTIME_URL', 'http://127.0.0.1:5001')
+REALTIME_TOKEN = os.environ.get('REALTIME_TOKEN', '')
+
+BROADCAST_PATH = '/internal/broadcast'
+
+# 单次请求最多合并的事件数、队列上限与请求超时（秒）
+MAX_BATCH = 100
+MAX_PENDING = 10000
+POST_TIMEOUT = 2.0
+
+
+class RealtimeForwarder:
+    """接口与 flask_socketio.SocketIO 的 emit / on 一致，事件转发到独立的实时通信服务"""
+
+    def __init__(self, app=None, url=REALTIME_URL, token=REALTIME_TOKEN):
+        self.url = url.rstrip('/') + BROADCAST_PATH
+        self.token = token
+        self._queue = queue.Queue(maxsize=MAX_PENDING)
+        self._worker = None
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, **kwargs):
+        pass
+
+    def on(self, event, namespace=None):
+        # 连接和房间由实时通信服务处理，HTTP 应用中的事件处理函数不会被调用
+        def decorator(f):
+            return f
+        return decorator
+
+    def emit(self, event, data=None, to=None, room=None, namespace=None, **kwargs):
+        entry = {'event': event, 'data': data, 'room': to or room, 'namespace': namespace}
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"实时通信转发队列已满，丢弃事件: {event}")
+            return
+        self._ensure_worker()
+
+    def run(self, app, **kwargs):
+        kwargs.pop('allow_unsafe_werkzeug', None)
+        app.run(**kwargs)
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='realtime-forwarder', daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < MAX_BATCH:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _post(self, batch):
+        body = json.dumps({'events': batch}, ensure_ascii=False, default=str).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json'})
+        if self.token:
+            request.add_header('Authorization', f'Bearer {self.token}')
+        with urllib.request.urlopen(request, timeout=POST_TIMEOUT) as response:
+            response.read()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._post(batch)
+                self.sent += len(batch)
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                # 实时通知只是提示页面刷新，发送失败时丢弃，不重试
+                self.failed += len(batch)
+                logger.warning(f"转发 {len(batch)} 个实时事件失败: {e}")
+
+    def stats(self):
+        return {'pending': self._queue.qsize(), 'sent': self.sent, 'failed': self.failed, 'dropped': self.dropped}
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+独立的实时通信服务
+基于 python-socketio 的 asyncio 服务端（ASGI，由 uvicorn 运行），所有连接由一个事件循环处理，
+不再像 threading 模式那样每个 WebSocket / 长轮询客户端占用一个线程。
+
+与 HTTP 应用分开部署：
+    pip install uvicorn websockets     # 可选依赖，仅运行本服务时需要
+    REALTIME_TOKEN=secret python realtime_server.py --port 5001
+
+HTTP 应用设置 REALTIME_TRANSPORT=external、REALTIME_URL=http://127.0.0.1:5001、REALTIME_TOKEN=secret 后，
+notify_page_refresh 等广播由 realtime_bridge 批量 POST 到本服务的 /internal/broadcast，再推送给客户端。
+浏览器通过反向代理把 /socket.io/ 转发到本服务，或在页面中设置 <meta name="realtime-url"> 直接连接。
+"""
+
+import argparse
+import hmac
+import json
+import logging
+import os
+
+import socketio
+
+from log_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_PATH = '/internal/broadcast'
+HEALTH_PATH = '/internal/health'
+
+# 广播接口的共享密钥；未设置时只接受本机发出的广播
+REALTIME_TOKEN = os.environ.get('REALTIME_TOKEN', '')
+
+SOCKETIO_DEBUG = os.environ.get('SOCKETIO_DEBUG', 'false').lower() == 'true'
+
+# 单次广播请求最多包含的事件数
+MAX_BATCH = 1000
+
+_LOOPBACK = ('127.0.0.1', '::1', 'localhost')
+
+
+def create_socketio_server():
+    """创建 asyncio Socket.IO 服务端，事件处理与 app.py 中 threading 模式的处理函数一致"""
+    sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*',
+                               logger=SOCKETIO_DEBUG, engineio_logger=SOCKETIO_DEBUG)
+    sio.client_count = 0
+
+    @sio.event
+    async def connect(sid, environ, auth=None):
+        sio.client_count += 1
+        await sio.enter_room(sid, 'default')
+        await sio.emit('connected', {'data': '连接成功'}, to=sid)
+
+    @sio.event
+    async def disconnect(sid, *args):
+        sio.client_count -= 1
+
+    @sio.on('join_page')
+    async def join_page(sid, data):
+        page = (data or {}).get('page', 'home')
+        # 先离开之前的页面房间
+        for room in sio.rooms(sid):
+            if room != sid and room != 'default':
+                await sio.leave_room(sid, room)
+        await sio.enter_room(sid, page)
+        await sio.emit('joined_page', {'page': page}, to=sid)
+
+    return sio
+
+
+async def _read_body(receive, limit=4 * 1024 * 1024):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if len(body) > limit:
+            raise ValueError('请求体过大')
+        if not message.get('more_body'):
+            return body
+
+
+async def _respond(send, status, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json; charset=utf-8'),
+                            (b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _authorized(scope, token):
+    if not token:
+        client = scope.get('client') or ('',)
+        return client[0] in _LOOPBACK
+    headers = dict(scope.get('headers') or [])
+    supplied = headers.get(b'authorization', b'').decode('latin-1')
+    return hmac.compare_digest(supplied, f'Bearer {token}')
+
+
+def create_internal_app(sio, token=REALTIME_TOKEN):
+    """处理 HTTP 应用转发的广播和健康检查的 ASGI 应用"""
+
+    async def internal_app(scope, receive, send):
+        if scope['type'] != 'http':
+            return
+        path, method = scope['path'], scope['method']
+
+        if path == HEALTH_PATH and method == 'GET':
+            return await _respond(send, 200, {'status': 'ok', 'clients': sio.client_count})
+
+        if path != BROADCAST_PATH:
+            return await _respond(send, 404, {'error': 'not found'})
+        if method != 'POST':
+            return await _respond(send, 405, {'error': 'method not allowed'})
+        if not _authorized(scope, token):
+            return await _respond(send, 401, {'error': 'unauthorized'})
+
+        try:
+            payload = json.loads(await _read_body(receive) or b'{}')
+            events = payload.get('events', [])
+            if not isinstance(events, list) or len(events) > MAX_BATCH:
+                raise ValueError(f'events 必须是不超过 {MAX_BATCH} 个事件的列表')
+        except ValueError as e:
+            return await _respond(send, 400, {'error': str(e)})
+
+        delivered = 0
+        for event in events:
+            name = event.get('event') if isinstance(event, dict) else None
+            if not name:
+                continue
+            await sio.emit(name, event.get('data'), room=event.get('room'), namespace=event.get('namespace'))
+            delivered += 1
+        return await _respond(send, 202, {'delivered': delivered})
+
+    return internal_app
+
+
+def create_asgi_app(token=REALTIME_TOKEN):
+    sio = create_socketio_server()
+
+    def on_startup():
+        logger.info("实时通信服务已启动")
+
+    return socketio.ASGIApp(sio, other_asgi_app=create_internal_app(sio, token), on_startup=on_startup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='独立的实时通信服务（asyncio Socket.IO）')
+    parser.add_argument('--host', default=os.environ.get('REALTIME_HOST', '127.0.0.1'), help='监听地址')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('REALTIME_PORT', 5001)), help='监听端口')
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ 运行实时通信服务需要安装 uvicorn 和 websockets: pip install uvicorn websockets")
+        raise SystemExit(1)
+
+    setup_logging()
+    print(f"🚀 实时通信服务监听 {args.host}:{args.port}")
+    uvicorn.run(create_asgi_app(), host=args.host, port=args.port, log_level='warning',
+                access_log=False, lifespan='on')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""
+真实用户性能监控（RUM）
+浏览器端 performance-monitor.js 在页面隐藏时用 sendBeacon 批量上报导航耗时（TTFB、FCP、LCP等）和各静态资源耗时，
+/api/rum 校验、采样后放入待处理队列，后台线程定期把队列合并到按页面、按资源划分的固定分桶直方图中。
+
+直方图使用对数分桶（相邻分桶上界相差 BUCKET_GROWTH 倍），分位数的相对误差不超过一个分桶宽度；
+内存占用只与页面数、资源数和分桶数有关，与上报量无关。
+统计窗口每 RUM_WINDOW 秒轮换一次，查询时合并当前窗口与上一个窗口，反映最近一到两个窗口内的真实体验。
+"""
+
+import bisect
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 上报的导航指标（毫秒）
+NAV_METRICS = ('ttfb', 'fcp', 'lcp', 'dcl', 'load')
+
+# 对数分桶：1ms 起，每个分桶上界是上一个的 BUCKET_GROWTH 倍，超过 MAX_VALUE 的值计入最后一个分桶
+BUCKET_GROWTH = 1.1
+MAX_VALUE = 120000.0
+BUCKET_BOUNDS = tuple(BUCKET_GROWTH ** i for i in range(int(math.log(MAX_VALUE, BUCKET_GROWTH)) + 2))
+
+# 单次请求的限制
+MAX_BODY_BYTES = 64 * 1024
+MAX_BEACONS = 20
+MAX_RESOURCES_PER_BEACON = 100
+
+# 页面和资源的基数上限，超出后归入 OTHER，避免任意URL耗尽内存
+MAX_PAGES = 100
+MAX_RESOURCES_PER_PAGE = 200
+OTHER = '(other)'
+MAX_NAME_LENGTH = 200
+
+# 服务端采样比例、队列合并间隔（秒）与统计窗口（秒）
+SAMPLE_RATE = float(os.environ.get('RUM_SAMPLE_RATE', 1.0))
+FLUSH_INTERVAL = float(os.environ.get('RUM_FLUSH_INTERVAL', 5))
+WINDOW_SECONDS = float(os.environ.get('RUM_WINDOW', 3600))
+
+# 待合并队列上限（条样本），超过时丢弃新上报
+MAX_PENDING = 50000
+
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-f]{8,}|[0-9a-f-]{36})$', re.IGNORECASE)
+
+
+class LogHistogram:
+    """对数分桶直方图"""
+
+    __slots__ = ('counts', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKET_BOUNDS)
+        self.count = 0
+
+    def add(self, value):
+        index = min(bisect.bisect_left(BUCKET_BOUNDS, value), len(BUCKET_BOUNDS) - 1)
+        self.counts[index] += 1
+        self.count += 1
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+
+    def percentile(self, pct):
+        """分位数（0-100），在命中的分桶内按计数线性插值"""
+        if not self.count:
+            return None
+        rank = pct / 100.0 * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = BUCKET_BOUNDS[index - 1] if index else 0.0
+                upper = BUCKET_BOUNDS[index]
+                return round(lower + (upper - lower) * (rank - cumulative) / count, 1)
+            cumulative += count
+        return round(BUCKET_BOUNDS[-1], 1)
+
+
+class PageStats:
+    """一个页面在一个窗口内的统计"""
+
+    __slots__ = ('beacons', 'nav', 'resources')
+
+    def __init__(self):
+        self.beacons = 0
+        self.nav = {}
+        self.resources = {}
+
+    def merge(self, other):
+        self.beacons += other.beacons
+        for group in ('nav', 'resources'):
+            target = getattr(self, group)
+            for name, histogram in getattr(other, group).items():
+                target.setdefault(name, LogHistogram()).merge(histogram)
+
+
+def normalize_page(value):
+    """页面路径去掉查询参数，ID类路径段替换为 :id（/notification/12 -> /notification/:id）"""
+    if not isinstance(value, str) or not value:
+        raise ValueError('page 不能为空')
+    path = urlsplit(value).path or '/'
+    segments = [':id' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/')]
+    return '/'.join(segments)[:MAX_NAME_LENGTH]
+
+
+def normalize_resource(value):
+    """资源URL去掉查询参数；同源资源只保留路径，跨域资源保留域名"""
+    if not isinstance(value, str) or not value:
+        raise ValueError('资源名不能为空')
+    parts = urlsplit(value)
+    if parts.scheme in ('data', 'blob'):
+        raise ValueError('忽略内联资源')
+    return (parts.path if not parts.netloc else f'{parts.netloc}{parts.path}')[:MAX_NAME_LENGTH]
+
+
+def _duration(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError('耗时必须是数字')
+    if not math.isfinite(value) or value < 0 or value > MAX_VALUE:
+        raise ValueError('耗时超出范围')
+    return float(value)
+
+
+def parse_beacon(beacon, origin_host=None):
+    """
+    校验并规范化一条上报
+
+    Returns:
+        tuple: (页面, [(指标, 毫秒)], [(资源, 毫秒)])
+
+    Raises:
+        ValueError: 格式不正确
+    """
+    if not isinstance(beacon, dict):
+        raise ValueError('上报必须是对象')
+    page = normalize_page(beacon.get('page'))
+
+    nav_entries = beacon.get('nav') or {}
+    if not isinstance(nav_entries, dict):
+        raise ValueError('nav 必须是对象')
+    nav = []
+    for metric, value in nav_entries.items():
+        if metric in NAV_METRICS and value is not None:
+            nav.append((metric, _duration(value)))
+
+    resources = []
+    entries = beacon.get('resources') or []
+    if not isinstance(entries, list):
+        raise ValueError('resources 必须是数组')
+    for entry in entries[:MAX_RESOURCES_PER_BEACON]:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            name = normalize_resource(entry.get('name'))
+            if origin_host and name.startswith(origin_host + '/'):
+                name = name[len(origin_host):]
+            resources.append((name, _duration(entry.get('duration'))))
+        except ValueError:
+            continue
+
+    if not nav and not resources:
+        raise ValueError('上报中没有有效数据')
+    return page, nav, resources
+
+
+class RumAggregator:
+    def __init__(self, sample_rate=SAMPLE_RATE, flush_interval=FLUSH_INTERVAL, window_seconds=WINDOW_SECONDS):
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.window_seconds = window_seconds
+        self._pending = deque()
+        self._pending_samples = 0
+        self._pending_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._current = {}
+        self._previous = {}
+        self._window_started = time.time()
+        self._worker = None
+        self.counters = {'accepted': 0, 'rejected': 0, 'sampled_out': 0, 'dropped': 0}
+
+    def ingest(self, beacons, origin_host=None):
+        """
+        校验、采样并入队一批上报
+
+        Returns:
+            dict: 本批各结果的条数
+        """
+        result = {'accepted': 0, 'rejected': 0, 'sampled_out': 0, 'dropped': 0}
+        for beacon in beacons[:MAX_BEACONS]:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                result['sampled_out'] += 1
+                continue
+            try:
+                parsed = parse_beacon(beacon, origin_host)
+            except ValueError:
+                result['rejected'] += 1
+                continue
+            samples = len(parsed[1]) + len(parsed[2])
+            with self._pending_lock:
+                if self._pending_samples + samples > MAX_PENDING:
+                    result['dropped'] += 1
+                    continue
+                self._pending.append(parsed)
+                self._pending_samples += samples
+            result['accepted'] += 1
+        result['rejected'] += max(len(beacons) - MAX_BEACONS, 0)
+
+        with self._pending_lock:
+            for key, value in result.items():
+                self.counters[key] += value
+        if result['accepted']:
+            self._ensure_worker()
+        return result
+
+    def _page_stats(self, page):
+        stats = self._current.get(page)
+        if stats is None:
+            if len(self._current) >= MAX_PAGES:
+                page = OTHER
+            stats = self._current.setdefault(page, PageStats())
+        return stats
+
+    def flush(self):
+        """把待处理队列合并到当前窗口的直方图，必要时轮换窗口"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, deque()
+            self._pending_samples = 0
+
+        with self._lock:
+            if time.time() - self._window_started >= self.window_seconds:
+                self._previous, self._current = self._current, {}
+                self._window_started = time.time()
+            for page, nav, resources in pending:
+                stats = self._page_stats(page)
+                stats.beacons += 1
+                for metric, value in nav:
+                    stats.nav.setdefault(metric, LogHistogram()).add(value)
+                for name, value in resources:
+                    if name not in stats.resources and len(stats.resources) >= MAX_RESOURCES_PER_PAGE:
+                        name = OTHER
+                    stats.resources.setdefault(name, LogHistogram()).add(value)
+        return len(pending)
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='rum-flush', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"合并RUM上报失败: {e}")
+
+    def summary(self, pct=75, top_assets=10):
+        """
+        各页面的导航指标分位数和最慢的资源
+
+        Returns:
+            dict: {'percentile', 'window_seconds', 'pages': [...], 'counters': {...}}
+        """
+        self.flush()
+        with self._lock:
+            merged = {}
+            for window in (self._previous, self._current):
+                for page, stats in window.items():
+                    merged.setdefault(page, PageStats()).merge(stats)
+
+        pages = []
+        for page, stats in merged.items():
+            nav = {
+                metric: {'p': histogram.percentile(pct), 'count': histogram.count}
+                for metric, histogram in stats.nav.items()
+            }
+            assets = sorted(
+                ({'name': name, 'p': histogram.percentile(pct), 'count': histogram.count}
+                 for name, histogram in stats.resources.items()),
+                key=lambda item: item['p'] or 0, reverse=True,
+            )
+            pages.append({'page': page, 'beacons': stats.beacons, 'nav': nav, 'slowest_assets': assets[:top_assets]})
+        pages.sort(key=lambda item: item['beacons'], reverse=True)
+
+        with self._pending_lock:
+            counters = dict(self.counters)
+        return {'percentile': pct, 'window_seconds': self.window_seconds, 'pages': pages, 'counters': counters}
+
+    def stats(self):
+        with self._pending_lock:
+            stats = dict(self.counters)
+            stats['pending'] = len(self._pending)
+        return stats
+
+
+rum = RumAggregator()
@@ -0,0 +1,484 @@
+"""
+前端数据分区快照
+前端页面展示的每个数据块（指导老师、团队成员、论文、科创成果、轮播图等）称为一个分区：
+- 每个分区的构建函数与对应的 /api/frontend/* 接口共用，构建结果编码为JSON后作为快照缓存
+- 快照按分区依赖的表在 change_journal 中的数据版本失效；示例数据源的数据不会变化，快照一直有效；
+  变更日志不可用时不缓存，每次重新构建
+- /api/frontend/bundle 一次返回多个分区，未命中缓存的分区在小线程池中并发构建
+- initial_data 把页面首屏需要的分区嵌入服务端渲染的HTML，页面脚本无需等待API请求
+
+快照中的JSON对 < > & ' 做了转义，可以直接嵌入页面的 <script> 标签
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import Response
+
+from change_journal import high_water_mark, journal_floor, table_versions
+from data_source import data_source
+from db_utils import get_db, get_db_path
+from projection import parse_fields
+
+logger = logging.getLogger(__name__)
+
+# 并发构建分区的线程数；Vercel的共享内存连接和示例数据源不使用线程池
+BUNDLE_WORKERS = int(os.environ.get('BUNDLE_WORKERS', 4))
+
+# 单次聚合请求最多包含的分区数
+MAX_SECTIONS = 16
+
+
+# ============ 分区构建函数 ============
+
+def group_team_members(all_members):
+    """团队成员按年级分组，年级降序、组内按 order_index 升序（/api/team 的返回格式）"""
+    grade_groups = {}
+    for member_dict in all_members:
+        grade = member_dict.get('grade') or '2024级'
+
+        member_data = {
+            key: (value if value is not None or key in ('created_at', 'updated_at') else '')
+            for key, value in member_dict.items()
+        }
+        member_data['grade'] = grade
+        member_data['order_index'] = member_dict['order_index'] if member_dict['order_index'] is not None else 0
+        # 前端使用的别名字段
+        if 'position' in member_dict:
+            member_data['role'] = member_data['position']
+        if 'description' in member_dict:
+            member_data['desc'] = member_data['description']
+        if 'image_url' in member_dict:
+            member_data['img'] = member_data['image_url']
+        grade_groups.setdefault(grade, []).append(member_data)
+
+    grade_data = []
+    for grade, members in grade_groups.items():
+        members.sort(key=lambda x: x.get('order_index', 0))
+        grade_data.append({'grade': grade, 'members': members})
+    grade_data.sort(key=lambda x: x['grade'], reverse=True)
+    return grade_data
+
+
+def query_team_members(columns=None):
+    """按 order_index、年级、创建时间排序的团队成员"""
+    return data_source.query(
+        'team_members',
+        order_by=[('order_index', 'ASC', 999999), ('grade', 'DESC'), ('created_at', 'DESC')],
+        columns=columns,
+    )
+
+
+def _json_list(value, wrap_scalar=False):
+    """把JSON文本字段解析为列表，无法解析时返回空列表（wrap_scalar 为真时把原值包装为单元素列表）"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return [value] if wrap_scalar and value else []
+    if not isinstance(value, list):
+        return [value] if wrap_scalar and value else []
+    return value
+
+
+def normalize_paper(paper_dict):
+    """论文的 category_ids 解析为 categories 列表，authors 解析为列表"""
+    if 'category_ids' in paper_dict:
+        paper_dict['categories'] = _json_list(paper_dict['category_ids'] or '[]')
+    if 'authors' in paper_dict:
+        paper_dict['authors'] = _json_list(paper_dict['authors'] or '[]', wrap_scalar=True)
+    return paper_dict
+
+
+def query_papers(columns=None):
+    """按 order_index、更新时间排序的论文"""
+    papers = data_source.query('papers', order_by=[('order_index', 'ASC'), ('updated_at', 'DESC')], columns=columns)
+    return [normalize_paper(paper) for paper in papers]
+
+
+def _build_team():
+    return group_team_members(query_team_members(parse_fields('team_members', '')))
+
+
+def _build_papers():
+    return query_papers(parse_fields('papers', ''))
+
+
+def _build_advisors():
+    return data_source.query('advisors', where={'status': 'active'}, order_by=[('sort_order', 'ASC')])
+
+
+def _build_home_activities():
+    """首页显示的前3条已发布动态"""
+    activities = data_source.query(
+        'notifications',
+        where={'status': 'published'},
+        order_by=[('order_index', 'ASC'), ('publish_date', 'DESC')],
+        limit=3,
+        columns=['id', 'title', 'excerpt', 'category', 'author', 'publish_date', 'reading_time', 'tags'],
+    )
+    for activity in activities:
+        if activity['publish_date']:
+            try:
+                date_obj = datetime.strptime(activity['publish_date'], '%Y-%m-%d %H:%M:%S')
+                activity['formatted_date'] = date_obj.strftime('%Y.%m.%d')
+            except ValueError:
+                activity['formatted_date'] = activity['publish_date']
+        else:
+            activity['formatted_date'] = '未知日期'
+    return activities
+
+
+def _build_innovation_projects():
+    return data_source.query(
+        'innovation_projects',
+        where={'status': 'active'},
+        order_by=[('sort_order', 'ASC', 0), ('created_at', 'DESC')],
+    )
+
+
+def _active_sorted(table, with_image=False):
+    """科创页面各分区：启用状态、按 sort_order 排序，带图片的分区补充 image_display_url"""
+    def build():
+        rows = data_source.query(table, where={'status': 'active'}, order_by=[('sort_order', 'ASC')])
+        if with_image:
+            for item in rows:
+                item['image_display_url'] = item.get('image_url', '')
+        return rows
+    return build
+
+
+def _build_achievements():
+    """成果与荣誉按类型分组"""
+    result = {'awards': [], 'patents': []}
+    for achievement in data_source.query('achievements', where={'status': 'active'}, order_by=[('sort_order', 'ASC')]):
+        if achievement['type'] == 'award':
+            result['awards'].append(achievement)
+        elif achievement['type'] == 'patent':
+            result['patents'].append(achievement)
+    return result
+
+
+def _build_grades():
+    """年级列表及各年级成员数"""
+    with get_db() as conn:
+        rows = conn.execute('''
+            SELECT g.id, g.name, g.description, g.order_index, g.created_at, g.updated_at,
+                   COALESCE(c.member_count, 0) AS member_count
+            FROM grades g
+            LEFT JOIN (
+                SELECT grade, COUNT(*) AS member_count FROM team_members GROUP BY grade
+            ) c ON c.grade = g.name
+            ORDER BY g.order_index ASC, g.created_at DESC
+        ''').fetchall()
+    return [dict(row) for row in rows]
+
+
+# 算法分类 -> 前端页面的分类标签，未列出的分类归入 competition
+ALGORITHM_FRONTEND_CATEGORIES = {
+    '基础算法': 'competition', '图论': 'competition', '数学': 'competition',
+    '字符串': 'competition', '动态规划': 'competition',
+    '深度学习': 'deep-learning', '机器学习': 'deep-learning',
+    '数据结构': 'data-structures',
+}
+
+
+def _build_algorithms():
+    algorithms = data_source.query(
+        'algorithms',
+        where={'status': 'active'},
+        order_by=[('order_index', 'ASC', 0), ('created_at', 'DESC')],
+    )
+    for algorithm in algorithms:
+        algorithm['frontend_category'] = ALGORITHM_FRONTEND_CATEGORIES.get(algorithm.get('category', ''), 'competition')
+    return algorithms
+
+
+def _active_ordered(table):
+    """算法页面各分区：启用状态、按 order_index 和创建时间排序"""
+    def build():
+        return data_source.query(
+            table,
+            where={'status': 'active'},
+            order_by=[('order_index', 'ASC', 0), ('created_at', 'DESC')],
+        )
+    return build
+
+
+# 分区名 -> (依赖的表, 构建函数)
+SECTIONS = {
+    # 首页
+    'team': (('team_members',), _build_team),
+    'advisors': (('advisors',), _build_advisors),
+    'activities': (('notifications',), _build_home_activities),
+    'papers': (('papers',), _build_papers),
+    'innovation_projects': (('innovation_projects',), _build_innovation_projects),
+    # 科创页面
+    'innovation_stats': (('innovation_stats',), _active_sorted('innovation_stats')),
+    'achievements': (('achievements',), _build_achievements),
+    'carousel': (('innovation_carousel',), _active_sorted('innovation_carousel', with_image=True)),
+    'training_projects': (('innovation_training_projects',),
+                          _active_sorted('innovation_training_projects', with_image=True)),
+    'intellectual_properties': (('intellectual_properties',),
+                                _active_sorted('intellectual_properties', with_image=True)),
+    'enterprise_cooperations': (('enterprise_cooperations',),
+                                _active_sorted('enterprise_cooperations', with_image=True)),
+    # 团队页面
+    'grades': (('grades', 'team_members'), _build_grades),
+    # 算法页面
+    'algorithms': (('algorithms',), _build_algorithms),
+    'algorithm_awards': (('algorithm_awards',), _active_ordered('algorithm_awards')),
+    'project_overview': (('project_overview',), _active_ordered('project_overview')),
+}
+
+# 页面名 -> 首屏需要的分区
+PAGE_SECTIONS = {
+    'home': ('team', 'advisors', 'activities', 'papers', 'innovation_projects'),
+    'innovation': ('innovation_stats', 'achievements', 'carousel', 'training_projects',
+                   'intellectual_properties', 'enterprise_cooperations'),
+    'team': ('team', 'grades'),
+    'papers': ('papers',),
+    'algorithm': ('project_overview', 'algorithms', 'algorithm_awards'),
+    'dynamic': ('activities',),
+}
+
+
+# ============ 快照缓存 ============
+
+_HTML_ESCAPES = {ord('<'): '\\u003c', ord('>'): '\\u003e', ord('&'): '\\u0026', ord("'"): '\\u0027'}
+
+
+def encode_json(data):
+    """编码为紧凑的JSON，转义后可直接嵌入HTML"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).translate(_HTML_ESCAPES)
+
+
+class SectionSnapshot:
+    """一个分区的构建结果"""
+
+    __slots__ = ('name', 'json', 'etag', 'created_at')
+
+    def __init__(self, name, data):
+        self.name = name
+        self.json = encode_json(data)
+        self.etag = hashlib.sha1(self.json.encode('utf-8')).hexdigest()[:16]
+        self.created_at = time.time()
+
+
+class SectionCache:
+    """线程安全的分区快照缓存，每个分区只保留最新签名对应的快照；同一分区同时只构建一次"""
+
+    def __init__(self):
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._build_locks = {name: threading.Lock() for name in SECTIONS}
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, name, signature):
+        """签名一致的快照，未命中时返回None（不计入统计）"""
+        if signature is None:
+            return None
+        with self._lock:
+            entry = self._snapshots.get(name)
+        return entry[1] if entry and entry[0] == signature else None
+
+    def get(self, name, signature):
+        """
+        获取分区快照，未命中时构建
+
+        Args:
+            name (str): 分区名
+            signature: 数据版本签名，为None时不缓存
+        """
+        snapshot = self.peek(name, signature)
+        if snapshot is not None:
+            with self._lock:
+                self.hits += 1
+            return snapshot
+
+        with self._build_locks[name]:
+            # 等待锁期间其他请求可能已经构建完成
+            snapshot = self.peek(name, signature)
+            if snapshot is not None:
+                with self._lock:
+                    self.hits += 1
+                return snapshot
+            snapshot = SectionSnapshot(name, SECTIONS[name][1]())
+            with self._lock:
+                self.misses += 1
+                if signature is not None:
+                    self._snapshots[name] = (signature, snapshot)
+            return snapshot
+
+    def invalidate(self, name=None):
+        """清除指定分区的快照，未指定时清空全部"""
+        with self._lock:
+            if name is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(name, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._snapshots),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+section_cache = SectionCache()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=BUNDLE_WORKERS, thread_name_prefix='section-build')
+    return _executor
+
+
+def _use_pool():
+    """只有每次获取独立连接的本地数据库能从并发构建中受益"""
+    return BUNDLE_WORKERS > 1 and data_source.name == 'sqlite' and get_db_path() != ':memory:'
+
+
+def resolve_sections(names):
+    """
+    把分区名/页面名解析为去重后的分区列表（保持请求顺序），与分区同名的页面名按分区处理
+
+    Raises:
+        ValueError: 未知的分区名或分区过多
+    """
+    resolved = []
+    for name in names:
+        for section in ((name,) if name in SECTIONS else PAGE_SECTIONS.get(name, (name,))):
+            if section not in SECTIONS:
+                raise ValueError(f"未知的分区: {section}")
+            if section not in resolved:
+                resolved.append(section)
+    if not resolved:
+        raise ValueError("至少需要一个分区")
+    if len(resolved) > MAX_SECTIONS:
+        raise ValueError(f"分区数不能超过 {MAX_SECTIONS}")
+    return resolved
+
+
+def section_signatures(names):
+    """
+    各分区当前的数据版本签名，一次查询取得所有相关表的版本
+
+    Returns:
+        dict: {分区名: 签名}，变更日志不可用时签名为None
+    """
+    if data_source.name == 'fixtures':
+        return {name: 'fixtures' for name in names}
+    tables = {table for name in names for table in SECTIONS[name][0]}
+    try:
+        with get_db() as conn:
+            versions = table_versions(conn, tables)
+    except Exception as e:
+        logger.warning(f"读取分区数据版本失败: {e}")
+        versions = None
+    if versions is None:
+        return {name: None for name in names}
+    return {name: tuple(versions[table] for table in SECTIONS[name][0]) for name in names}
+
+
+def get_snapshots(names):
+    """
+    获取多个分区的快照，未命中缓存的分区在线程池中并发构建
+
+    Returns:
+        tuple: ({分区名: SectionSnapshot}, {分区名: 错误信息})
+    """
+    signatures = section_signatures(names)
+    snapshots, errors, missing = {}, {}, []
+    for name in names:
+        if section_cache.peek(name, signatures[name]) is not None:
+            snapshots[name] = section_cache.get(name, signatures[name])
+        else:
+            missing.append(name)
+
+    if len(missing) > 1 and _use_pool():
+        futures = {name: _get_executor().submit(section_cache.get, name, signatures[name]) for name in missing}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.exception(f"构建分区 {name} 失败: {e}")
+                errors[name] = str(e)
+    else:
+        results = {}
+        for name in missing:
+            try:
+                results[name] = section_cache.get(name, signatures[name])
+            except Exception as e:
+                logger.exception(f"构建分区 {name} 失败: {e}")
+                errors[name] = str(e)
+
+    # 按请求顺序返回
+    snapshots.update(results)
+    return {name: snapshots[name] for name in names if name in snapshots}, errors
+
+
+def get_snapshot(name):
+    """单个分区的快照，构建失败时抛出异常"""
+    return section_cache.get(name, section_signatures([name])[name])
+
+
+def section_response(name):
+    """用分区快照生成JSON响应，供对应的 /api/frontend/* 接口使用"""
+    return Response(get_snapshot(name).json, mimetype='application/json')
+
+
+# ============ 服务端渲染的首屏数据 ============
+
+def page_tables(page):
+    """页面首屏分区依赖的全部表，用作整页缓存的 tables 参数"""
+    return tuple(sorted({table for name in PAGE_SECTIONS[page] for table in SECTIONS[name][0]}))
+
+
+def _journal_cursor():
+    """当前日志游标，变更日志不可用时为None"""
+    try:
+        with get_db() as conn:
+            journal_floor(conn)
+            return high_water_mark(conn)
+    except Exception:
+        return None
+
+
+def initial_data(page):
+    """
+    页面首屏数据，作为 initial_data 传给模板（frontend/_initial_data.html）
+
+    游标在读取快照之前获取：客户端从该游标增量同步时，渲染之后发生的变更不会遗漏
+
+    Returns:
+        str: {"page": 页面名, "cursor": 日志游标, "tables": [依赖的表], "sections": {分区名: 数据}}，
+             构建失败的分区不嵌入，由页面脚本照常请求接口
+    """
+    cursor = _journal_cursor()
+    snapshots, errors = get_snapshots(list(PAGE_SECTIONS[page]))
+    if errors:
+        logger.warning(f"页面 {page} 的首屏数据部分构建失败: {errors}")
+    return '{"page":%s,"cursor":%s,"tables":%s,"sections":{%s}}' % (
+        encode_json(page),
+        encode_json(cursor),
+        encode_json(page_tables(page)),
+        ','.join(f'{encode_json(name)}:{s.json}' for name, s in snapshots.items()),
+    )
@@ -1,11 +1,37 @@
 """
 Socket.IO 工具模块
 用于处理实时通知功能，避免循环导入问题
+通知不在请求中同步发送，而是记入发件箱（outbox），事务提交后由后台线程批量发出；
+同时递增资源版本号（change_versions），供不使用 WebSocket 的 SSE / 长轮询客户端感知变化；
+事件带有变更日志游标（cursor），客户端据此通过 /api/changes 增量拉取变化的记录
 """
 
-from flask_socketio import emit
+import logging
+
 from flask import current_app
 
+from change_feed import current_cursor
+from change_versions import ALL_RESOURCES, versions
+from db_utils import active_transaction, after_commit
+from outbox import outbox
+
+logger = logging.getLogger(__name__)
+
+def _socketio():
+    socketio = current_app.extensions.get('socketio')
+    if not socketio:
+        logger.warning("SocketIO未初始化")
+    return socketio
+
+def _journal_cursor():
+    """通知对应的变更日志游标；在事务中时包含本事务的变更，提交后即对客户端可见"""
+    try:
+        tx = active_transaction()
+        return current_cursor(tx.conn if tx else None)
+    except Exception as e:
+        logger.debug(f"读取变更日志游标失败: {e}")
+        return None
+
 def notify_page_refresh(page, data):
     """
     通知指定页面刷新
@@ -15,30 +41,27 @@ def notify_page_refresh(page, data):
         data (dict): 要发送的数据
     """
     try:
-        from flask import current_app
-        socketio = current_app.extensions.get('socketio')
+        after_commit(versions.bump, page)
+        socketio = _socketio()
         if socketio:
+            cursor = _journal_cursor()
             # 发送到特定房间
-            socketio.emit('page_refresh', {
+            outbox.record(socketio, 'page_refresh', {
                 'page': page,
                 'type': 'data_updated',
-                'payload': data
+                'payload': data,
+                'cursor': cursor
             }, room=page)
             
             # 同时发送到所有连接的客户端（作为备用）
-            socketio.emit('page_refresh', {
+            outbox.record(socketio, 'page_refresh', {
                 'page': 'all',
                 'type': 'data_updated',
-                'payload': data
+                'payload': data,
+                'cursor': cursor
             })
-            
-            print(f"已发送页面刷新通知到 {page}: {data}")
-        else:
-            print("SocketIO未初始化")
     except Exception as e:
-        print(f"发送页面刷新通知失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"记录页面刷新通知失败: {e}")
 
 def notify_all_pages(data):
     """
@@ -48,17 +71,17 @@ def notify_all_pages(data):
         data (dict): 要发送的数据
     """
     try:
-        from flask import current_app
-        socketio = current_app.extensions.get('socketio')
+        after_commit(versions.bump, ALL_RESOURCES)
+        socketio = _socketio()
         if socketio:
-            socketio.emit('page_refresh', {
+            outbox.record(socketio, 'page_refresh', {
                 'page': 'all',
                 'type': 'data_updated',
-                'payload': data
+                'payload': data,
+                'cursor': _journal_cursor()
             })
-            print(f"已发送全局页面刷新通知: {data}")
     except Exception as e:
-        print(f"发送全局页面刷新通知失败: {e}")
+        logger.exception(f"记录全局页面刷新通知失败: {e}")
 
 def notify_team_update(data):
     """通知团队成员更新"""
@@ -0,0 +1,215 @@
+"""
+SQL追踪模块
+通过 db_utils 的语句监听回调记录每条SQL的规范化文本、耗时和行数：
+- 同一请求内同一条规范化语句重复执行达到阈值时记为可能的N+1查询
+- 超过耗时阈值的语句写入慢查询日志（logs/slow_queries.log）
+- assert_max_queries(n) 用于在脚本或测试中约束一段代码（如一次接口调用）的SQL条数
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+from db_utils import add_statement_listener
+
+logger = logging.getLogger(__name__)
+
+# 慢查询阈值（毫秒）与日志文件
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'logs', 'slow_queries.log')
+
+# 同一请求内同一语句执行达到该次数时视为可能的N+1查询
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+
+# 保留最近的慢查询和N+1记录，供管理接口查看
+RECENT_LIMIT = 100
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """把SQL规范化为语句模板：合并空白，字面量替换为?，IN列表合并为 (?...)"""
+    text = _STRING_LITERAL.sub('?', sql)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    return _PLACEHOLDER_LIST.sub('(?...)', text)
+
+
+def _is_pragma(normalized):
+    return normalized[:6].upper() == 'PRAGMA'
+
+
+class QueryTrace:
+    """一段代码（一个请求或一个 trace_queries 块）中执行的SQL记录"""
+
+    def __init__(self, label=None):
+        self.label = label
+        self.records = []
+        self.started = time.perf_counter()
+
+    def add(self, record):
+        self.records.append((normalize_sql(record.sql), record))
+
+    def statements(self, include_pragmas=False):
+        """[(规范化SQL, StatementRecord)]，默认不含每个连接都会执行的PRAGMA"""
+        return [(sql, record) for sql, record in self.records if include_pragmas or not _is_pragma(sql)]
+
+    @property
+    def count(self):
+        return len(self.statements())
+
+    @property
+    def total_ms(self):
+        return sum(record.duration for _, record in self.records) * 1000
+
+    def repeated(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """重复执行次数达到阈值的语句 {规范化SQL: 次数}"""
+        counts = Counter(sql for sql, _ in self.statements())
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+    def slow(self, threshold_ms=SLOW_QUERY_MS):
+        return [(sql, record) for sql, record in self.records if record.duration * 1000 >= threshold_ms]
+
+    def summary(self):
+        lines = []
+        for index, (sql, record) in enumerate(self.statements(), 1):
+            rows = '-' if record.rows is None else record.rows
+            lines.append(f"{index:>3}. {record.duration * 1000:7.2f} ms  rows={rows}  {sql}")
+        return '\n'.join(lines)
+
+
+class SqlTracer:
+    """把语句记录分发到当前线程上所有活动的 QueryTrace"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.recent_slow = deque(maxlen=RECENT_LIMIT)
+        self.recent_n_plus_one = deque(maxlen=RECENT_LIMIT)
+        self._slow_logger = None
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def push(self, label=None):
+        trace = QueryTrace(label)
+        self._stack().append(trace)
+        return trace
+
+    def pop(self, trace):
+        stack = self._stack()
+        if trace in stack:
+            stack.remove(trace)
+
+    def on_statement(self, record):
+        stack = getattr(self._local, 'stack', None)
+        if stack:
+            for trace in stack:
+                trace.add(record)
+        elif record.duration * 1000 >= SLOW_QUERY_MS:
+            # 请求之外（后台任务、脚本）的慢查询直接记录；此时结果尚未读取，只按执行耗时判断。
+            # 请求内的语句在请求结束时检查，耗时包含读取结果的时间
+            self.report_slow(normalize_sql(record.sql), record, 'background')
+
+    def slow_logger(self):
+        """慢查询日志记录器，首次使用时创建文件处理器（目录不可写时只输出到应用日志）"""
+        if self._slow_logger is None:
+            slow_logger = logging.getLogger('sql_trace.slow')
+            try:
+                os.makedirs(os.path.dirname(SLOW_QUERY_LOG), exist_ok=True)
+                handler = RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=5 * 1024 * 1024, backupCount=3,
+                                              encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+                slow_logger.addHandler(handler)
+                slow_logger.setLevel(logging.INFO)
+            except OSError as e:
+                logger.warning(f"无法写入慢查询日志 {SLOW_QUERY_LOG}: {e}")
+            self._slow_logger = slow_logger
+        return self._slow_logger
+
+    def report_slow(self, sql, record, label):
+        duration_ms = round(record.duration * 1000, 2)
+        self.recent_slow.append({
+            'sql': sql, 'duration_ms': duration_ms, 'rows': record.rows,
+            'label': label, 'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        })
+        self.slow_logger().warning(f"[{label}] {duration_ms} ms rows={record.rows} {sql}")
+
+    def analyze(self, trace):
+        """请求结束时检查N+1和慢查询"""
+        label = trace.label or 'unknown'
+        for sql, count in trace.repeated().items():
+            self.recent_n_plus_one.append({
+                'sql': sql, 'count': count, 'label': label, 'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            })
+            logger.warning(f"可能的N+1查询: {label} 中同一语句执行了 {count} 次: {sql}")
+        for sql, record in trace.slow():
+            self.report_slow(sql, record, label)
+
+
+tracer = SqlTracer()
+add_statement_listener(tracer.on_statement)
+
+
+@contextmanager
+def trace_queries(label=None):
+    """
+    记录代码块中执行的SQL
+
+    用法:
+        with trace_queries() as trace:
+            client.get('/api/team')
+        print(trace.count, trace.summary())
+    """
+    trace = tracer.push(label)
+    try:
+        yield trace
+    finally:
+        tracer.pop(trace)
+
+
+@contextmanager
+def assert_max_queries(n, label=None):
+    """
+    约束代码块中执行的SQL条数（不含连接初始化的PRAGMA），超过时抛出 AssertionError
+
+    用法:
+        with assert_max_queries(3):
+            client.get('/api/grades')
+    """
+    with trace_queries(label) as trace:
+        yield trace
+    if trace.count > n:
+        raise AssertionError(f"执行了 {trace.count} 条SQL，超过预算 {n} 条:\n{trace.summary()}")
+
+
+def init_sql_trace(app):
+    """为每个请求记录SQL，请求结束时检查N+1和慢查询"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_sql_trace():
+        g._sql_trace = tracer.push()
+
+    @app.teardown_request
+    def _finish_sql_trace(exc=None):
+        trace = g.pop('_sql_trace', None)
+        if trace is None:
+            return
+        tracer.pop(trace)
+        trace.label = f'{request.method} {request.endpoint or request.path}'
+        tracer.analyze(trace)
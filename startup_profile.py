@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时分析
+在子进程中用 python -X importtime 导入应用模块，列出导入耗时最高的模块；
+加上 --max-ms / --forbid 时作为启动耗时回归检查，超出阈值或导入了禁止的模块时以非零状态退出
+
+示例：
+    python startup_profile.py --top 20
+    python startup_profile.py --vercel --max-ms 400 --forbid flask_socketio,markdown
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# --vercel 时默认禁止导入的模块（实时通信关闭、未渲染Markdown时不应加载）
+VERCEL_FORBIDDEN = ('flask_socketio', 'socketio', 'engineio', 'markdown')
+
+_PROBE = '''
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+sys.stdout.write("STARTUP_MS=%.3f\\n" % elapsed)
+'''
+
+
+def _parse_importtime(stderr):
+    """解析 -X importtime 输出，返回 {模块: (自身耗时ms, 累计耗时ms)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = (part.strip() for part in line.replace('import time:', '|', 1).split('|'))
+            modules[name] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+        except ValueError:
+            continue
+    return modules
+
+
+def measure(module='app', vercel=False, env=None):
+    """
+    在新的解释器中导入一次模块
+
+    Returns:
+        dict: {'elapsed_ms': 导入耗时, 'modules': {模块: (自身ms, 累计ms)}}
+    """
+    child_env = dict(os.environ)
+    child_env.update(env or {})
+    if vercel:
+        child_env['VERCEL'] = '1'
+    child_env['PYTHONPATH'] = ROOT + os.pathsep + child_env.get('PYTHONPATH', '')
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE.format(module=module)],
+        cwd=ROOT, env=child_env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+
+    elapsed = None
+    for line in result.stdout.splitlines():
+        if line.startswith('STARTUP_MS='):
+            elapsed = float(line.split('=', 1)[1])
+    return {'elapsed_ms': elapsed, 'modules': _parse_importtime(result.stderr)}
+
+
+def profile(module='app', runs=3, vercel=False):
+    """多次测量，耗时取中位数，模块耗时取中位数那一次的结果"""
+    samples = sorted((measure(module, vercel) for _ in range(max(1, runs))), key=lambda s: s['elapsed_ms'])
+    median = samples[len(samples) // 2]
+    return {
+        'module': module,
+        'vercel': vercel,
+        'runs': len(samples),
+        'elapsed_ms': round(statistics.median(s['elapsed_ms'] for s in samples), 1),
+        'modules': median['modules'],
+    }
+
+
+def top_modules(modules, top=15, key='self'):
+    """按自身耗时或累计耗时排序的前N个模块"""
+    index = 0 if key == 'self' else 1
+    ranked = sorted(modules.items(), key=lambda item: item[1][index], reverse=True)
+    return ranked[:top]
+
+
+def print_report(report, top=15):
+    print(f"🚀 导入 {report['module']} 耗时 {report['elapsed_ms']} ms "
+          f"(中位数, {report['runs']} 次{', Vercel环境' if report['vercel'] else ''})")
+    print(f"📦 共导入 {len(report['modules'])} 个模块")
+    for title, key in (('自身耗时', 'self'), ('累计耗时', 'cumulative')):
+        print(f"\n按{title}排序:")
+        print(f"{'自身(ms)':>10} {'累计(ms)':>10}  模块")
+        for name, (self_ms, cumulative_ms) in top_modules(report['modules'], top, key):
+            print(f"{self_ms:>10.1f} {cumulative_ms:>10.1f}  {name}")
+
+
+def check(report, max_ms=None, forbid=()):
+    """回归检查，返回失败原因列表"""
+    failures = []
+    if max_ms is not None and report['elapsed_ms'] > max_ms:
+        failures.append(f"启动耗时 {report['elapsed_ms']} ms 超过阈值 {max_ms} ms")
+    for name in forbid:
+        if name in report['modules']:
+            failures.append(f"启动时导入了不应加载的模块: {name}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='应用启动耗时分析与回归检查')
+    parser.add_argument('--module', default='app', help='要导入的模块')
+    parser.add_argument('--runs', type=int, default=3, help='测量次数，取中位数')
+    parser.add_argument('--top', type=int, default=15, help='列出的模块数')
+    parser.add_argument('--vercel', action='store_true', help='模拟Vercel环境（VERCEL=1）')
+    parser.add_argument('--max-ms', type=float, help='启动耗时阈值，超过时以状态1退出')
+    parser.add_argument('--forbid', help='逗号分隔的禁止导入模块；--vercel 时默认为 ' + ','.join(VERCEL_FORBIDDEN))
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args()
+
+    report = profile(args.module, args.runs, args.vercel)
+    if args.forbid is not None:
+        forbid = [name.strip() for name in args.forbid.split(',') if name.strip()]
+    else:
+        forbid = list(VERCEL_FORBIDDEN) if args.vercel else []
+    failures = check(report, args.max_ms, forbid)
+
+    if args.json:
+        output = dict(report, modules=dict(top_modules(report['modules'], args.top, 'cumulative')),
+                      failures=failures)
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+    else:
+        print_report(report, args.top)
+        for failure in failures:
+            print(f"❌ {failure}")
+        if not failures and (args.max_ms is not None or forbid):
+            print("✅ 启动耗时检查通过")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,7 @@ class PerformanceLoader {
         this.lazyLoadFonts();
         this.lazyLoadIcons();
         this.lazyLoadSocketIO();
+        this.loadPerformanceMonitor();
         this.optimizeImages();
         this.enablePrefetch();
         this.optimizeScroll();
@@ -76,6 +77,16 @@ class PerformanceLoader {
         }, 2000);
     }
 
+    loadPerformanceMonitor() {
+        // 真实用户性能上报（页面隐藏时才发送，不影响首屏）
+        if (!this.loadedResources.has('performance-monitor') && !window.performanceMonitor) {
+            const monitorScript = document.createElement('script');
+            monitorScript.src = '/static/js/performance-monitor.js';
+            document.head.appendChild(monitorScript);
+            this.loadedResources.add('performance-monitor');
+        }
+    }
+
     optimizeImages() {
         // 图片懒加载
         const images = document.querySelectorAll('img[data-src]');
@@ -1,18 +1,29 @@
-// 性能监控器
+// 性能监控器：采集导航耗时、核心Web指标和资源耗时，页面隐藏时通过 sendBeacon 上报到 /api/rum
+const RUM_ENDPOINT = '/api/rum';
+// 单条上报携带的资源数上限（取耗时最长的）
+const RUM_MAX_RESOURCES = 50;
+
 class PerformanceMonitor {
-    constructor() {
+    constructor(options = {}) {
         this.metrics = {};
+        this.vitals = {};
+        this.reported = false;
+        this.logToConsole = options.logToConsole || false;
         this.init();
     }
 
     init() {
         this.measurePageLoad();
         this.measureResourceLoading();
-        this.logPerformanceMetrics();
+        this.measureVitals();
+        this.registerBeacon();
+        if (this.logToConsole) {
+            this.logPerformanceMetrics();
+        }
     }
 
     measurePageLoad() {
-        window.addEventListener('load', () => {
+        const measure = () => {
             const navigation = performance.getEntriesByType('navigation')[0];
             if (navigation) {
                 this.metrics.pageLoad = {
@@ -21,10 +32,98 @@ class PerformanceMonitor {
                     totalTime: navigation.loadEventEnd - navigation.fetchStart,
                     dnsLookup: navigation.domainLookupEnd - navigation.domainLookupStart,
                     tcpConnection: navigation.connectEnd - navigation.connectStart,
-                    serverResponse: navigation.responseEnd - navigation.responseStart
+                    serverResponse: navigation.responseEnd - navigation.responseStart,
+                    ttfb: navigation.responseStart - navigation.startTime,
+                    domReady: navigation.domContentLoadedEventEnd - navigation.startTime
                 };
             }
+        };
+        // 脚本在 load 之后才加载时直接读取（loadEventEnd 在 load 回调结束后才有值）
+        if (document.readyState === 'complete') {
+            measure();
+        } else {
+            window.addEventListener('load', () => setTimeout(measure, 0));
+        }
+    }
+
+    // FCP 与 LCP（LCP 以页面隐藏前最后一个候选为准）
+    measureVitals() {
+        try {
+            new PerformanceObserver((list) => {
+                list.getEntries().forEach((entry) => {
+                    if (entry.name === 'first-contentful-paint') {
+                        this.vitals.fcp = entry.startTime;
+                    }
+                });
+            }).observe({ type: 'paint', buffered: true });
+
+            new PerformanceObserver((list) => {
+                const entries = list.getEntries();
+                const lastEntry = entries[entries.length - 1];
+                if (lastEntry) {
+                    this.vitals.lcp = lastEntry.startTime;
+                }
+            }).observe({ type: 'largest-contentful-paint', buffered: true });
+        } catch (error) {
+            // 不支持这些指标的浏览器只上报导航和资源耗时
+        }
+    }
+
+    // 页面进入后台或关闭时上报一次（pagehide 兼容不触发 visibilitychange 的浏览器）
+    registerBeacon() {
+        if (!navigator.sendBeacon) {
+            return;
+        }
+        const send = () => this.sendBeacon();
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') {
+                send();
+            }
+        });
+        window.addEventListener('pagehide', send);
+    }
+
+    buildBeacon() {
+        const nav = {};
+        const pageLoad = this.metrics.pageLoad;
+        if (pageLoad) {
+            nav.ttfb = pageLoad.ttfb;
+            nav.dcl = pageLoad.domReady;
+            nav.load = pageLoad.totalTime;
+        }
+        if (this.vitals.fcp != null) {
+            nav.fcp = this.vitals.fcp;
+        }
+        if (this.vitals.lcp != null) {
+            nav.lcp = this.vitals.lcp;
+        }
+        const resources = (this.metrics.resources || [])
+            .filter(resource => resource.duration > 0)
+            .sort((a, b) => b.duration - a.duration)
+            .slice(0, RUM_MAX_RESOURCES)
+            .map(resource => ({ name: resource.name, duration: Math.round(resource.duration) }));
+        Object.keys(nav).forEach(key => {
+            if (!(nav[key] >= 0)) {
+                delete nav[key];
+            } else {
+                nav[key] = Math.round(nav[key]);
+            }
         });
+        return { page: window.location.pathname, nav, resources };
+    }
+
+    sendBeacon() {
+        if (this.reported) {
+            return;
+        }
+        const beacon = this.buildBeacon();
+        if (!Object.keys(beacon.nav).length && !beacon.resources.length) {
+            return;
+        }
+        this.reported = true;
+        // text/plain 不触发CORS预检，服务端按JSON解析
+        const body = new Blob([JSON.stringify({ beacons: [beacon] })], { type: 'text/plain' });
+        navigator.sendBeacon(RUM_ENDPOINT, body);
     }
 
     measureResourceLoading() {
@@ -35,6 +134,10 @@ class PerformanceMonitor {
                     if (!this.metrics.resources) {
                         this.metrics.resources = [];
                     }
+                    // 上报接口自身不计入
+                    if (entry.name.includes(RUM_ENDPOINT)) {
+                        return;
+                    }
                     this.metrics.resources.push({
                         name: entry.name,
                         duration: entry.duration,
@@ -45,7 +148,8 @@ class PerformanceMonitor {
             });
         });
         
-        observer.observe({ entryTypes: ['resource'] });
+        // buffered 包含脚本加载前已完成的资源
+        observer.observe({ type: 'resource', buffered: true });
     }
 
     getResourceType(url) {
@@ -150,7 +254,16 @@ class PerformanceMonitor {
     }
 }
 
-// 在开发环境下启用性能监控
-if (window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1') {
-    new PerformanceMonitor();
-} 
\ No newline at end of file
+// 按采样比例（window.RUM_SAMPLE_RATE 或 <meta name="rum-sample-rate">，默认全部）启用上报；
+// 开发环境下同时在控制台输出性能报告
+(function() {
+    if (window.performanceMonitor || typeof PerformanceObserver === 'undefined') {
+        return;
+    }
+    const isDev = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1';
+    const sampleMeta = document.querySelector('meta[name="rum-sample-rate"]');
+    const sampleRate = parseFloat(window.RUM_SAMPLE_RATE != null ? window.RUM_SAMPLE_RATE : (sampleMeta ? sampleMeta.content : '1'));
+    if (isDev || Math.random() < sampleRate) {
+        window.performanceMonitor = new PerformanceMonitor({ logToConsole: isDev });
+    }
+})(); 
\ No newline at end of file
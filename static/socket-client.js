@@ -9,6 +9,28 @@ let maxReconnectAttempts = 10;
 let reconnectDelay = 2000;
 let isConnecting = false;
 
+// 无法使用Socket.IO时（如Vercel部署）改用 SSE / 长轮询变更通道
+let connectErrors = 0;
+const maxConnectErrors = 2;
+let changeChannelStarted = false;
+let changeSource = null;
+let changeVersion = null;
+
+// 增量同步：变更日志游标，以及页面为各数据表注册的合并/重载回调
+let changeCursor = null;
+let changeSyncChain = Promise.resolve();
+let lastUnhandledChanges = [];
+const recordChangeHandlers = {};
+
+// 页面关注的资源（与 change_feed.RESOURCES 对应），首页及未列出的页面关注全部资源
+const pageChangeResources = {
+    team: ['team', 'research', 'advisors'],
+    papers: ['papers'],
+    innovation: ['innovation'],
+    dynamic: ['notifications'],
+    activities: ['notifications']
+};
+
 // 初始化Socket.IO连接 - 优化版本
 function initSocketIO() {
     // 检查是否已经存在连接或正在连接
@@ -21,11 +43,24 @@ function initSocketIO() {
         return;
     }
     
+    // 记录当前变更日志游标，收到刷新通知时只拉取之后的变更
+    primeChangeCursor();
+    
+    // 未加载Socket.IO客户端库时直接使用变更通道
+    if (typeof io === 'undefined') {
+        startChangeChannel();
+        return;
+    }
+    
     isConnecting = true;
     
     try {
+        // 实时通信服务独立部署时，通过 window.REALTIME_URL 或 <meta name="realtime-url"> 指定地址
+        const realtimeMeta = document.querySelector('meta[name="realtime-url"]');
+        const realtimeUrl = window.REALTIME_URL || (realtimeMeta && realtimeMeta.content);
+        
         // 创建Socket.IO连接，优化配置 - 提高响应速度
-        socket = io({
+        const socketOptions = {
             transports: ['websocket', 'polling'],
             timeout: 15000, // 减少超时时间，提高响应速度
             reconnection: true,
@@ -39,13 +74,15 @@ function initSocketIO() {
             rememberUpgrade: true, // 记住升级状态
             pingTimeout: 10000, // 减少ping超时
             pingInterval: 5000 // 减少ping间隔
-        });
+        };
+        socket = realtimeUrl ? io(realtimeUrl, socketOptions) : io(socketOptions);
         
         // 连接成功
         socket.on('connect', function() {
             console.log('✅ Socket.IO连接成功');
             isConnecting = false;
             reconnectAttempts = 0; // 重置重连计数
+            connectErrors = 0;
             
             // 加入当前页面
             if (window.currentPage) {
@@ -70,6 +107,12 @@ function initSocketIO() {
         // 连接错误 - 减少错误日志输出
         socket.on('connect_error', function(error) {
             isConnecting = false;
+            // 服务端未启用Socket.IO时连续失败，切换到变更通道
+            connectErrors++;
+            if (connectErrors >= maxConnectErrors) {
+                startChangeChannel();
+                return;
+            }
             // 只在开发环境或重要错误时输出日志
             if (window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1') {
                 console.warn('⚠️ Socket.IO连接错误:', error.message || error);
@@ -108,6 +151,181 @@ function initSocketIO() {
     }
 }
 
+// 当前页面关注的资源（首页展示多类数据，关注全部变化）
+function changeResourcesParam() {
+    const page = window.currentPage;
+    return page && page !== 'home' ? `&resources=${encodeURIComponent(page)}` : '';
+}
+
+// 处理变更通道返回的结果：首次只记录版本号，之后有变化时刷新页面数据
+function applyChangeResult(result) {
+    const changed = result.changed || {};
+    if (changeVersion !== null && (result.reset || Object.keys(changed).length > 0)) {
+        handlePageRefresh({
+            page: window.currentPage,
+            type: 'data_updated',
+            payload: { version: result.version, changed: changed }
+        });
+    }
+    changeVersion = result.version;
+}
+
+// 启动 SSE（不支持 EventSource 时使用长轮询）变更通道
+function startChangeChannel() {
+    if (changeChannelStarted) {
+        return;
+    }
+    changeChannelStarted = true;
+    if (socket) {
+        socket.io.opts.reconnection = false;
+        socket.close();
+    }
+    console.log('📡 Socket.IO不可用，使用变更通道接收刷新通知');
+    
+    if (window.EventSource) {
+        // 断开后浏览器按服务端给出的 retry 间隔自动重连，并通过 Last-Event-ID 带上最后的版本号
+        changeSource = new EventSource('/api/events?' + changeResourcesParam().slice(1));
+        changeSource.addEventListener('hello', function(event) {
+            changeVersion = JSON.parse(event.data).version;
+        });
+        changeSource.addEventListener('change', function(event) {
+            applyChangeResult(JSON.parse(event.data));
+        });
+    } else {
+        pollChanges();
+    }
+}
+
+// 长轮询：服务端在资源变化或超时后返回，随即发起下一次请求
+async function pollChanges() {
+    while (changeChannelStarted) {
+        try {
+            const since = changeVersion !== null ? changeVersion : '';
+            const response = await fetch(`/api/changes/wait?since=${since}${changeResourcesParam()}`, { cache: 'no-store' });
+            if (response.status === 429) {
+                const retryAfter = parseInt(response.headers.get('Retry-After') || '5', 10);
+                await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+                continue;
+            }
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            applyChangeResult(await response.json());
+        } catch (error) {
+            await new Promise(resolve => setTimeout(resolve, reconnectDelay * 2));
+        }
+    }
+}
+
+// 注册数据表的增量合并回调：apply(变更) 合并 {changed, deleted}，reload() 在需要整体刷新时重新加载
+function onRecordChanges(table, apply, reload) {
+    (recordChangeHandlers[table] = recordChangeHandlers[table] || []).push({ apply, reload });
+    // 首次注册时记录当前游标，之后的变更都可以增量获取
+    primeChangeCursor();
+}
+
+// 记录变更日志游标。页面嵌入了首屏数据（window.INITIAL_DATA）时从渲染时的游标开始，
+// 并补一次首屏数据相关表的增量同步：渲染之后发生的变更不会遗漏，没有变更时不额外请求数据
+function primeChangeCursor() {
+    if (changeCursor !== null) {
+        return;
+    }
+    const initial = window.INITIAL_DATA;
+    if (!initial || initial.cursor == null) {
+        syncChanges().catch(() => {});
+        return;
+    }
+    changeCursor = initial.cursor;
+    syncChanges(null, initial.tables).then(unhandled => {
+        if (unhandled !== null && unhandled.length === 0) {
+            return;
+        }
+        console.log('🔄 页面嵌入的数据已过期，重新加载:', unhandled);
+        handlePageRefresh({ type: 'initial_data', skipSync: true });
+    }).catch(() => {});
+}
+
+// 增量同步请求关注的资源：当前页面的资源加上已注册回调的数据表
+function changeFeedResources() {
+    const page = window.currentPage || (window.INITIAL_DATA && window.INITIAL_DATA.page);
+    if (!page || page === 'home' || !pageChangeResources[page]) {
+        return '';
+    }
+    const names = new Set([...pageChangeResources[page], ...Object.keys(recordChangeHandlers)]);
+    return `&resources=${encodeURIComponent(Array.from(names).join(','))}`;
+}
+
+async function fetchRecordChanges(eventCursor, resources) {
+    // 通知对应的变更已经同步过（同一通知的多个监听者），返回那次同步的结果
+    if (eventCursor != null && changeCursor !== null && eventCursor <= changeCursor) {
+        return lastUnhandledChanges;
+    }
+    const initial = changeCursor === null;
+    const unhandled = new Set();
+    let hasMore = true;
+    while (hasMore) {
+        const since = changeCursor !== null ? changeCursor : '';
+        const filter = resources ? `&resources=${encodeURIComponent(resources.join(','))}` : changeFeedResources();
+        const response = await fetch(`/api/changes?since=${since}${filter}`, { cache: 'no-store' });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        const result = await response.json();
+        changeCursor = result.cursor;
+        if (result.reset || result.cursor === null) {
+            // 游标已失效（日志被压缩或服务端不可用），已注册的数据表整体重新加载
+            const handlers = Object.values(recordChangeHandlers).flat();
+            handlers.forEach(handler => {
+                if (typeof handler.reload === 'function') {
+                    handler.reload();
+                }
+            });
+            lastUnhandledChanges = handlers.length && !initial ? [] : null;
+            return lastUnhandledChanges;
+        }
+        Object.entries(result.changes || {}).forEach(([table, changes]) => {
+            const handlers = recordChangeHandlers[table];
+            if (handlers && handlers.length) {
+                handlers.forEach(handler => handler.apply(changes));
+            } else {
+                unhandled.add(table);
+            }
+        });
+        hasMore = result.has_more;
+    }
+    // 首次同步只得到游标，不知道此前发生了哪些变化
+    lastUnhandledChanges = initial ? null : Array.from(unhandled);
+    return lastUnhandledChanges;
+}
+
+// 拉取游标之后的变更并交给已注册的回调合并；返回没有回调处理的变化表名，需要整体刷新时返回 null
+// resources 为空时使用当前页面关注的资源
+function syncChanges(eventCursor, resources) {
+    const run = changeSyncChain.then(() => fetchRecordChanges(eventCursor, resources));
+    changeSyncChain = run.catch(() => {});
+    return run;
+}
+
+// 把增量变更合并进记录列表：删除已删除的记录，更新或追加变化的记录；compare 为空时按 order_index 排序
+function mergeRecordChanges(records, changes, compare, key = 'id') {
+    const deleted = new Set(changes.deleted || []);
+    const changed = new Map((changes.changed || []).map(row => [row[key], row]));
+    const merged = [];
+    records.forEach(record => {
+        if (deleted.has(record[key])) {
+            return;
+        }
+        if (changed.has(record[key])) {
+            merged.push({ ...record, ...changed.get(record[key]) });
+            changed.delete(record[key]);
+        } else {
+            merged.push(record);
+        }
+    });
+    changed.forEach(row => merged.push(row));
+    return merged.sort(compare || ((a, b) => (a.order_index || 0) - (b.order_index || 0)));
+}
+
 // 设置当前页面
 function setCurrentPage(page) {
     window.currentPage = page;
@@ -119,7 +337,7 @@ function setCurrentPage(page) {
 }
 
 // 处理页面刷新
-function handlePageRefresh(data) {
+async function handlePageRefresh(data) {
     const { type, payload } = data;
     
     console.log('🔄 处理页面刷新:', { type, payload, currentPage: window.currentPage });
@@ -141,6 +359,24 @@ function handlePageRefresh(data) {
         console.log('📍 从URL推断的页面类型:', window.currentPage);
     }
     
+    // 先按变更日志增量同步：关注的数据没有变化，或变化都已由页面注册的回调合并时无需整体刷新
+    if (!data.skipSync) {
+        try {
+            const unhandled = await syncChanges(data.cursor);
+            if (unhandled !== null && unhandled.length === 0) {
+                console.log('✅ 增量同步完成');
+                return;
+            }
+        } catch (error) {
+            console.warn('⚠️ 增量同步失败，整体刷新:', error);
+        }
+    }
+    
+    // 数据已经变化，页面中嵌入的首屏数据不再使用
+    if (window.INITIAL_DATA) {
+        window.INITIAL_DATA.sections = {};
+    }
+    
     // 根据当前页面类型执行相应的刷新
     switch (window.currentPage) {
         case 'home':
@@ -271,6 +507,10 @@ window.addEventListener('beforeunload', function() {
     if (socket) {
         socket.disconnect();
     }
+    if (changeSource) {
+        changeSource.close();
+    }
+    changeChannelStarted = false;
 });
 
 // 页面可见性变化时处理连接
@@ -281,7 +521,7 @@ document.addEventListener('visibilitychange', function() {
     } else {
         // 页面显示时，确保连接正常
         console.log('📱 页面显示');
-        if (socket && !socket.connected && !isConnecting) {
+        if (socket && !socket.connected && !isConnecting && !changeChannelStarted) {
             setTimeout(initSocketIO, 1000);
         }
     }